@@ -0,0 +1 @@
+# Micro-benchmarks for the HackerNews Analysis Backend
\ No newline at end of file
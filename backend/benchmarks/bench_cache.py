@@ -0,0 +1,129 @@
+"""Read/write latency of ArticleCache before and after the connection layer.
+
+"Before" replays the old access pattern: a new sqlite3.connect per call,
+schema DDL before every write and one INSERT per row. "After" is the
+current ArticleCache on a long-lived, WAL-tuned Database.
+
+Run from backend/:  python -m benchmarks.bench_cache
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from src.models.article import Article
+from src.services.cache import ArticleCache
+
+class LegacyArticleCache:
+    """The per-call connection pattern ArticleCache used to have"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._init_db()
+
+    def _init_db(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS articles (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    title TEXT NOT NULL,
+                    url TEXT NOT NULL UNIQUE,
+                    screenshot_path TEXT,
+                    status TEXT NOT NULL,
+                    summary TEXT,
+                    created_at TIMESTAMP,
+                    updated_at TIMESTAMP
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_created_at ON articles(created_at)")
+            conn.commit()
+
+    def save_articles(self, articles):
+        self._init_db()
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("DELETE FROM articles")
+            for article in articles:
+                conn.execute("""
+                    INSERT OR REPLACE INTO articles
+                    (title, url, screenshot_path, status, summary, created_at, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, (article.title, article.url, article.screenshot_path, article.status,
+                      article.summary, article.created_at.isoformat(), article.updated_at.isoformat()))
+            conn.commit()
+
+    def get_articles(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute("SELECT * FROM articles ORDER BY created_at ASC").fetchall()
+            return [
+                Article(
+                    title=row['title'],
+                    url=row['url'],
+                    screenshot_path=row['screenshot_path'],
+                    status=row['status'],
+                    summary=row['summary'],
+                    created_at=datetime.fromisoformat(row['created_at']),
+                    updated_at=datetime.fromisoformat(row['updated_at'])
+                )
+                for row in rows
+            ]
+
+def make_batch(size: int, generation: int):
+    now = datetime.now()
+    return [
+        Article(
+            title=f"Story {generation}-{i}",
+            url=f"https://example.com/{(generation + i) % (size * 2)}",
+            screenshot_path=f"{i}.png",
+            status="success",
+            summary="A two or three sentence summary of the story. " * 3,
+            created_at=now,
+            updated_at=now,
+            rank=i + 1
+        )
+        for i in range(size)
+    ]
+
+def measure(fn, iterations: int):
+    samples = []
+    for i in range(iterations):
+        started = time.perf_counter()
+        fn(i)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "p50": statistics.median(samples),
+        "p95": samples[int(len(samples) * 0.95) - 1],
+        "mean": statistics.fmean(samples),
+    }
+
+def run(cache, batch_size: int, iterations: int):
+    cache.save_articles(make_batch(batch_size, 0))
+    return {
+        "write": measure(lambda i: cache.save_articles(make_batch(batch_size, i)), iterations),
+        "read": measure(lambda i: cache.get_articles(), iterations),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = {
+            "before (per-call connect)": run(LegacyArticleCache(os.path.join(directory, "legacy.db")), args.batch_size, args.iterations),
+            "after (pooled, WAL)": run(ArticleCache(os.path.join(directory, "tuned.db")), args.batch_size, args.iterations),
+        }
+
+    print(f"batch size {args.batch_size}, {args.iterations} iterations, latency in ms")
+    print(f"{'variant':<28}{'op':<8}{'p50':>10}{'p95':>10}{'mean':>10}")
+    for variant, ops in results.items():
+        for op, stats in ops.items():
+            print(f"{variant:<28}{op:<8}{stats['p50']:>10.3f}{stats['p95']:>10.3f}{stats['mean']:>10.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Memory and per-check latency of RateLimiter with a million distinct clients.
+
+"Before" is the old limiter: a deque of request timestamps per client in a
+defaultdict, never evicted. "After" is the GCRA RateLimiter, uncapped and
+with its default max_clients cap. Every client makes one request, as a scan
+across many IPs would.
+
+Run from backend/:  python -m benchmarks.bench_rate_limiter
+"""
+import argparse
+import statistics
+import time
+import tracemalloc
+from collections import defaultdict, deque
+
+from src.utils.rate_limiter import RateLimiter
+
+class LegacyRateLimiter:
+    """The deque-per-client sliding window RateLimiter used to have"""
+
+    def __init__(self, max_requests: int = 10, window_seconds: int = 60):
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self.requests = defaultdict(deque)
+
+    def is_allowed(self, client_id: str) -> bool:
+        now = time.time()
+        client_requests = self.requests[client_id]
+        while client_requests and client_requests[0] <= now - self.window_seconds:
+            client_requests.popleft()
+        if len(client_requests) < self.max_requests:
+            client_requests.append(now)
+            return True
+        return False
+
+def measure_memory(make_limiter, client_ids) -> float:
+    tracemalloc.start()
+    limiter = make_limiter()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for client_id in client_ids:
+        limiter.is_allowed(client_id)
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return retained / 2**20
+
+def measure_latency(make_limiter, client_ids) -> dict:
+    limiter = make_limiter()
+    samples = []
+    for client_id in client_ids:
+        started = time.perf_counter_ns()
+        limiter.is_allowed(client_id)
+        samples.append(time.perf_counter_ns() - started)
+    samples.sort()
+    return {
+        "p50_us": statistics.median(samples) / 1000,
+        "p99_us": samples[int(len(samples) * 0.99) - 1] / 1000,
+        "mean_us": statistics.fmean(samples) / 1000,
+    }
+
+def run(make_limiter, client_ids) -> dict:
+    # Timed separately so tracemalloc's bookkeeping doesn't skew latency
+    return {"retained_mb": measure_memory(make_limiter, client_ids), **measure_latency(make_limiter, client_ids)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    client_ids = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}:{i}" for i in range(args.clients)]
+    variants = {
+        "before (deque per client)": lambda: LegacyRateLimiter(max_requests=5, window_seconds=300),
+        "after (GCRA, uncapped)": lambda: RateLimiter(max_requests=5, window_seconds=300, max_clients=args.clients),
+        "after (GCRA, 100k cap)": lambda: RateLimiter(max_requests=5, window_seconds=300),
+    }
+    results = {name: run(make, client_ids) for name, make in variants.items()}
+
+    print(f"{args.clients} distinct clients, one request each")
+    print(f"{'variant':<28}{'retained MB':>12}{'p50 us':>10}{'p99 us':>10}{'mean us':>10}")
+    for name, stats in results.items():
+        print(f"{name:<28}{stats['retained_mb']:>12.1f}{stats['p50_us']:>10.2f}{stats['p99_us']:>10.2f}{stats['mean_us']:>10.2f}")
+
+if __name__ == "__main__":
+    main()
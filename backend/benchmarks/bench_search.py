@@ -0,0 +1,113 @@
+"""Full-text search latency over a large synthetic story archive.
+
+Fills a fresh database with synthetic stories through the same tables and
+triggers StoryArchive uses, then times StoryArchive.search for common,
+rare, prefix and multi-term queries. Words follow a Zipf-like distribution
+so term frequencies resemble real titles and summaries.
+
+Run from backend/:  python -m benchmarks.bench_search --stories 300000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from src.services.archive import StoryArchive
+from src.services.cache import ArticleCache
+from src.services.database import Database
+
+WORDS = (
+    "rust python compiler database postgres sqlite kernel linux browser startup funding "
+    "security vulnerability model training inference gpu memory allocator garbage collector "
+    "typescript react frontend latency cache distributed consensus raft paxos storage index "
+    "query planner open source license release benchmark performance network protocol quic "
+    "http encryption privacy regulation hardware chip battery energy climate space rocket "
+    "satellite physics biology history economics market interview career remote hiring"
+).split()
+
+SYLLABLES = "ka lo mi ne ru ta shi vo den pra gel tor bin qua zex fol mar ist ent ion".split()
+
+def make_vocabulary(size: int, rng: random.Random):
+    """Topical words above plus generated ones, with Zipf-like frequencies like real text"""
+    words = list(WORDS)
+    while len(words) < size:
+        words.append("".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    rng.shuffle(words)
+    cum_weights, total = [], 0.0
+    for rank in range(1, len(words) + 1):
+        total += 1 / rank
+        cum_weights.append(total)
+    return words, cum_weights
+
+def fill(database: Database, stories: int, vocabulary: int = 30000, seed: int = 7):
+    rng = random.Random(seed)
+    words, cum_weights = make_vocabulary(vocabulary, rng)
+    rows = []
+    for i in range(stories):
+        title = " ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(5, 10))).capitalize()
+        summary = ". ".join(
+            " ".join(rng.choices(words, cum_weights=cum_weights, k=rng.randint(12, 20))) for _ in range(3)
+        )
+        rows.append((f"https://example.com/{i}", title, summary, "2024-01-01T00:00:00", "2024-01-01T00:00:00"))
+
+    with database.transaction() as conn:
+        conn.executemany("""
+            INSERT INTO stories (url, title, summary, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)
+        """, rows)
+    database.connection().execute("INSERT INTO stories_fts (stories_fts) VALUES ('optimize')")
+    return words
+
+def make_queries(words):
+    """Queries across the frequency range: the most common word down to a missing one"""
+    return {
+        "most common word": words[0],
+        "10th most common": words[9],
+        "100th most common": words[99],
+        "1000th most common": words[999],
+        "two common words": f"{words[0]} {words[1]}",
+        "prefix": words[4][:3] + "*",
+        "no match": "zzzz",
+    }
+
+def measure(fn, iterations: int):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        "p50": statistics.median(samples),
+        "p95": samples[int(len(samples) * 0.95) - 1],
+        "mean": statistics.fmean(samples),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stories", type=int, default=200000)
+    parser.add_argument("--vocabulary", type=int, default=30000)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = Database(os.path.join(directory, "search.db"))
+        ArticleCache(database=database)
+        archive = StoryArchive(database=database)
+
+        started = time.perf_counter()
+        words = fill(database, args.stories, args.vocabulary)
+        print(f"indexed {args.stories} stories in {time.perf_counter() - started:.1f}s")
+
+        print(f"{'query':<22}{'hits':>6}{'p50':>10}{'p95':>10}{'mean':>10}  (ms, page of {args.limit})")
+        for label, query in make_queries(words).items():
+            hits = len(archive.search(query, limit=args.limit)["results"])
+            stats = measure(lambda: archive.search(query, limit=args.limit), args.iterations)
+            print(f"{label:<22}{hits:>6}{stats['p50']:>10.3f}{stats['p95']:>10.3f}{stats['mean']:>10.3f}")
+
+        database.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""API calls and summary latency of single-story vs batched summarization.
+
+Runs a local fake model server over HTTP whose response time grows with the
+number of summaries it writes, the way an LLM's output time does: a fixed
+round trip plus a per-summary generation cost plus a small per-character
+prompt cost. It answers batch prompts with JSON keyed by story id (dropping
+a fraction of stories with --drop-rate to exercise the single-story
+fallback) and single prompts with plain text. Stories arrive --spacing
+seconds apart, like captures finishing during a refresh, and go through
+ModelSummarizer alone or wrapped in BatchingSummarizer.
+
+Run from backend/:  python -m benchmarks.bench_summarizer --stories 30
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import re
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from src.services.summarizer import BatchingSummarizer, ModelSummarizer
+
+class FakeModelServer:
+    """Threaded HTTP server standing in for the Gemini API"""
+
+    def __init__(self, round_trip: float, per_summary: float, per_char: float, drop_rate: float, seed: int = 7):
+        self.calls = 0
+        self.lock = threading.Lock()
+        server = self
+        rng = random.Random(seed)
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                prompt = request["prompt"]
+                with server.lock:
+                    server.calls += 1
+                titles = re.findall(r"### Story (\d+)\nTitle: (.+)", prompt)
+                time.sleep(round_trip + per_summary * max(1, len(titles)) + per_char * len(prompt))
+                if titles:
+                    with server.lock:
+                        answer = {sid: f"Summary of {title}." for sid, title in titles if rng.random() >= drop_rate}
+                    text = json.dumps(answer)
+                else:
+                    text = "Summary of a single story."
+                body = json.dumps({"text": text}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/generate"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+
+class Response:
+    def __init__(self, text):
+        self.text = text
+
+class HttpModel:
+    """Model client posting prompts to the fake server, shaped like genai.GenerativeModel"""
+
+    def __init__(self, url: str, client: httpx.AsyncClient):
+        self.url = url
+        self.client = client
+
+    async def generate_content_async(self, prompt, generation_config=None):
+        response = await self.client.post(self.url, json={"prompt": prompt, "json": bool(generation_config)})
+        response.raise_for_status()
+        return Response(response.json()["text"])
+
+async def run(server: FakeModelServer, batch_size: int, stories: int, spacing: float, text_chars: int,
+              max_wait: float) -> dict:
+    server.calls = 0
+    async with httpx.AsyncClient(timeout=120, limits=httpx.Limits(max_connections=20)) as client:
+        single = ModelSummarizer(HttpModel(server.url, client), max_in_flight=4, timeout_seconds=120)
+        summarizer = single if batch_size == 1 else BatchingSummarizer(
+            single, batch_size=batch_size, max_wait_seconds=max_wait
+        )
+        text = ("The article explains the change and measures it. " * (text_chars // 50 + 1))[:text_chars]
+        latencies = []
+
+        async def story(i: int):
+            await asyncio.sleep(i * spacing)
+            started = time.perf_counter()
+            await summarizer.summarize(f"Story {i}", text)
+            latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(story(i) for i in range(stories)))
+        wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "calls": server.calls,
+        "wall_s": wall,
+        "mean_s": statistics.fmean(latencies),
+        "p95_s": latencies[int(0.95 * (len(latencies) - 1))],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stories", type=int, default=30)
+    parser.add_argument("--spacing", type=float, default=0.02, help="Seconds between stories becoming ready")
+    parser.add_argument("--text-chars", type=int, default=4000)
+    parser.add_argument("--round-trip", type=float, default=0.4)
+    parser.add_argument("--per-summary", type=float, default=0.15)
+    parser.add_argument("--per-char", type=float, default=0.000002)
+    parser.add_argument("--drop-rate", type=float, default=0.05)
+    parser.add_argument("--max-wait", type=float, default=0.5)
+    parser.add_argument("--batch-sizes", default="1,4,8,16")
+    args = parser.parse_args()
+    # Fallback warnings are expected with --drop-rate; the table reports the outcome
+    logging.getLogger("src").setLevel(logging.ERROR)
+
+    server = FakeModelServer(args.round_trip, args.per_summary, args.per_char, args.drop_rate)
+    try:
+        print(f"{args.stories} stories of {args.text_chars} chars, {args.spacing}s apart, "
+              f"{args.drop_rate:.0%} of batched stories dropped by the model, 4 requests in flight")
+        print(f"{'batch size':<12}{'API calls':>10}{'wall s':>9}{'mean s':>9}{'p95 s':>9}")
+        for batch_size in (int(size) for size in args.batch_sizes.split(",")):
+            stats = asyncio.run(run(server, batch_size, args.stories, args.spacing, args.text_chars, args.max_wait))
+            print(f"{batch_size:<12}{stats['calls']:>10}{stats['wall_s']:>9.2f}{stats['mean_s']:>9.2f}{stats['p95_s']:>9.2f}")
+    finally:
+        server.close()
+
+if __name__ == "__main__":
+    main()
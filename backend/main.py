@@ -1,16 +1,43 @@
 import os
+import json
+import time
 import asyncio
+import functools
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, HTTPException, Request, BackgroundTasks
-from fastapi.responses import JSONResponse
+from datetime import datetime
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Request, Query
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
 
+from src.models.article import Article
 from src.services.scraper import HackerNewsScraper
 from src.services.cache import ArticleCache
+from src.services.async_cache import AsyncArticleCache
+from src.services.archive import StoryArchive
+from src.services.snapshot import EncodedBody
+from src.services.database import Database
+from src.services.browser_pool import BrowserPool
+from src.services.readiness import get_readiness_strategy
+from src.services.extraction import TextExtractor
+from src.services.front_page import FEEDS, FrontPageClient, parse_feeds
+from src.services.summarizer import BatchingSummarizer, ModelSummarizer
+from src.services.quota import CircuitBreaker, QuotaScheduler
+from src.services.backfill import SummaryBackfill
+from src.services.summary_cache import SummaryCache
+from src.services.screenshot_store import ScreenshotStore
+from src.services.image_pipeline import ImagePipeline
+from src.services.refresh import RefreshCoordinator, RefreshJob
+from src.services.events import EventBroker
+from src.services.feeds import FeedPipeline
+from src.services.coordination import Lease, SharedRateLimiter
+from src.services.scheduler import RefreshScheduler, measure_churn
 from src.utils.rate_limiter import RateLimiter
+from src.utils.cursor import encode_cursor, decode_cursor
 from src.utils.logger import setup_logger
 
 # Load environment variables
@@ -21,13 +48,34 @@ logger = setup_logger()
 
 # Global instances
 scraper = None
-cache = None
-rate_limiter = RateLimiter(max_requests=5, window_seconds=300)  # 5 requests per 5 minutes
+database = None
+feeds = {}  # Feed name -> FeedPipeline, in the order FEEDS lists them
+default_feed = "top"
+browser_pool = None
+front_page = None
+summarizer = None
+summary_cache = None
+image_pipeline = None
+event_broker = None
+coordination_db = None
+summary_backfill = None
+rate_limiter = RateLimiter(
+    max_requests=5,  # 5 requests per 5 minutes
+    window_seconds=300,
+    max_clients=int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "100000")),
+)
+
+# Rows fetched per query while streaming NDJSON; memory stays bounded by one page
+NDJSON_PAGE_SIZE = 200
+
+# Idle event streams get a comment line this often so proxies keep them open
+SSE_HEARTBEAT_SECONDS = 15
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
-    global scraper, cache
+    global scraper, database, browser_pool, front_page, summarizer, summary_cache, image_pipeline
+    global default_feed, event_broker, coordination_db, rate_limiter, summary_backfill
     
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
@@ -36,17 +84,183 @@ async def lifespan(app: FastAPI):
     
     logger.info(f"GEMINI_API_KEY loaded successfully: {api_key[:10]}...")
     
-    scraper = HackerNewsScraper(api_key)
-    cache = ArticleCache("articles.db")
+    max_concurrent = int(os.getenv("SCRAPER_MAX_CONCURRENCY", "3"))
+    enabled_feeds = parse_feeds(os.getenv("FEEDS", ",".join(FEEDS)))
+    default_feed = "top" if "top" in {feed.name for feed in enabled_feeds} else enabled_feeds[0].name
+    
+    # Worker processes share rate limits and take turns refreshing through this file
+    shared_state_db = os.getenv("SHARED_STATE_DB")
+    if shared_state_db:
+        coordination_db = Database(shared_state_db, busy_timeout_ms=1000)
+        rate_limiter = SharedRateLimiter(
+            coordination_db,
+            max_requests=rate_limiter.max_requests,
+            window_seconds=rate_limiter.window_seconds,
+            max_clients=rate_limiter.max_clients,
+        )
+    
+    # Keep one warm Chromium for the lifetime of the app instead of one per refresh
+    browser_pool = BrowserPool(max_contexts=max_concurrent)
+    if not shared_state_db:
+        try:
+            await browser_pool.start()
+        except Exception as e:
+            # The pool relaunches lazily on first use, so startup can continue
+            logger.warning(f"Browser pool failed to start, will retry on first refresh: {e}")
+    
+    # One set of long-lived, tuned connections shared by every table
+    database = Database("articles.db")
+    # Every published batch is also appended to the history archive
+    archive = StoryArchive(
+        "articles.db",
+        database=database,
+        full_resolution_seconds=int(os.getenv("HISTORY_FULL_RESOLUTION_SECONDS", str(2 * 24 * 3600))),
+        retention_days=int(os.getenv("HISTORY_RETENTION_DAYS", "90")),
+    )
+    front_page = FrontPageClient()
+    # Gemini calls stay within our per-minute quotas, back off on 429/5xx and
+    # stop altogether while the API keeps failing
+    quota_scheduler = QuotaScheduler(
+        requests_per_minute=float(os.getenv("GEMINI_RPM", "15")),
+        tokens_per_minute=float(os.getenv("GEMINI_TPM", "1000000")),
+        max_retries=int(os.getenv("GEMINI_MAX_RETRIES", "3")),
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv("GEMINI_BREAKER_FAILURES", "5")),
+            reset_seconds=float(os.getenv("GEMINI_BREAKER_RESET_SECONDS", "60")),
+        ),
+    )
+    # Stories waiting for a summary at the same time share one Gemini request
+    summarizer = BatchingSummarizer(
+        ModelSummarizer.for_gemini(
+            api_key,
+            max_in_flight=int(os.getenv("SUMMARY_MAX_IN_FLIGHT", "4")),
+            timeout_seconds=float(os.getenv("SUMMARY_TIMEOUT_SECONDS", "30")),
+            scheduler=quota_scheduler,
+        ),
+        batch_size=int(os.getenv("SUMMARY_BATCH_SIZE", "8")),
+        max_wait_seconds=float(os.getenv("SUMMARY_BATCH_WAIT_SECONDS", "0.5")),
+    )
+    summary_cache = SummaryCache(
+        "articles.db",
+        ttl_seconds=int(os.getenv("SUMMARY_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+        max_entries=int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "5000")),
+        title_only_ttl_seconds=int(os.getenv("SUMMARY_CACHE_TITLE_ONLY_TTL_SECONDS", str(24 * 3600))),
+        database=database,
+    )
+    summary_cache.purge_other_versions(summarizer.model_name, summarizer.prompt_version)
+    screenshot_store = ScreenshotStore(
+        "screenshots",
+        gc_max_age_seconds=int(os.getenv("SCREENSHOT_GC_MAX_AGE_SECONDS", "3600")),
+    )
+    image_pipeline = ImagePipeline(
+        screenshot_store,
+        max_workers=int(os.getenv("IMAGE_ENCODE_WORKERS", "2")),
+    )
+    scraper = HackerNewsScraper(
+        api_key,
+        max_concurrent=max_concurrent,
+        browser_pool=browser_pool,
+        readiness=get_readiness_strategy(os.getenv("SCREENSHOT_READINESS", "dom_quiet")),
+        page_budget_seconds=float(os.getenv("SCREENSHOT_BUDGET_SECONDS", "15")),
+        front_page=front_page,
+        summarizer=summarizer,
+        summary_cache=summary_cache,
+        incremental=os.getenv("REFRESH_MODE", "incremental") != "full",
+        screenshot_store=screenshot_store,
+        image_pipeline=image_pipeline,
+        stories_per_feed=int(os.getenv("FEED_SIZE", "30")),
+        text_extractor=TextExtractor(max_chars=int(os.getenv("ARTICLE_TEXT_MAX_CHARS", "8000"))),
+    )
+    
+    # Refresh progress is pushed to clients over /api/events
+    event_broker = EventBroker(
+        buffer_size=int(os.getenv("SSE_CLIENT_BUFFER", "100")),
+        max_subscribers=int(os.getenv("SSE_MAX_CLIENTS", "1000")),
+    )
+    
+    # Every feed gets its own cache entry, refreshes and schedule; they share
+    # the database threads, the archive, the scraper and its per-URL work
+    min_interval = float(os.getenv("REFRESH_MIN_INTERVAL_SECONDS", "120"))
+    max_interval = float(os.getenv("REFRESH_MAX_INTERVAL_SECONDS", "1800"))
+    shared_threads = None
+    # One lease covers every feed, so only one worker scrapes at a time and its
+    # feeds share per-URL work in-process
+    refresh_lease = Lease(
+        coordination_db,
+        "refresh",
+        ttl_seconds=float(os.getenv("REFRESH_LEASE_SECONDS", "60")),
+    ) if shared_state_db else None
+    for feed in enabled_feeds:
+        # Handlers await the cache; SQLite work runs on a writer thread and a few reader threads
+        feed_cache = AsyncArticleCache(
+            ArticleCache("articles.db", database=database, archive=archive, feed=feed.name),
+            readers=int(os.getenv("DB_READER_THREADS", "4")),
+            # Batches published by other workers show up within this many seconds
+            revalidate_seconds=float(os.getenv("SNAPSHOT_REVALIDATE_SECONDS", "10")) if shared_state_db else None,
+            share_threads_with=shared_threads,
+        )
+        shared_threads = shared_threads or feed_cache
+        
+        # At most one refresh per feed runs at a time; concurrent callers join it,
+        # and with a shared state file only the worker holding the lease scrapes
+        coordinator = RefreshCoordinator(
+            functools.partial(run_refresh, feed.name),
+            on_event=functools.partial(publish_feed_event, feed.name),
+            lease=refresh_lease,
+        )
+        
+        # Refresh proactively, more often while the feed is churning
+        scheduler = None
+        if os.getenv("REFRESH_SCHEDULE", "on") != "off":
+            scheduler = RefreshScheduler(
+                coordinator,
+                feed_cache,
+                min_interval=min_interval * feed.cadence,
+                max_interval=max_interval * feed.cadence,
+                initial_interval=300 * feed.cadence,
+            )
+        feeds[feed.name] = FeedPipeline(feed, feed_cache, coordinator, scheduler)
+    
+    # Stories published without a summary get one once Gemini is reachable again
+    summary_backfill = SummaryBackfill(
+        {name: pipeline.cache for name, pipeline in feeds.items()},
+        scraper.summarize_story,
+        interval_seconds=float(os.getenv("SUMMARY_RETRY_SECONDS", "60")),
+        breaker=quota_scheduler.breaker,
+        on_summary=publish_backfilled_summary,
+        lease=Lease(coordination_db, "summary-backfill") if shared_state_db else None,
+    )
     
     # Create screenshots directory
     os.makedirs("screenshots", exist_ok=True)
     
+    # Pre-encode the read responses so the first request doesn't pay for it
+    for pipeline in feeds.values():
+        await pipeline.cache.refresh_snapshot()
+        if pipeline.scheduler:
+            pipeline.scheduler.start()
+    summary_backfill.start()
+    
     logger.info("Application started successfully")
     yield
     
     # Shutdown
     logger.info("Application shutting down")
+    await summary_backfill.stop()
+    for pipeline in feeds.values():
+        if pipeline.scheduler:
+            await pipeline.scheduler.stop()
+        await pipeline.coordinator.close()
+    await browser_pool.stop()
+    await front_page.aclose()
+    summarizer.close()
+    image_pipeline.close()
+    for pipeline in reversed(list(feeds.values())):
+        # The first feed's cache owns the shared threads and closes them last
+        pipeline.cache.close()
+    database.close()
+    if coordination_db:
+        coordination_db.close()
 
 app = FastAPI(
     title="HackerNews Analysis API",
@@ -71,25 +285,118 @@ app.add_middleware(
 # Serve static files
 app.mount("/screenshots", StaticFiles(directory="screenshots"), name="screenshots")
 
+def pick_encoding(accept_encoding: str, available) -> str:
+    """Choose the best pre-compressed encoding the client accepts"""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(name.strip())
+    
+    for encoding in ("br", "gzip"):
+        if encoding in available and encoding in accepted:
+            return encoding
+    return "identity"
+
+def snapshot_response(request: Request, body: EncodedBody) -> Response:
+    """Serve pre-encoded bytes, answering If-None-Match with 304"""
+    encoding = pick_encoding(request.headers.get("accept-encoding", ""), body.encodings)
+    headers = {
+        "ETag": body.etag_for(encoding),
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    
+    if body.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body.encodings[encoding], media_type="application/json", headers=headers)
+
+def wants_ndjson(request: Request, format: Optional[str]) -> bool:
+    """Stream NDJSON when asked for with ?format=ndjson or the Accept header"""
+    return format == "ndjson" or "application/x-ndjson" in request.headers.get("accept", "")
+
+def parse_cursor(cursor: Optional[str], *fields: str) -> Optional[dict]:
+    """Decode a pagination cursor, rejecting anything this endpoint did not issue"""
+    if not cursor:
+        return None
+    try:
+        position = decode_cursor(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if set(position) != set(fields) or not all(isinstance(position[f], int) for f in fields):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return position
+
+def ndjson_response(lines) -> StreamingResponse:
+    return StreamingResponse(lines, media_type="application/x-ndjson", headers={"Cache-Control": "no-cache"})
+
+def get_feed(feed: Optional[str]) -> FeedPipeline:
+    """Look up an enabled feed, the default one if none is named"""
+    pipeline = feeds.get(feed or default_feed)
+    if pipeline is None:
+        raise HTTPException(status_code=404, detail=f"Unknown feed, expected one of {list(feeds)}")
+    return pipeline
+
+def publish_feed_event(feed: str, event_type: str, data: dict):
+    """Tag a refresh event with its feed and send it to /api/events clients"""
+    event_broker.publish(event_type, {"feed": feed, **data})
+
+def publish_backfilled_summary(feed: str, article: Article):
+    """Tell /api/events clients a deferred summary has arrived"""
+    publish_feed_event(feed, "summary_done", {
+        "rank": article.rank,
+        "url": article.url,
+        "summary": article.summary,
+        "summary_status": "ready",
+    })
+
+async def stream_articles(cache: AsyncArticleCache, after):
+    """Yield every article from after onwards as NDJSON, one keyset page at a time"""
+    while True:
+        articles, after = await cache.get_articles_page(after, NDJSON_PAGE_SIZE)
+        for article in articles:
+            yield json.dumps(article.to_dict(), separators=(",", ":")) + "\n"
+        if after is None:
+            break
+
 @app.get("/")
 async def root():
     """Health check endpoint"""
     return {
         "message": "HackerNews Analysis API v2.0",
         "status": "healthy",
-        "cache_status": cache.get_cache_status() if cache else None
+        "cache_status": (await feeds[default_feed].cache.get_snapshot()).cache_status if feeds else None
     }
 
 @app.get("/api/articles")
-async def get_articles():
-    """Get cached articles"""
+async def get_articles(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    format: Optional[str] = Query(None, pattern="^(json|ndjson)$"),
+    feed: Optional[str] = None
+):
+    """Get a feed's cached articles"""
+    cache = get_feed(feed).cache
+    position = parse_cursor(cursor, "rank", "id")
+    after = (position["rank"], position["id"]) if position else None
+    
+    if wants_ndjson(request, format):
+        return ndjson_response(stream_articles(cache, after))
+    
     try:
-        articles = cache.get_articles()
-        cache_status = cache.get_cache_status()
+        if after is None and limit is None:
+            # The whole list is served from the pre-encoded snapshot
+            snapshot = await cache.get_snapshot()
+            return snapshot_response(request, snapshot.articles)
         
+        articles, next_key = await cache.get_articles_page(after, limit or 50)
         return {
             "articles": [article.to_dict() for article in articles],
-            "cache_status": cache_status,
+            "next_cursor": encode_cursor({"rank": next_key[0], "id": next_key[1]}) if next_key else None,
             "total": len(articles)
         }
         
@@ -98,67 +405,147 @@ async def get_articles():
         raise HTTPException(status_code=500, detail="Failed to retrieve articles")
 
 @app.post("/api/refresh")
-async def refresh_articles(request: Request, background_tasks: BackgroundTasks):
-    """Refresh articles from HackerNews"""
+async def refresh_articles(request: Request, feed: Optional[str] = None):
+    """Refresh a feed's articles from HackerNews"""
+    pipeline = get_feed(feed)
     client_ip = request.client.host
     
     # Rate limiting
-    if not rate_limiter.is_allowed(client_ip):
-        remaining = rate_limiter.get_remaining_requests(client_ip)
-        reset_time = rate_limiter.get_reset_time(client_ip)
-        
+    denied = await rate_limiter.check(client_ip)
+    if denied:
         raise HTTPException(
             status_code=429,
             detail={
                 "error": "Rate limit exceeded",
-                "remaining_requests": remaining,
-                "reset_time": reset_time
+                **denied
             }
         )
     
     # Check if cache is fresh
-    if cache.is_cache_fresh(max_age_minutes=2):
-        logger.info("Cache is fresh, returning cached results")
-        articles = cache.get_articles()
+    if await pipeline.cache.is_cache_fresh(max_age_minutes=2) and not pipeline.coordinator.current:
+        logger.info(f"{pipeline.feed.name} cache is fresh, returning cached results")
+        articles = await pipeline.cache.get_articles()
         return {
             "status": "cached",
             "articles": [article.to_dict() for article in articles],
             "message": "Returned cached results (updated within last 2 minutes)"
         }
     
-    # Start background refresh
-    background_tasks.add_task(refresh_articles_background)
+    # Start a refresh, or join the one already running
+    job, started = pipeline.coordinator.submit()
     
     return {
         "status": "refreshing",
-        "message": "Article refresh started in background. Check back in 30-60 seconds.",
+        "feed": pipeline.feed.name,
+        "job_id": job.id,
+        "started": started,
+        "progress_url": f"/api/refresh/{job.id}",
+        "message": "Article refresh started in background. Check back in 30-60 seconds."
+            if started else "An article refresh is already running; joined it.",
         "estimated_completion": "30-60 seconds"
     }
 
-async def refresh_articles_background():
-    """Background task to refresh articles"""
+@app.get("/api/refresh/{job_id}")
+async def get_refresh_job(job_id: str):
+    """Get the status and per-stage progress of a refresh"""
+    for pipeline in feeds.values():
+        job = pipeline.coordinator.get(job_id)
+        if job:
+            return {"feed": pipeline.feed.name, **job.to_dict()}
+    raise HTTPException(status_code=404, detail="Unknown refresh job")
+
+async def run_refresh(feed: str, job: RefreshJob):
+    """Scrape and publish one batch of a feed, reporting progress on the job"""
+    pipeline = feeds[feed]
+    cache = pipeline.cache
+    if pipeline.coordinator.lease and await published_elsewhere(cache, job):
+        return
+    
+    logger.info(f"Starting background {feed} refresh")
+    started = time.monotonic()
+    # Only stories that are new or changed since this feed's batch, and not
+    # already captured for another feed, are reprocessed
+    previous = await cache.get_articles()
+    known = [article for other in feeds.values() if other is not pipeline for article in await other.cache.get_articles()]
+    articles = await scraper.scrape_top_stories(previous=previous, progress=job, feed=pipeline.feed, known=known)
+    
+    job.start_stage("publish", 1)
+    if not await cache.save_articles(articles, duration_seconds=time.monotonic() - started):
+        raise RuntimeError("Failed to save articles")
+    job.advance("publish")
+    job.article_count = len(articles)
+    job.churn = measure_churn(previous, articles)
+    job.emit("batch_published", {
+        "batch_id": (await cache.get_cache_status()).get("batch_id"),
+        "total": len(articles)
+    })
+    logger.info(f"Successfully refreshed {len(articles)} {feed} articles")
+
+async def published_elsewhere(cache: AsyncArticleCache, job: RefreshJob) -> bool:
+    """Adopt a batch another worker published while this job waited for the lease"""
+    await cache.reload()
+    status = await cache.get_cache_status()
+    if not status.get("latest_update") or datetime.fromisoformat(status["latest_update"]) < job.created_at:
+        return False
+    
+    logger.info(f"Batch {status.get('batch_id')} was published by another worker, skipping refresh {job.id}")
+    job.article_count = status.get("total_articles")
+    job.emit("batch_published", {"batch_id": status.get("batch_id"), "total": status.get("total_articles")})
+    return True
+
+@app.get("/api/events")
+async def stream_events(request: Request, feed: Optional[str] = None):
+    """Push refresh progress and finished articles as Server-Sent Events, for one feed or all"""
+    if feed:
+        get_feed(feed)
     try:
-        logger.info("Starting background article refresh")
-        articles = await scraper.scrape_top_stories()
-        cache.save_articles(articles)
-        logger.info(f"Successfully refreshed {len(articles)} articles")
-        
-    except Exception as e:
-        logger.error(f"Background refresh failed: {e}")
+        last_event_id = int(request.headers.get("last-event-id", ""))
+    except ValueError:
+        last_event_id = None
+    
+    subscription = event_broker.subscribe(last_event_id, feed)
+    if subscription is None:
+        raise HTTPException(status_code=503, detail="Too many event stream clients")
+    
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=SSE_HEARTBEAT_SECONDS)
+                yield event.to_sse() if event else ": keep-alive\n\n"
+        finally:
+            event_broker.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.get("/api/status")
 async def get_status():
     """Get system status"""
     try:
-        cache_status = cache.get_cache_status()
+        cache_status = await feeds[default_feed].cache.get_cache_status()
         
         return {
             "system_status": "healthy",
             "cache_status": cache_status,
+            "feeds": {name: await pipeline.get_stats() for name, pipeline in feeds.items()},
+            "shared_stories": scraper.shared_stories if scraper else None,
             "rate_limit_info": {
                 "max_requests": rate_limiter.max_requests,
-                "window_seconds": rate_limiter.window_seconds
-            }
+                "window_seconds": rate_limiter.window_seconds,
+                **rate_limiter.get_stats()
+            },
+            "browser_pool": browser_pool.get_stats() if browser_pool else None,
+            "readiness": scraper.get_readiness_stats() if scraper else None,
+            "text_extraction": scraper.text_extractor.get_stats() if scraper else None,
+            "summarizer": summarizer.get_stats() if summarizer else None,
+            "summary_cache": summary_cache.get_stats() if summary_cache else None,
+            "summary_backfill": summary_backfill.get_stats() if summary_backfill else None,
+            "image_pipeline": image_pipeline.get_stats() if image_pipeline else None,
+            "events": event_broker.get_stats() if event_broker else None
         }
         
     except Exception as e:
@@ -168,13 +555,107 @@ async def get_status():
             "error": str(e)
         }
 
+def parse_timestamp(value: Optional[str], name: str) -> Optional[str]:
+    """Validate an ISO 8601 query parameter and normalize it to the stored format"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).isoformat()
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name} timestamp, expected ISO 8601")
+
+@app.get("/api/history/story")
+async def get_story_history(
+    request: Request,
+    url: str,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=5000),
+    cursor: Optional[str] = None,
+    format: Optional[str] = Query(None, pattern="^(json|ndjson)$"),
+    feed: Optional[str] = None
+):
+    """Get one story's rank and summary across archived snapshots, of one feed or all"""
+    cache = feeds[default_feed].cache
+    if feed:
+        get_feed(feed)
+    since, until = parse_timestamp(since, "since"), parse_timestamp(until, "until")
+    position = parse_cursor(cursor, "batch")
+    before_batch = position["batch"] if position else None
+    
+    if wants_ndjson(request, format):
+        async def lines():
+            before = before_batch
+            while True:
+                page = await cache.story_history(url, since, until, NDJSON_PAGE_SIZE, before, feed)
+                appearances = page["appearances"] if page else []
+                for appearance in appearances:
+                    yield json.dumps(appearance, separators=(",", ":")) + "\n"
+                if len(appearances) < NDJSON_PAGE_SIZE:
+                    break
+                before = appearances[-1]["batch_id"]
+        return ndjson_response(lines())
+    
+    history = await cache.story_history(url, since, until, limit, before_batch, feed)
+    if history is None:
+        raise HTTPException(status_code=404, detail="Story not found in history")
+    appearances = history["appearances"]
+    history["next_cursor"] = (
+        encode_cursor({"batch": appearances[-1]["batch_id"]}) if len(appearances) == limit else None
+    )
+    return history
+
+@app.get("/api/history/snapshot")
+async def get_history_snapshot(at: Optional[str] = None, feed: Optional[str] = None):
+    """Get a feed as it was at a point in time (latest if omitted)"""
+    snapshot = await get_feed(feed).cache.snapshot_at(parse_timestamp(at, "at"))
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="No snapshot at that time")
+    return snapshot
+
+@app.get("/api/history/snapshots")
+async def list_history_snapshots(
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    feed: Optional[str] = None
+):
+    """List a feed's archived snapshots in a time range"""
+    position = parse_cursor(cursor, "batch")
+    snapshots = await get_feed(feed).cache.list_snapshots(
+        parse_timestamp(since, "since"), parse_timestamp(until, "until"), limit,
+        position["batch"] if position else None
+    )
+    return {
+        "snapshots": snapshots,
+        "next_cursor": encode_cursor({"batch": snapshots[-1]["batch_id"]}) if len(snapshots) == limit else None,
+        "total": len(snapshots)
+    }
+
+@app.get("/api/search")
+async def search_stories(
+    q: str = Query(..., min_length=1, max_length=200),
+    page: int = Query(1, ge=1, le=500),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Search archived story titles and summaries of every feed"""
+    found = await feeds[default_feed].cache.search(q, limit=limit, offset=(page - 1) * limit)
+    return {
+        "query": q,
+        "page": page,
+        "limit": limit,
+        "results": found["results"],
+        "has_more": found["has_more"]
+    }
+
 # Legacy endpoint for backwards compatibility
 @app.get("/api/results")
-async def get_results_legacy():
+async def get_results_legacy(request: Request):
     """Legacy endpoint - redirects to /api/articles"""
     try:
-        articles = cache.get_articles()
-        return [article.to_dict() for article in articles]
+        snapshot = await feeds[default_feed].cache.get_snapshot()
+        return snapshot_response(request, snapshot.results)
         
     except Exception as e:
         logger.error(f"Legacy endpoint failed: {e}")
@@ -182,9 +663,9 @@ async def get_results_legacy():
 
 # Legacy endpoint for backwards compatibility
 @app.get("/run")
-async def run_legacy(request: Request, background_tasks: BackgroundTasks):
+async def run_legacy(request: Request):
     """Legacy endpoint - redirects to POST /api/refresh"""
-    return await refresh_articles(request, background_tasks)
+    return await refresh_articles(request)
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
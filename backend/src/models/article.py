@@ -1,7 +1,13 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, Optional
 from datetime import datetime
 
+# Text older versions stored as the summary when the model call failed; such stories still need one
+PLACEHOLDER_SUMMARIES = frozenset({
+    "AI summary temporarily unavailable due to API quota limits.",
+    "Unable to generate AI summary. Content analysis temporarily unavailable.",
+})
+
 @dataclass
 class Article:
     title: str
@@ -11,14 +17,40 @@ class Article:
     summary: Optional[str] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
+    rank: Optional[int] = None
+    screenshot_variants: Optional[Dict[str, str]] = None  # variant name -> stored file name
+    content_text: Optional[str] = None  # Readable page text the summary was written from; not served by the API
+    
+    @property
+    def summary_pending(self) -> bool:
+        """No real summary yet; it is retried in the background"""
+        return not self.summary or self.summary in PLACEHOLDER_SUMMARIES
+    
+    def screenshot_url(self) -> Optional[str]:
+        """Public URL of the screenshot; paths from older batches are already absolute"""
+        if not self.screenshot_path:
+            return None
+        if self.screenshot_path.startswith("/"):
+            return self.screenshot_path
+        return f"/screenshots/{self.screenshot_path}"
+    
+    def screenshot_variant_urls(self) -> Dict[str, str]:
+        """Public URLs of the encoded screenshot variants (webp, jpeg, thumbnails)"""
+        return {
+            name: f"/screenshots/{filename}"
+            for name, filename in (self.screenshot_variants or {}).items()
+        }
     
     def to_dict(self) -> dict:
         return {
             "title": self.title,
             "url": self.url,
-            "screenshot": self.screenshot_path if self.screenshot_path else None,
+            "screenshot": self.screenshot_url(),
+            "screenshot_variants": self.screenshot_variant_urls(),
             "status": self.status,
-            "summary": self.summary or "Summary not available.",
+            "summary": "Summary pending." if self.summary_pending else self.summary,
+            "summary_status": "pending" if self.summary_pending else "ready",
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "rank": self.rank,
         }
\ No newline at end of file
@@ -1,4 +1,8 @@
 from .scraper import HackerNewsScraper
 from .cache import ArticleCache
+from .browser_pool import BrowserPool
+from .front_page import FrontPageClient
+from .summarizer import ModelSummarizer, Summarizer
+from .summary_cache import SummaryCache
 
-__all__ = ["HackerNewsScraper", "ArticleCache"]
\ No newline at end of file
+__all__ = ["HackerNewsScraper", "ArticleCache", "BrowserPool", "FrontPageClient", "ModelSummarizer", "Summarizer", "SummaryCache"]
\ No newline at end of file
@@ -0,0 +1,398 @@
+import hashlib
+import html
+import re
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional
+import logging
+
+from ..models.article import Article
+from .database import Database
+
+logger = logging.getLogger(__name__)
+
+# Highlight markers that cannot occur in text, swapped for <mark> after escaping
+_MARK_OPEN, _MARK_CLOSE = "\x02", "\x03"
+_SEARCH_TERM = re.compile(r"(\w+)(\*?)", re.UNICODE)
+
+def build_match_query(query: str) -> Optional[str]:
+    """Turn free text into a safe FTS5 query: quoted terms ANDed, "term*" kept as a prefix"""
+    terms = _SEARCH_TERM.findall(query)[:16]
+    if not terms:
+        return None
+    return " ".join(f'"{term}"{star}' for term, star in terms)
+
+def _render_highlight(text: Optional[str]) -> Optional[str]:
+    if text is None:
+        return None
+    return html.escape(text).replace(_MARK_OPEN, "<mark>").replace(_MARK_CLOSE, "</mark>")
+
+class StoryArchive:
+    """Append-only history of every published batch.
+
+    Each refresh_batches row is a snapshot. Stories are stored once per URL
+    and summaries once per distinct text; snapshot_stories links a snapshot
+    to its stories with their rank. Snapshots younger than
+    full_resolution_seconds are all kept, older ones are thinned to one per
+    hour and anything past retention_days is dropped.
+
+    stories_fts indexes each story's latest title and summary. Triggers on
+    stories keep it in sync with every save and compaction. Search ranks at
+    most search_candidates of the newest matches, so terms that appear in
+    most stories cost the same as rare ones.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "articles.db",
+        database: Optional[Database] = None,
+        full_resolution_seconds: int = 2 * 24 * 3600,
+        retention_days: int = 90,
+        compact_interval_seconds: int = 3600,
+        search_candidates: int = 2000,
+    ):
+        self.db_path = db_path
+        self.db = database or Database(db_path)
+        self.full_resolution_seconds = full_resolution_seconds
+        self.retention_days = retention_days
+        self.compact_interval_seconds = compact_interval_seconds
+        self.search_candidates = search_candidates
+        self._last_compacted = 0.0
+        self.db.ensure_schema("archive", self._init_db)
+
+    def _init_db(self, conn: sqlite3.Connection):
+        """Initialize the archive tables"""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS stories (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL UNIQUE,
+                title TEXT NOT NULL,
+                summary TEXT,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL
+            )
+        """)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(stories)")}
+        if "summary" not in columns:
+            conn.execute("ALTER TABLE stories ADD COLUMN summary TEXT")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS story_summaries (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                story_id INTEGER NOT NULL,
+                summary_hash TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                UNIQUE (story_id, summary_hash)
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS snapshot_stories (
+                batch_id INTEGER NOT NULL,
+                story_id INTEGER NOT NULL,
+                rank INTEGER,
+                title TEXT NOT NULL,
+                status TEXT NOT NULL,
+                summary_id INTEGER,
+                screenshot_path TEXT,
+                PRIMARY KEY (batch_id, story_id)
+            ) WITHOUT ROWID
+        """)
+        # "Story over time": one story's rows in batch order
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_snapshot_stories_story ON snapshot_stories(story_id, batch_id)
+        """)
+        self._init_search(conn)
+
+    def _init_search(self, conn: sqlite3.Connection):
+        """Create the full-text index over stories and the triggers that maintain it"""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stories_fts'"
+        ).fetchone()
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS stories_fts USING fts5(
+                title, summary,
+                content='stories', content_rowid='id',
+                tokenize='porter unicode61 remove_diacritics 2',
+                prefix='2 3'
+            )
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS stories_fts_insert AFTER INSERT ON stories BEGIN
+                INSERT INTO stories_fts (rowid, title, summary) VALUES (new.id, new.title, new.summary);
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS stories_fts_delete AFTER DELETE ON stories BEGIN
+                INSERT INTO stories_fts (stories_fts, rowid, title, summary)
+                VALUES ('delete', old.id, old.title, old.summary);
+            END
+        """)
+        # Every save touches last_seen; only reindex when the text actually changed
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS stories_fts_update AFTER UPDATE OF title, summary ON stories
+            WHEN old.title IS NOT new.title OR old.summary IS NOT new.summary BEGIN
+                INSERT INTO stories_fts (stories_fts, rowid, title, summary)
+                VALUES ('delete', old.id, old.title, old.summary);
+                INSERT INTO stories_fts (rowid, title, summary) VALUES (new.id, new.title, new.summary);
+            END
+        """)
+        if not exists:
+            conn.execute("INSERT INTO stories_fts (stories_fts) VALUES ('rebuild')")
+
+    def record(self, conn: sqlite3.Connection, batch_id: int, published_at: str, articles: List[Article]):
+        """Append a published batch; runs inside the caller's save transaction"""
+        rows = []
+        for article in articles:
+            story_id = conn.execute("""
+                INSERT INTO stories (url, title, summary, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    title = excluded.title,
+                    summary = COALESCE(excluded.summary, stories.summary),
+                    last_seen = excluded.last_seen
+                RETURNING id
+            """, (article.url, article.title, article.summary, published_at, published_at)).fetchone()[0]
+
+            summary_id = self._summary_id(conn, story_id, article.summary) if article.summary else None
+            rows.append((batch_id, story_id, article.rank, article.title, article.status, summary_id, article.screenshot_path))
+
+        conn.executemany("""
+            INSERT OR REPLACE INTO snapshot_stories
+            (batch_id, story_id, rank, title, status, summary_id, screenshot_path)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+
+    @staticmethod
+    def _summary_id(conn: sqlite3.Connection, story_id: int, summary: str) -> int:
+        summary_hash = hashlib.sha256(summary.encode("utf-8")).hexdigest()
+        conn.execute("""
+            INSERT OR IGNORE INTO story_summaries (story_id, summary_hash, summary)
+            VALUES (?, ?, ?)
+        """, (story_id, summary_hash, summary))
+        return conn.execute(
+            "SELECT id FROM story_summaries WHERE story_id = ? AND summary_hash = ?",
+            (story_id, summary_hash)
+        ).fetchone()[0]
+
+    def update_summary(self, conn: sqlite3.Connection, url: str, summary: str):
+        """Record a deferred summary on the story and on each feed's latest snapshot that lacked it"""
+        row = conn.execute("SELECT id FROM stories WHERE url = ?", (url,)).fetchone()
+        if not row:
+            return
+        story_id = row[0]
+        conn.execute("UPDATE stories SET summary = ? WHERE id = ?", (summary, story_id))
+        conn.execute("""
+            UPDATE snapshot_stories SET summary_id = ?
+            WHERE story_id = ? AND summary_id IS NULL
+              AND batch_id IN (SELECT MAX(id) FROM refresh_batches GROUP BY feed)
+        """, (self._summary_id(conn, story_id, summary), story_id))
+
+    def story_history(
+        self,
+        url: str,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 500,
+        before_batch: Optional[int] = None,
+        feed: Optional[str] = None,
+    ) -> Optional[dict]:
+        """Get a story's rank, title and summary in every snapshot it appeared in, newest first"""
+        try:
+            conn = self.db.connection()
+            story = conn.execute("SELECT * FROM stories WHERE url = ?", (url,)).fetchone()
+            if not story:
+                return None
+
+            first_batch, last_batch = self._batch_range(conn, since, until)
+            if before_batch is not None:
+                last_batch = min(last_batch, before_batch - 1)
+            cursor = conn.execute("""
+                SELECT b.id AS batch_id, b.feed, b.published_at, s.rank, s.title, s.status, s.screenshot_path, m.summary
+                FROM snapshot_stories s
+                JOIN refresh_batches b ON b.id = s.batch_id
+                LEFT JOIN story_summaries m ON m.id = s.summary_id
+                WHERE s.story_id = ? AND s.batch_id BETWEEN ? AND ? AND (? IS NULL OR b.feed = ?)
+                ORDER BY s.batch_id DESC
+                LIMIT ?
+            """, (story["id"], first_batch, last_batch, feed, feed, limit))
+
+            return {
+                "url": story["url"],
+                "title": story["title"],
+                "first_seen": story["first_seen"],
+                "last_seen": story["last_seen"],
+                "appearances": [dict(row) for row in cursor.fetchall()],
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to read story history: {e}")
+            return None
+
+    def snapshot_at(self, at: Optional[str] = None, feed: str = "top") -> Optional[dict]:
+        """Get a feed's snapshot that was current at a point in time (latest if None)"""
+        try:
+            conn = self.db.connection()
+            batch = conn.execute("""
+                SELECT * FROM refresh_batches WHERE feed = ? AND published_at <= ?
+                ORDER BY published_at DESC, id DESC LIMIT 1
+            """, (feed, at or "9999")).fetchone()
+            if not batch:
+                return None
+
+            cursor = conn.execute("""
+                SELECT s.rank, s.title, t.url, s.status, s.screenshot_path, m.summary
+                FROM snapshot_stories s
+                JOIN stories t ON t.id = s.story_id
+                LEFT JOIN story_summaries m ON m.id = s.summary_id
+                WHERE s.batch_id = ?
+                ORDER BY s.rank IS NULL, s.rank
+            """, (batch["id"],))
+
+            return {
+                "batch_id": batch["id"],
+                "feed": batch["feed"],
+                "published_at": batch["published_at"],
+                "stories": [dict(row) for row in cursor.fetchall()],
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to read snapshot: {e}")
+            return None
+
+    def list_snapshots(
+        self,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 100,
+        before_batch: Optional[int] = None,
+        feed: str = "top",
+    ) -> List[dict]:
+        """List a feed's snapshots published in a time range, newest first"""
+        try:
+            # Ids grow with publish time, so id order doubles as the keyset for paging
+            cursor = self.db.connection().execute("""
+                SELECT id AS batch_id, feed, published_at, total_articles, successful_articles, duration_seconds
+                FROM refresh_batches
+                WHERE feed = ? AND published_at >= ? AND published_at <= ? AND id < ?
+                ORDER BY id DESC
+                LIMIT ?
+            """, (feed, since or "", until or "9999", before_batch if before_batch is not None else 2 ** 63 - 1, limit))
+            return [dict(row) for row in cursor.fetchall()]
+
+        except Exception as e:
+            logger.error(f"Failed to list snapshots: {e}")
+            return []
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> dict:
+        """Full-text search over story titles and summaries, best matches first"""
+        match = build_match_query(query)
+        if not match:
+            return {"results": [], "has_more": False}
+        try:
+            conn = self.db.connection()
+            # Only the newest matches are ranked: walking the doclist backwards by rowid is
+            # cheap, scoring every match of a very common term is not. Title hits weigh more,
+            # and one extra row tells if there is a next page.
+            ranked = conn.execute("""
+                SELECT rowid, bm25(stories_fts, 4.0, 1.0) AS score
+                FROM stories_fts
+                WHERE stories_fts MATCH ? AND rowid >= (
+                    SELECT COALESCE(MIN(rowid), 0) FROM (
+                        SELECT rowid FROM stories_fts WHERE stories_fts MATCH ?
+                        ORDER BY rowid DESC LIMIT ?
+                    )
+                )
+                ORDER BY score
+                LIMIT ? OFFSET ?
+            """, (match, match, self.search_candidates, limit + 1, offset)).fetchall()
+            page = ranked[:limit]
+            if not page:
+                return {"results": [], "has_more": False}
+
+            # Highlights and snippets are built for the returned page only
+            placeholders = ",".join("?" * len(page))
+            cursor = conn.execute(f"""
+                SELECT s.id, s.url, s.title, s.summary, s.first_seen, s.last_seen,
+                       highlight(stories_fts, 0, ?, ?) AS title_highlight,
+                       snippet(stories_fts, 1, ?, ?, '…', 24) AS summary_snippet
+                FROM stories_fts
+                JOIN stories s ON s.id = stories_fts.rowid
+                WHERE stories_fts MATCH ? AND stories_fts.rowid IN ({placeholders})
+            """, (_MARK_OPEN, _MARK_CLOSE, _MARK_OPEN, _MARK_CLOSE, match, *[row["rowid"] for row in page]))
+            details = {row["id"]: row for row in cursor.fetchall()}
+
+            results = []
+            for row in page:
+                result = dict(details[row["rowid"]])
+                result["score"] = row["score"]
+                result["title_highlight"] = _render_highlight(result["title_highlight"])
+                result["summary_snippet"] = _render_highlight(result["summary_snippet"])
+                results.append(result)
+            return {"results": results, "has_more": len(ranked) > limit}
+
+        except Exception as e:
+            logger.error(f"Failed to search archive: {e}")
+            return {"results": [], "has_more": False}
+
+    def _batch_range(self, conn: sqlite3.Connection, since: Optional[str], until: Optional[str]):
+        """Translate a time range into a batch id range (ids grow with time)"""
+        if not since and not until:
+            return 0, 2 ** 63 - 1
+        row = conn.execute("""
+            SELECT MIN(id), MAX(id) FROM refresh_batches
+            WHERE published_at >= ? AND published_at <= ?
+        """, (since or "", until or "9999")).fetchone()
+        if row[0] is None:
+            return 0, -1
+        return row[0], row[1]
+
+    def maybe_compact(self):
+        """Compact if compact_interval_seconds passed since the last run"""
+        if time.monotonic() - self._last_compacted < self.compact_interval_seconds:
+            return
+        self._last_compacted = time.monotonic()
+        self.compact()
+
+    def compact(self, now: Optional[datetime] = None) -> int:
+        """Apply the retention policy and drop rows no snapshot references"""
+        now = now or datetime.now()
+        thin_before = (now - timedelta(seconds=self.full_resolution_seconds)).isoformat()
+        drop_before = (now - timedelta(days=self.retention_days)).isoformat()
+        try:
+            with self.db.transaction() as conn:
+                # Each feed's latest snapshot is always kept
+                latest = "SELECT MAX(id) FROM refresh_batches GROUP BY feed"
+                dropped = conn.execute(f"""
+                    DELETE FROM refresh_batches WHERE published_at < ? AND id NOT IN ({latest})
+                """, (drop_before,)).rowcount
+                # Past full resolution keep only the first snapshot of each hour, per feed
+                dropped += conn.execute(f"""
+                    DELETE FROM refresh_batches
+                    WHERE published_at < ? AND id NOT IN ({latest}) AND id NOT IN (
+                        SELECT MIN(id) FROM refresh_batches
+                        WHERE published_at < ?
+                        GROUP BY feed, substr(published_at, 1, 13)
+                    )
+                """, (thin_before, thin_before)).rowcount
+
+                if dropped:
+                    conn.execute("""
+                        DELETE FROM snapshot_stories
+                        WHERE batch_id NOT IN (SELECT id FROM refresh_batches)
+                    """)
+                    conn.execute("""
+                        DELETE FROM story_summaries
+                        WHERE id NOT IN (SELECT summary_id FROM snapshot_stories WHERE summary_id IS NOT NULL)
+                    """)
+                    conn.execute("""
+                        DELETE FROM stories
+                        WHERE id NOT IN (SELECT story_id FROM snapshot_stories)
+                    """)
+
+            if dropped:
+                logger.info(f"Compacted archive: dropped {dropped} snapshots")
+            return dropped
+
+        except Exception as e:
+            logger.error(f"Failed to compact archive: {e}")
+            return 0
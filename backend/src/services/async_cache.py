@@ -0,0 +1,166 @@
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, List, Optional, Tuple
+
+from ..models.article import Article
+from .cache import ArticleCache
+from .snapshot import ArticleSnapshot, build_snapshot
+
+logger = logging.getLogger(__name__)
+
+class AsyncArticleCache:
+    """Async facade over ArticleCache for the request handlers.
+
+    Writes run on a single dedicated thread, so the writer connection is
+    confined to it. Reads run on a small pool of reader threads, each with
+    its own connection. With WAL enabled a refresh that is writing never
+    blocks readers, and no handler blocks the event loop on SQLite.
+
+    It also keeps the pre-serialized snapshot served by the read endpoints,
+    rebuilt after every successful save. When other processes publish to
+    the same database, revalidate_seconds bounds how long the snapshot can
+    lag behind their batches.
+
+    Caches of other feeds on the same database can share this one's threads
+    (share_threads_with), so every feed still goes through a single writer.
+    """
+
+    def __init__(self, cache: ArticleCache, readers: int = 4, fresh_minutes: int = 5,
+                 revalidate_seconds: Optional[float] = None,
+                 share_threads_with: Optional["AsyncArticleCache"] = None):
+        self.cache = cache
+        self.fresh_minutes = fresh_minutes  # Same window get_cache_status uses for is_fresh
+        self.revalidate_seconds = revalidate_seconds
+        self._owns_threads = share_threads_with is None
+        if share_threads_with:
+            self._writer, self._readers = share_threads_with._writer, share_threads_with._readers
+        else:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db-writer")
+            self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="db-reader")
+        self._snapshot: Optional[ArticleSnapshot] = None
+        self._snapshot_lock = asyncio.Lock()
+        self._revalidation: Optional[asyncio.Task] = None
+
+    async def _read(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, functools.partial(fn, *args, **kwargs))
+
+    async def _write(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, functools.partial(fn, *args, **kwargs))
+
+    async def get_articles(self) -> List[Article]:
+        return await self._read(self.cache.get_articles)
+
+    async def get_articles_page(
+        self,
+        after: Optional[Tuple[int, int]] = None,
+        limit: int = 50
+    ) -> Tuple[List[Article], Optional[Tuple[int, int]]]:
+        # Each page is its own query, so a stream can hop between reader threads
+        return await self._read(self.cache.get_articles_page, after, limit)
+
+    async def is_cache_fresh(self, max_age_minutes: int = 5) -> bool:
+        # Answered from in-memory batch metadata, no thread hop needed
+        return self.cache.is_cache_fresh(max_age_minutes)
+
+    async def get_cache_status(self) -> dict:
+        return self.cache.get_cache_status()
+
+    async def reload(self) -> bool:
+        """Pick up a batch another process published, rebuilding the snapshot if there is one"""
+        changed = await self._read(self.cache.reload_latest_batch)
+        if changed:
+            await self.refresh_snapshot()
+        return changed
+
+    async def save_articles(self, articles: List[Article], duration_seconds: Optional[float] = None) -> bool:
+        saved = await self._write(self.cache.save_articles, articles, duration_seconds)
+        if saved:
+            await self.refresh_snapshot()
+        return saved
+
+    async def get_pending_summaries(self, limit: int = 50) -> List[Article]:
+        return await self._read(self.cache.get_pending_summaries, limit)
+
+    async def update_summary(self, url: str, summary: str) -> int:
+        # Rows of other feeds change too; the caller rebuilds the snapshots that show them
+        return await self._write(self.cache.update_summary, url, summary)
+
+    async def story_history(self, url: str, since: Optional[str] = None, until: Optional[str] = None,
+                            limit: int = 500, before_batch: Optional[int] = None,
+                            feed: Optional[str] = None) -> Optional[dict]:
+        if not self.cache.archive:
+            return None
+        return await self._read(self.cache.archive.story_history, url, since, until, limit, before_batch, feed)
+
+    async def snapshot_at(self, at: Optional[str] = None) -> Optional[dict]:
+        if not self.cache.archive:
+            return None
+        return await self._read(self.cache.archive.snapshot_at, at, self.cache.feed)
+
+    async def list_snapshots(self, since: Optional[str] = None, until: Optional[str] = None,
+                             limit: int = 100, before_batch: Optional[int] = None) -> List[dict]:
+        if not self.cache.archive:
+            return []
+        return await self._read(self.cache.archive.list_snapshots, since, until, limit, before_batch, self.cache.feed)
+
+    async def search(self, query: str, limit: int = 20, offset: int = 0) -> dict:
+        if not self.cache.archive:
+            return {"results": [], "has_more": False}
+        return await self._read(self.cache.archive.search, query, limit, offset)
+
+    async def get_snapshot(self) -> ArticleSnapshot:
+        """Get the pre-encoded read responses, building them only when needed"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            async with self._snapshot_lock:
+                if self._snapshot is None:
+                    self._snapshot = await self._read(self._build_snapshot)
+                snapshot = self._snapshot
+        elif snapshot.is_stale() and (self._revalidation is None or self._revalidation.done()):
+            # Stale-while-revalidate: answer from the last snapshot and rebuild behind it
+            self._revalidation = asyncio.create_task(self._revalidate())
+        return snapshot
+
+    async def _revalidate(self):
+        try:
+            async with self._snapshot_lock:
+                if self._snapshot is None or self._snapshot.is_stale():
+                    self._snapshot = await self._read(self._build_snapshot)
+        except Exception as e:
+            logger.error(f"Failed to rebuild snapshot: {e}")
+
+    async def refresh_snapshot(self) -> ArticleSnapshot:
+        """Rebuild the snapshot from the database"""
+        async with self._snapshot_lock:
+            self._snapshot = await self._read(self._build_snapshot)
+            return self._snapshot
+
+    def _build_snapshot(self) -> ArticleSnapshot:
+        revalidate_at = None
+        if self.revalidate_seconds:
+            self.cache.reload_latest_batch()
+            revalidate_at = time.time() + self.revalidate_seconds
+        articles = self.cache.get_articles()
+        cache_status = self.cache.get_cache_status()
+
+        fresh_until = None
+        if cache_status.get("latest_update"):
+            latest_update = datetime.fromisoformat(cache_status["latest_update"])
+            fresh_until = (latest_update + timedelta(minutes=self.fresh_minutes)).timestamp()
+
+        snapshot = build_snapshot(articles, cache_status, fresh_until, revalidate_at)
+        logger.info(f"Built response snapshot for {len(articles)} articles (etag {snapshot.articles.etag[:12]})")
+        return snapshot
+
+    def close(self):
+        """Let queued writes finish, then stop the worker threads"""
+        if not self._owns_threads:
+            return
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=False, cancel_futures=True)
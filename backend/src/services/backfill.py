@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..models.article import Article
+from .async_cache import AsyncArticleCache
+from .coordination import Lease, run_holding_lease
+from .quota import CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+class SummaryBackfill:
+    """Summarizes stories whose summary was deferred, once the model can take them.
+
+    Refreshes publish a story without a summary when its model call fails
+    or the circuit breaker is open. Every interval_seconds this collects
+    the stories still waiting across all feeds, summarizes each URL once
+    (all at the same time, so a batching summarizer sends them together),
+    writes the summary to every feed that lists the story and rebuilds those
+    feeds' snapshots. It does not call the model while the breaker is open.
+    With a lease, only the process holding it runs, renewing it until the
+    run ends.
+    """
+
+    def __init__(
+        self,
+        caches: Dict[str, AsyncArticleCache],
+        summarize: Callable[[str, str, Optional[str]], Awaitable[str]],
+        interval_seconds: float = 60.0,
+        max_per_run: int = 30,
+        breaker: Optional[CircuitBreaker] = None,
+        on_summary: Optional[Callable[[str, Article], None]] = None,
+        lease: Optional[Lease] = None,
+    ):
+        self.caches = caches
+        self.summarize = summarize
+        self.interval_seconds = interval_seconds
+        self.max_per_run = max_per_run
+        self.breaker = breaker
+        self.on_summary = on_summary  # Called with (feed, article) once an article's summary is stored
+        self.lease = lease
+        self.stats = {"runs": 0, "filled": 0, "failed": 0, "skipped": 0}
+        self.next_run_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = asyncio.Event()
+
+    def start(self):
+        if self._task is None:
+            self._stopped.clear()
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while not self._stopped.is_set():
+            # An open breaker decides when the model is worth trying again
+            delay = max(self.interval_seconds, self.breaker.retry_in() if self.breaker else 0.0)
+            self.next_run_at = time.time() + delay
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=delay)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Summary backfill failed: {e}")
+
+    async def run_once(self) -> int:
+        """Summarize the stories waiting for one; returns how many got a summary"""
+        if self.breaker and self.breaker.state == CircuitBreaker.OPEN:
+            self.stats["skipped"] += 1
+            return 0
+        if self.lease and not await asyncio.to_thread(self.lease.acquire):
+            self.stats["skipped"] += 1
+            return 0
+
+        try:
+            if self.lease:
+                # Retries behind the quota can outlast the TTL; renew so no other process refills the same stories
+                return await run_holding_lease(self.lease, self._fill())
+            return await self._fill()
+        finally:
+            if self.lease:
+                await asyncio.to_thread(self.lease.release)
+
+    async def _fill(self) -> int:
+        # URL -> the feeds listing it; a story on several feeds is summarized once
+        pending: Dict[str, List[Tuple[str, Article]]] = {}
+        for feed, cache in self.caches.items():
+            for article in await cache.get_pending_summaries(self.max_per_run):
+                pending.setdefault(article.url, []).append((feed, article))
+        if not pending:
+            return 0
+
+        self.stats["runs"] += 1
+        stories = list(pending.values())[:self.max_per_run]
+        logger.info(f"Retrying {len(stories)} deferred summaries")
+        results = await asyncio.gather(
+            *(self.summarize(article.title, article.url, article.content_text)
+              for article in (listings[0][1] for listings in stories)),
+            return_exceptions=True,
+        )
+
+        filled = []
+        for listings, result in zip(stories, results):
+            feed, article = listings[0]
+            if isinstance(result, Exception):
+                self.stats["failed"] += 1
+                logger.warning(f"Deferred summary for {article.url} failed again: {result}")
+                continue
+            # One write fills the story in every feed's rows and the archive
+            if await self.caches[feed].update_summary(article.url, result):
+                filled.append((listings, result))
+        self.stats["filled"] += len(filled)
+
+        for feed in {feed for listings, _ in filled for feed, _ in listings}:
+            await self.caches[feed].refresh_snapshot()
+        if self.on_summary:
+            for listings, summary in filled:
+                for feed, article in listings:
+                    article.summary = summary
+                    self.on_summary(feed, article)
+
+        logger.info(f"Filled {len(filled)} of {len(stories)} deferred summaries")
+        return len(filled)
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "next_run_at": self.next_run_at}
@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
+
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LAUNCH_ARGS = ['--no-sandbox', '--disable-dev-shm-usage', '--disable-web-security']
+DEFAULT_VIEWPORT = {'width': 1200, 'height': 800}
+
+class BrowserPool:
+    """Long-lived Chromium instance handing out isolated browser contexts.
+
+    The browser is launched once and shared across refreshes. Every lease gets
+    a context that has never been used before, so cookies and storage never
+    leak between stories; a few of them are created ahead of time so a lease
+    usually doesn't pay for context creation. A crashed browser is relaunched
+    on the next lease.
+    """
+
+    def __init__(
+        self,
+        max_contexts: int = 3,
+        warm_contexts: int = 1,
+        launch_args: Optional[List[str]] = None,
+        viewport: Optional[dict] = None,
+    ):
+        if max_contexts < 1:
+            raise ValueError("max_contexts must be at least 1")
+
+        self.max_contexts = max_contexts
+        self.warm_contexts = max(0, min(warm_contexts, max_contexts))
+        self.launch_args = launch_args if launch_args is not None else DEFAULT_LAUNCH_ARGS
+        self.viewport = viewport or DEFAULT_VIEWPORT
+
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._idle: List[BrowserContext] = []
+        self._semaphore = asyncio.Semaphore(max_contexts)
+        self._launch_lock = asyncio.Lock()
+        self._replenish_task: Optional[asyncio.Task] = None
+        self._closed = False
+
+        self.stats = {
+            "launches": 0,
+            "restarts": 0,
+            "leases": 0,
+            "browser_reuses": 0,
+            "warm_hits": 0,
+            "active_contexts": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+        }
+
+    async def __aenter__(self) -> "BrowserPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    async def start(self):
+        """Launch the browser and pre-create warm contexts"""
+        self._closed = False
+        await self._ensure_browser()
+        await self._replenish()
+
+    async def stop(self):
+        """Close all contexts, the browser and the Playwright driver"""
+        self._closed = True
+        if self._replenish_task:
+            self._replenish_task.cancel()
+            self._replenish_task = None
+
+        await self._close_idle()
+        if self._browser:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                logger.warning(f"Failed to close browser: {e}")
+            self._browser = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+        logger.info("Browser pool stopped")
+
+    def is_healthy(self) -> bool:
+        """Check whether the shared browser is running"""
+        return self._browser is not None and self._browser.is_connected()
+
+    def get_stats(self) -> dict:
+        """Get pool usage statistics"""
+        leases = self.stats["leases"]
+        return {
+            **self.stats,
+            "wait_time_avg": self.stats["wait_time_total"] / leases if leases else 0.0,
+            "idle_contexts": len(self._idle),
+            "healthy": self.is_healthy(),
+        }
+
+    @asynccontextmanager
+    async def context(self) -> AsyncIterator[BrowserContext]:
+        """Lease an isolated browser context; it is closed when released"""
+        wait_started = time.perf_counter()
+        async with self._semaphore:
+            waited = time.perf_counter() - wait_started
+            self.stats["wait_time_total"] += waited
+            self.stats["wait_time_max"] = max(self.stats["wait_time_max"], waited)
+
+            context = await self._acquire_context()
+            self.stats["leases"] += 1
+            self.stats["active_contexts"] += 1
+            try:
+                yield context
+            finally:
+                self.stats["active_contexts"] -= 1
+                try:
+                    await context.close()
+                except Exception as e:
+                    logger.debug(f"Failed to close browser context: {e}")
+                self._schedule_replenish()
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """Lease a fresh page in its own isolated context"""
+        async with self.context() as context:
+            yield await context.new_page()
+
+    async def _acquire_context(self) -> BrowserContext:
+        """Hand out a warm context if one is ready, otherwise create one"""
+        relaunched = await self._ensure_browser()
+        if not relaunched:
+            self.stats["browser_reuses"] += 1
+
+        while self._idle:
+            context = self._idle.pop()
+            if context.browser and context.browser.is_connected():
+                self.stats["warm_hits"] += 1
+                return context
+
+        try:
+            return await self._new_context()
+        except Exception as e:
+            # The browser may have died between the health check and now
+            logger.warning(f"Context creation failed, restarting browser: {e}")
+            await self._restart_browser()
+            return await self._new_context()
+
+    async def _new_context(self) -> BrowserContext:
+        return await self._browser.new_context(
+            viewport=self.viewport,
+            ignore_https_errors=True
+        )
+
+    async def _ensure_browser(self) -> bool:
+        """Launch or relaunch the browser if needed; returns True if it (re)launched"""
+        if self.is_healthy():
+            return False
+
+        async with self._launch_lock:
+            if self.is_healthy():
+                return False
+
+            if self._browser is not None:
+                logger.warning("Browser is not connected, restarting")
+                self.stats["restarts"] += 1
+                self._idle.clear()
+
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+
+            self._browser = await self._playwright.chromium.launch(
+                headless=True,
+                args=self.launch_args
+            )
+            self.stats["launches"] += 1
+            logger.info(f"Launched Chromium (launch #{self.stats['launches']})")
+            return True
+
+    async def _restart_browser(self):
+        async with self._launch_lock:
+            await self._close_idle()
+            if self._browser:
+                try:
+                    await self._browser.close()
+                except Exception:
+                    pass
+        await self._ensure_browser()
+
+    async def _close_idle(self):
+        idle, self._idle = self._idle, []
+        for context in idle:
+            try:
+                await context.close()
+            except Exception:
+                pass
+
+    def _schedule_replenish(self):
+        if self._closed or len(self._idle) >= self.warm_contexts:
+            return
+        if self._replenish_task and not self._replenish_task.done():
+            return
+        self._replenish_task = asyncio.create_task(self._replenish())
+
+    async def _replenish(self):
+        """Top the warm context list back up"""
+        try:
+            while not self._closed and len(self._idle) < self.warm_contexts and self.is_healthy():
+                self._idle.append(await self._new_context())
+        except Exception as e:
+            logger.warning(f"Failed to pre-create browser context: {e}")
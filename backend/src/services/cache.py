@@ -1,69 +1,247 @@
 import json
 import sqlite3
-import os
-import glob
-from typing import List, Optional
+from collections import Counter
+from typing import List, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
 
-from ..models.article import Article
+from ..models.article import PLACEHOLDER_SUMMARIES, Article
+from .archive import StoryArchive
+from .database import Database
 
 logger = logging.getLogger(__name__)
 
+# Unranked rows sort after every ranked one in the keyset order
+UNRANKED = 2 ** 31 - 1
+
 class ArticleCache:
-    def __init__(self, db_path: str = "articles.db"):
+    def __init__(
+        self,
+        db_path: str = "articles.db",
+        database: Optional[Database] = None,
+        archive: Optional[StoryArchive] = None,
+        feed: str = "top",
+    ):
         self.db_path = db_path
-        self._init_db()
+        self.db = database or Database(db_path)
+        self.db.ensure_schema("articles", self._init_db)
+        self.archive = archive
+        self.feed = feed  # Every feed keeps its own articles and batches in the shared tables
+        # Metadata of the latest published batch; status and freshness checks read only this
+        self._latest_batch: Optional[dict] = self._load_latest_batch()
 
-    def _init_db(self):
+    def _init_db(self, conn: sqlite3.Connection):
         """Initialize SQLite database"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS articles (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    url TEXT NOT NULL UNIQUE,
-                    screenshot_path TEXT,
-                    status TEXT NOT NULL,
-                    summary TEXT,
-                    created_at TIMESTAMP,
-                    updated_at TIMESTAMP
-                )
-            """)
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_articles_created_at ON articles(created_at)
-            """)
-            conn.commit()
-
-    def save_articles(self, articles: List[Article]) -> bool:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                url TEXT NOT NULL,
+                screenshot_path TEXT,
+                status TEXT NOT NULL,
+                summary TEXT,
+                created_at TIMESTAMP,
+                updated_at TIMESTAMP,
+                rank INTEGER,
+                screenshot_variants TEXT,
+                feed TEXT NOT NULL DEFAULT 'top',
+                content_text TEXT,
+                UNIQUE (feed, url)
+            )
+        """)
+
+        # Databases created by older versions lack the newer columns
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(articles)")}
+        for column, column_type in [("rank", "INTEGER"), ("screenshot_variants", "TEXT"), ("content_text", "TEXT")]:
+            if column not in columns:
+                conn.execute(f"ALTER TABLE articles ADD COLUMN {column} {column_type}")
+        if "feed" not in columns:
+            self._add_feed_to_articles(conn)
+
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_articles_created_at ON articles(created_at)
+        """)
+        # Keyset pagination walks this index instead of sorting the table
+        conn.execute(f"""
+            CREATE INDEX IF NOT EXISTS idx_articles_feed_rank_key ON articles(feed, COALESCE(rank, {UNRANKED}), id)
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS refresh_batches (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                published_at TEXT NOT NULL,
+                total_articles INTEGER NOT NULL,
+                successful_articles INTEGER NOT NULL,
+                status_counts TEXT NOT NULL,
+                duration_seconds REAL
+            )
+        """)
+        if "feed" not in {row[1] for row in conn.execute("PRAGMA table_info(refresh_batches)")}:
+            conn.execute("ALTER TABLE refresh_batches ADD COLUMN feed TEXT NOT NULL DEFAULT 'top'")
+        # Snapshot lookups by time go through published_at
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_refresh_batches_published_at ON refresh_batches(published_at)
+        """)
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_refresh_batches_feed ON refresh_batches(feed, published_at)
+        """)
+
+    @staticmethod
+    def _add_feed_to_articles(conn: sqlite3.Connection):
+        """Rebuild a pre-feed articles table, whose URLs were unique across everything, as the top feed"""
+        conn.execute("ALTER TABLE articles RENAME TO articles_legacy")
+        conn.execute("""
+            CREATE TABLE articles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                url TEXT NOT NULL,
+                screenshot_path TEXT,
+                status TEXT NOT NULL,
+                summary TEXT,
+                created_at TIMESTAMP,
+                updated_at TIMESTAMP,
+                rank INTEGER,
+                screenshot_variants TEXT,
+                feed TEXT NOT NULL DEFAULT 'top',
+                content_text TEXT,
+                UNIQUE (feed, url)
+            )
+        """)
+        conn.execute("""
+            INSERT INTO articles
+            (id, title, url, screenshot_path, status, summary, created_at, updated_at, rank, screenshot_variants)
+            SELECT id, title, url, screenshot_path, status, summary, created_at, updated_at, rank, screenshot_variants
+            FROM articles_legacy
+        """)
+        # Its indexes go with it and are recreated on the new table
+        conn.execute("DROP TABLE articles_legacy")
+        logger.info("Migrated articles table to per-feed storage")
+
+    def reload_latest_batch(self) -> bool:
+        """Pick up a batch another process published; True if it changed"""
+        batch = self._load_latest_batch()
+        if not batch or batch == self._latest_batch:
+            return False
+        self._latest_batch = batch
+        return True
+
+    def _load_latest_batch(self) -> Optional[dict]:
+        """Read the newest batch metadata from the database"""
+        try:
+            conn = self.db.connection()
+            row = conn.execute("""
+                SELECT * FROM refresh_batches WHERE feed = ? ORDER BY published_at DESC, id DESC LIMIT 1
+            """, (self.feed,)).fetchone()
+            if row:
+                return self._batch_from_row(row)
+
+            # Databases written before batches were recorded: derive it once from the rows
+            row = conn.execute("""
+                SELECT COUNT(*), MAX(updated_at) FROM articles WHERE feed = ?
+            """, (self.feed,)).fetchone()
+            if not row or not row[0]:
+                return None
+            counts = dict(conn.execute(
+                "SELECT status, COUNT(*) FROM articles WHERE feed = ? GROUP BY status", (self.feed,)
+            ).fetchall())
+            return {
+                "batch_id": None,
+                "published_at": row[1],
+                "total_articles": row[0],
+                "successful_articles": counts.get("success", 0),
+                "status_counts": counts,
+                "duration_seconds": None,
+            }
+
+        except Exception as e:
+            logger.error(f"Failed to load batch metadata: {e}")
+            return None
+
+    @staticmethod
+    def _batch_from_row(row: sqlite3.Row) -> dict:
+        return {
+            "batch_id": row["id"],
+            "published_at": row["published_at"],
+            "total_articles": row["total_articles"],
+            "successful_articles": row["successful_articles"],
+            "status_counts": json.loads(row["status_counts"]),
+            "duration_seconds": row["duration_seconds"],
+        }
+
+    def save_articles(self, articles: List[Article], duration_seconds: Optional[float] = None) -> bool:
         """Save articles to database"""
         try:
-            # Ensure database is initialized
-            self._init_db()
-            
-            with sqlite3.connect(self.db_path) as conn:
-                # Clear old articles (keep only latest batch)
-                conn.execute("DELETE FROM articles")
-                
-                for article in articles:
-                    conn.execute("""
-                        INSERT OR REPLACE INTO articles 
-                        (title, url, screenshot_path, status, summary, created_at, updated_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """, (
+            status_counts = dict(Counter(article.status for article in articles))
+            published_at = datetime.now().isoformat()
+
+            with self.db.transaction() as conn:
+                # Drop stories that fell off this feed (keep only its latest batch)
+                urls = [article.url for article in articles]
+                placeholders = ",".join("?" * len(urls))
+                conn.execute(f"DELETE FROM articles WHERE feed = ? AND url NOT IN ({placeholders})", [self.feed, *urls])
+
+                # Unchanged stories are updated in place instead of deleted and re-inserted
+                conn.executemany("""
+                    INSERT INTO articles
+                    (title, url, screenshot_path, status, summary, created_at, updated_at, rank, screenshot_variants, feed,
+                     content_text)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(feed, url) DO UPDATE SET
+                        title = excluded.title,
+                        screenshot_path = excluded.screenshot_path,
+                        status = excluded.status,
+                        summary = excluded.summary,
+                        created_at = excluded.created_at,
+                        updated_at = excluded.updated_at,
+                        rank = excluded.rank,
+                        screenshot_variants = excluded.screenshot_variants,
+                        content_text = excluded.content_text
+                """, [
+                    (
                         article.title,
                         article.url,
                         article.screenshot_path,
                         article.status,
                         article.summary,
-                        article.created_at,
-                        article.updated_at
-                    ))
-                
-                conn.commit()
-                logger.info(f"Saved {len(articles)} articles to database")
-                return True
-                
+                        article.created_at.isoformat() if article.created_at else None,
+                        article.updated_at.isoformat() if article.updated_at else None,
+                        article.rank,
+                        json.dumps(article.screenshot_variants) if article.screenshot_variants else None,
+                        self.feed,
+                        article.content_text
+                    )
+                    for article in articles
+                ])
+
+                # Record the batch once so status checks never scan the articles table
+                cursor = conn.execute("""
+                    INSERT INTO refresh_batches
+                    (published_at, total_articles, successful_articles, status_counts, duration_seconds, feed)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (
+                    published_at,
+                    len(articles),
+                    status_counts.get("success", 0),
+                    json.dumps(status_counts),
+                    duration_seconds,
+                    self.feed
+                ))
+                if self.archive:
+                    self.archive.record(conn, cursor.lastrowid, published_at, articles)
+
+            self._latest_batch = {
+                "batch_id": cursor.lastrowid,
+                "published_at": published_at,
+                "total_articles": len(articles),
+                "successful_articles": status_counts.get("success", 0),
+                "status_counts": status_counts,
+                "duration_seconds": duration_seconds,
+            }
+            logger.info(f"Saved {len(articles)} {self.feed} articles to database as batch {cursor.lastrowid}")
+
+            if self.archive:
+                self.archive.maybe_compact()
+            return True
+
         except Exception as e:
             logger.error(f"Failed to save articles: {e}")
             return False
@@ -71,80 +249,119 @@ class ArticleCache:
     def get_articles(self) -> List[Article]:
         """Get articles from database"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.execute("""
-                    SELECT * FROM articles 
-                    ORDER BY created_at ASC
-                """)
-                
-                articles = []
-                for row in cursor.fetchall():
-                    article = Article(
-                        title=row['title'],
-                        url=row['url'],
-                        screenshot_path=row['screenshot_path'],
-                        status=row['status'],
-                        summary=row['summary'],
-                        created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None,
-                        updated_at=datetime.fromisoformat(row['updated_at']) if row['updated_at'] else None
-                    )
-                    articles.append(article)
-                
-                return articles
-                
+            cursor = self.db.connection().execute("""
+                SELECT * FROM articles WHERE feed = ?
+                ORDER BY rank IS NULL, rank ASC, created_at ASC
+            """, (self.feed,))
+
+            return [self._article_from_row(row) for row in cursor.fetchall()]
+
         except Exception as e:
             logger.error(f"Failed to get articles: {e}")
             return []
 
-    def is_cache_fresh(self, max_age_minutes: int = 5) -> bool:
-        """Check if cache is fresh enough"""
+    def get_articles_page(
+        self,
+        after: Optional[Tuple[int, int]] = None,
+        limit: int = 50
+    ) -> Tuple[List[Article], Optional[Tuple[int, int]]]:
+        """Get one page of articles in rank order and the key to continue after it"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("""
-                    SELECT MAX(created_at) as latest_update 
-                    FROM articles
-                """)
-                row = cursor.fetchone()
-                
-                if not row or not row[0]:
-                    return False
-                
-                latest_update = datetime.fromisoformat(row[0])
-                age = datetime.now() - latest_update
-                
-                return age < timedelta(minutes=max_age_minutes)
-                
+            rank_key, row_id = after if after else (-1, -1)
+            cursor = self.db.connection().execute(f"""
+                SELECT *, COALESCE(rank, {UNRANKED}) AS rank_key FROM articles
+                WHERE feed = ? AND (COALESCE(rank, {UNRANKED}), id) > (?, ?)
+                ORDER BY COALESCE(rank, {UNRANKED}), id
+                LIMIT ?
+            """, (self.feed, rank_key, row_id, limit + 1))
+            rows = cursor.fetchall()
+
+            next_key = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_key = (rows[-1]['rank_key'], rows[-1]['id'])
+            return [self._article_from_row(row) for row in rows], next_key
+
+        except Exception as e:
+            logger.error(f"Failed to get articles page: {e}")
+            return [], None
+
+    def get_pending_summaries(self, limit: int = 50) -> List[Article]:
+        """Get this feed's stories that still have no real summary, in rank order"""
+        try:
+            placeholders = ",".join("?" * len(PLACEHOLDER_SUMMARIES))
+            cursor = self.db.connection().execute(f"""
+                SELECT * FROM articles
+                WHERE feed = ? AND (summary IS NULL OR summary IN ({placeholders}))
+                ORDER BY rank IS NULL, rank ASC
+                LIMIT ?
+            """, (self.feed, *PLACEHOLDER_SUMMARIES, limit))
+            return [self._article_from_row(row) for row in cursor.fetchall()]
+
         except Exception as e:
-            logger.error(f"Failed to check cache freshness: {e}")
+            logger.error(f"Failed to get pending summaries: {e}")
+            return []
+
+    def update_summary(self, url: str, summary: str) -> int:
+        """Fill in a deferred summary for a story in every feed that lists it; returns the rows updated"""
+        try:
+            placeholders = ",".join("?" * len(PLACEHOLDER_SUMMARIES))
+            with self.db.transaction() as conn:
+                updated = conn.execute(f"""
+                    UPDATE articles SET summary = ?, updated_at = ?
+                    WHERE url = ? AND (summary IS NULL OR summary IN ({placeholders}))
+                """, (summary, datetime.now().isoformat(), url, *PLACEHOLDER_SUMMARIES)).rowcount
+                if updated and self.archive:
+                    self.archive.update_summary(conn, url, summary)
+            return updated
+
+        except Exception as e:
+            logger.error(f"Failed to update summary for {url}: {e}")
+            return 0
+
+    @staticmethod
+    def _article_from_row(row: sqlite3.Row) -> Article:
+        return Article(
+            title=row['title'],
+            url=row['url'],
+            screenshot_path=row['screenshot_path'],
+            status=row['status'],
+            summary=row['summary'],
+            created_at=datetime.fromisoformat(row['created_at']) if row['created_at'] else None,
+            updated_at=datetime.fromisoformat(row['updated_at']) if row['updated_at'] else None,
+            rank=row['rank'],
+            screenshot_variants=json.loads(row['screenshot_variants']) if row['screenshot_variants'] else None,
+            content_text=row['content_text']
+        )
+
+    def is_cache_fresh(self, max_age_minutes: int = 5) -> bool:
+        """Check if cache is fresh enough"""
+        batch = self._latest_batch
+        if not batch or not batch["published_at"]:
             return False
 
+        age = datetime.now() - datetime.fromisoformat(batch["published_at"])
+        return age < timedelta(minutes=max_age_minutes)
+
     def get_cache_status(self) -> dict:
         """Get cache status information"""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute("""
-                    SELECT 
-                        COUNT(*) as total_articles,
-                        MAX(created_at) as latest_update,
-                        COUNT(CASE WHEN status = 'success' THEN 1 END) as successful_articles
-                    FROM articles
-                """)
-                row = cursor.fetchone()
-                
-                return {
-                    "total_articles": row[0] if row else 0,
-                    "latest_update": row[1] if row and row[1] else None,
-                    "successful_articles": row[2] if row else 0,
-                    "is_fresh": self.is_cache_fresh()
-                }
-                
-        except Exception as e:
-            logger.error(f"Failed to get cache status: {e}")
+        batch = self._latest_batch
+        if not batch:
             return {
+                "feed": self.feed,
                 "total_articles": 0,
                 "latest_update": None,
                 "successful_articles": 0,
                 "is_fresh": False
             }
 
+        return {
+            "feed": self.feed,
+            "total_articles": batch["total_articles"],
+            "latest_update": batch["published_at"],
+            "successful_articles": batch["successful_articles"],
+            "is_fresh": self.is_cache_fresh(),
+            "batch_id": batch["batch_id"],
+            "status_counts": batch["status_counts"],
+            "duration_seconds": batch["duration_seconds"],
+        }
@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from ..utils.rate_limiter import RateLimiter
+from .database import Database
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+def _init_coordination(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS rate_limits (
+            client_id TEXT PRIMARY KEY,
+            tat REAL NOT NULL
+        ) WITHOUT ROWID
+    """)
+    # Sweeps delete by TAT
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_rate_limits_tat ON rate_limits(tat)")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS leases (
+            name TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        ) WITHOUT ROWID
+    """)
+
+class SharedRateLimiter(RateLimiter):
+    """RateLimiter whose per-client state lives in SQLite, shared by every worker process.
+
+    Same GCRA rules and API as RateLimiter. Each check is one atomic upsert
+    that only advances the client's TAT when the request is allowed, so
+    concurrent workers can never admit more than the limit between them.
+    Handlers use check(), which runs the queries on a worker thread, since a
+    write from another process can hold the database for up to its busy
+    timeout. The tracked client count is taken at each sweep.
+    """
+
+    def __init__(self, database: Database, max_requests: int = 10, window_seconds: int = 60,
+                 max_clients: int = 100_000, sweep_interval: float = 60.0,
+                 clock: Callable[[], float] = time.time):
+        super().__init__(max_requests, window_seconds, max_clients, sweep_interval, clock)
+        self.db = database
+        self.db.ensure_schema("coordination", _init_coordination)
+        self.tracked_clients: Optional[int] = None
+        self._sweep(self.clock())
+
+    async def check(self, client_id: str) -> Optional[dict]:
+        return await asyncio.to_thread(self._check, client_id)
+
+    def is_allowed(self, client_id: str) -> bool:
+        """Check if request is allowed for client"""
+        now = self.clock()
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+        try:
+            rows = self.db.connection().execute("""
+                INSERT INTO rate_limits (client_id, tat) VALUES (:client_id, :now + :interval)
+                ON CONFLICT(client_id) DO UPDATE SET tat = MAX(tat, :now) + :interval
+                WHERE MAX(tat, :now) + :interval - :now <= :window
+                RETURNING tat
+            """, {
+                "client_id": client_id,
+                "now": now,
+                "interval": self.emission_interval,
+                "window": self.window_seconds,
+            }).fetchall()  # Exhaust the cursor so the write completes and its lock is dropped now
+        except sqlite3.Error as e:
+            # Fail open: a locked or broken state file must not take the API down
+            logger.error(f"Shared rate limit check failed for {client_id}: {e}")
+            return True
+
+        if not rows:
+            self.stats["denied"] += 1
+            logger.warning(f"Rate limit exceeded for client {client_id}")
+            return False
+        self.stats["allowed"] += 1
+        return True
+
+    def _get_tat(self, client_id: str) -> Optional[float]:
+        try:
+            row = self.db.connection().execute(
+                "SELECT tat FROM rate_limits WHERE client_id = ?", (client_id,)
+            ).fetchone()
+            return row["tat"] if row else None
+        except sqlite3.Error as e:
+            logger.error(f"Failed to read rate limit state for {client_id}: {e}")
+            return None
+
+    def _sweep(self, now: float):
+        """Drop refilled clients, then the least active ones beyond max_clients"""
+        self._next_sweep = now + self.sweep_interval
+        try:
+            with self.db.transaction() as conn:
+                expired = conn.execute("DELETE FROM rate_limits WHERE tat <= ?", (now,)).rowcount
+                tracked = conn.execute("SELECT COUNT(*) FROM rate_limits").fetchone()[0]
+                excess = tracked - self.max_clients
+                if excess > 0:
+                    conn.execute("""
+                        DELETE FROM rate_limits WHERE client_id IN (
+                            SELECT client_id FROM rate_limits ORDER BY tat LIMIT ?
+                        )
+                    """, (excess,))
+                    self.stats["evicted"] += excess
+            self.stats["expired"] += expired
+            self.tracked_clients = min(tracked, self.max_clients)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to sweep shared rate limits: {e}")
+
+    def get_stats(self) -> dict:
+        # As of the last sweep; counting the table on every status call would scan it
+        return {**self.stats, "tracked_clients": self.tracked_clients, "shared": True}
+
+class Lease:
+    """A named, expiring lock held by one process at a time, kept in SQLite.
+
+    acquire() takes the lease if it is free or expired, and renews it if this
+    owner already holds it. A holder that dies stops renewing, so its lease
+    lapses after ttl_seconds and another process can take over.
+
+    Several tasks of one process can share a lease through enter() and
+    leave(): it is released only when the last of them leaves.
+    """
+
+    def __init__(self, database: Database, name: str, owner: Optional[str] = None,
+                 ttl_seconds: float = 60.0, clock: Callable[[], float] = time.time):
+        self.db = database
+        self.name = name
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._users = 0
+        self._users_lock = threading.Lock()
+        self.db.ensure_schema("coordination", _init_coordination)
+
+    def enter(self) -> bool:
+        """Take or renew the lease for one more user in this process; False if another owner holds it"""
+        with self._users_lock:
+            if not self.acquire():
+                return False
+            self._users += 1
+            return True
+
+    def leave(self):
+        """Drop a user added by enter(), releasing the lease after the last one"""
+        with self._users_lock:
+            self._users = max(0, self._users - 1)
+            if self._users == 0:
+                self.release()
+
+    def acquire(self) -> bool:
+        """Take or renew the lease; False if another owner holds it"""
+        now = self.clock()
+        try:
+            rows = self.db.connection().execute("""
+                INSERT INTO leases (name, owner, expires_at) VALUES (:name, :owner, :expires_at)
+                ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE leases.owner = excluded.owner OR leases.expires_at <= :now
+                RETURNING owner
+            """, {
+                "name": self.name,
+                "owner": self.owner,
+                "expires_at": now + self.ttl_seconds,
+                "now": now,
+            }).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Failed to acquire lease {self.name}: {e}")
+            return False
+        return bool(rows)
+
+    def release(self):
+        """Give the lease up early if this owner holds it"""
+        try:
+            self.db.connection().execute(
+                "DELETE FROM leases WHERE name = ? AND owner = ?", (self.name, self.owner)
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Failed to release lease {self.name}: {e}")
+
+    def holder(self) -> Optional[str]:
+        """Owner of the lease, if it is held and unexpired"""
+        try:
+            row = self.db.connection().execute(
+                "SELECT owner FROM leases WHERE name = ? AND expires_at > ?", (self.name, self.clock())
+            ).fetchone()
+            return row["owner"] if row else None
+        except sqlite3.Error as e:
+            logger.error(f"Failed to read lease {self.name}: {e}")
+            return None
+
+class LeaseLostError(RuntimeError):
+    """Raised when work is stopped because its lease lapsed or was taken"""
+
+async def run_holding_lease(lease: Lease, work: Awaitable[T]) -> T:
+    """Run work while renewing lease every third of its TTL, cancelling it once the lease is lost.
+
+    acquire() is also False when the state file is busy; that only loses the
+    lease once renewals have failed for a whole TTL or another owner took it.
+    The caller acquires the lease first and releases it afterwards.
+    """
+    running = asyncio.ensure_future(work)
+    lost = False
+
+    async def renew():
+        nonlocal lost
+        renewed_at = lease.clock()
+        while True:
+            await asyncio.sleep(lease.ttl_seconds / 3)
+            if await asyncio.to_thread(lease.acquire):
+                renewed_at = lease.clock()
+                continue
+            holder = await asyncio.to_thread(lease.holder)
+            if (holder and holder != lease.owner) or lease.clock() - renewed_at >= lease.ttl_seconds:
+                logger.error(f"Lost lease {lease.name} to {holder}; stopping its work")
+                lost = True
+                running.cancel()
+                return
+            logger.warning(f"Could not renew lease {lease.name}, retrying")
+
+    renewal = asyncio.create_task(renew())
+    try:
+        return await running
+    except asyncio.CancelledError:
+        if lost:
+            raise LeaseLostError(f"Lost the {lease.name} lease; stopped so another process can take over")
+        raise
+    finally:
+        renewal.cancel()
+        running.cancel()
@@ -0,0 +1,96 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Iterator, List, Set
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Database:
+    """Long-lived, tuned SQLite connections shared by the caches.
+
+    Each thread gets one connection that stays open for the life of the
+    process, so queries skip the connect and pragma setup cost. The database
+    runs in WAL mode so readers never block on the writer. Connections are in
+    autocommit mode; writes group their statements with transaction().
+    """
+
+    def __init__(
+        self,
+        db_path: str = "articles.db",
+        cache_size_kib: int = 16384,
+        mmap_size_bytes: int = 64 * 1024 * 1024,
+        busy_timeout_ms: int = 5000,
+    ):
+        self.db_path = db_path
+        self.cache_size_kib = cache_size_kib
+        self.mmap_size_bytes = mmap_size_bytes
+        self.busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._schemas: Set[str] = set()
+
+    def connection(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening and tuning it on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                isolation_level=None,
+                check_same_thread=False,
+                timeout=self.busy_timeout_ms / 1000,
+            )
+            conn.row_factory = sqlite3.Row
+            self._configure(conn)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _configure(self, conn: sqlite3.Connection):
+        conn.execute("PRAGMA journal_mode=WAL")
+        # NORMAL is durable in WAL mode except for the last commits on power loss
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{self.cache_size_kib}")
+        conn.execute(f"PRAGMA mmap_size={self.mmap_size_bytes}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms}")
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a block of writes in one explicit transaction"""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+    def ensure_schema(self, name: str, setup: Callable[[sqlite3.Connection], None]):
+        """Run a schema setup function once per process"""
+        with self._lock:
+            if name in self._schemas:
+                return
+            self._schemas.add(name)
+        try:
+            with self.transaction() as conn:
+                setup(conn)
+        except Exception:
+            with self._lock:
+                self._schemas.discard(name)
+            raise
+
+    def close(self):
+        """Close every connection opened through this database"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception as e:
+                logger.debug(f"Failed to close database connection: {e}")
+        self._local = threading.local()
@@ -0,0 +1,116 @@
+import asyncio
+import itertools
+import json
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    type: str
+    data: dict
+
+    def to_sse(self) -> str:
+        """Format as one Server-Sent Events message"""
+        # Synthetic events (id 0) must not move the client's Last-Event-ID
+        header = f"id: {self.id}\n" if self.id else ""
+        return f"{header}event: {self.type}\ndata: {json.dumps(self.data, separators=(',', ':'))}\n\n"
+
+class Subscription:
+    """One client's bounded event buffer; the oldest events are dropped when it is full"""
+
+    def __init__(self, buffer_size: int, feed: Optional[str] = None):
+        self.feed = feed  # Only events of this feed, or all of them if None
+        self._events: Deque[Event] = deque(maxlen=buffer_size)
+        self._ready = asyncio.Event()
+        self.dropped = 0
+        self._dropped_reported = 0
+
+    def accepts(self, event: Event) -> bool:
+        return self.feed is None or event.data.get("feed") in (None, self.feed)
+
+    def push(self, event: Event):
+        if len(self._events) == self._events.maxlen:
+            self.dropped += 1
+        self._events.append(event)
+        self._ready.set()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """Next event, a resync notice after drops, or None on timeout"""
+        if not self._events:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+
+        if self.dropped > self._dropped_reported:
+            # The client missed events and should reload the full article list
+            missed = self.dropped - self._dropped_reported
+            self._dropped_reported = self.dropped
+            return Event(id=0, type="resync", data={"dropped": missed})
+        return self._events.popleft()
+
+class EventBroker:
+    """Fan-out of refresh events to connected clients.
+
+    publish() never blocks: each subscriber has its own buffer of
+    buffer_size events and a slow client only loses its own oldest events.
+    The last replay_size events are kept so a reconnecting client can
+    resume from its Last-Event-ID.
+    """
+
+    def __init__(self, buffer_size: int = 100, max_subscribers: int = 1000, replay_size: int = 200):
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self._subscribers: Set[Subscription] = set()
+        self._recent: Deque[Event] = deque(maxlen=replay_size)
+        self._ids = itertools.count(1)
+        self.stats = {"published": 0, "delivered": 0, "connections": 0, "rejected": 0}
+
+    def publish(self, event_type: str, data: dict) -> Event:
+        """Send an event to every subscriber"""
+        event = Event(id=next(self._ids), type=event_type, data=data)
+        self._recent.append(event)
+        delivered = 0
+        for subscription in self._subscribers:
+            if subscription.accepts(event):
+                subscription.push(event)
+                delivered += 1
+        self.stats["published"] += 1
+        self.stats["delivered"] += delivered
+        return event
+
+    def subscribe(self, last_event_id: Optional[int] = None, feed: Optional[str] = None) -> Optional[Subscription]:
+        """Register a client for one feed's events or all, replaying newer ones it missed; None when full"""
+        if len(self._subscribers) >= self.max_subscribers:
+            self.stats["rejected"] += 1
+            return None
+
+        subscription = Subscription(self.buffer_size, feed)
+        if last_event_id is not None:
+            if self._recent and self._recent[0].id > last_event_id + 1:
+                subscription.dropped += 1  # Older than the replay buffer; the client must resync
+            for event in self._recent:
+                if event.id > last_event_id and subscription.accepts(event):
+                    subscription.push(event)
+        self._subscribers.add(subscription)
+        self.stats["connections"] += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+    def recent(self) -> List[Event]:
+        return list(self._recent)
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "subscribers": len(self._subscribers),
+            "dropped": sum(s.dropped for s in self._subscribers),
+        }
@@ -0,0 +1,101 @@
+import logging
+import re
+from typing import Optional
+
+from playwright.async_api import Page
+
+logger = logging.getLogger(__name__)
+
+# Collects the visible text blocks of the page's main content, skipping navigation,
+# headers, footers, sidebars, forms and hidden elements. Falls back to the content
+# root's innerText when the page has too few text blocks (single-page apps, plain text)
+_READABLE_TEXT_SCRIPT = """
+(maxChars) => {
+    const root = document.querySelector('article, main, [role="main"]') || document.body;
+    if (!root) return '';
+    const boilerplate = 'nav, header, footer, aside, form, dialog, noscript, script, style, template, svg, ' +
+        '[role="navigation"], [role="banner"], [role="contentinfo"], [role="complementary"], ' +
+        '[role="dialog"], [aria-hidden="true"], [hidden]';
+    const blocks = root.querySelectorAll('h1, h2, h3, h4, h5, h6, p, li, pre, blockquote, figcaption, td, dd');
+    const parts = [];
+    let size = 0;
+    for (const block of blocks) {
+        if (size >= maxChars) break;
+        // Nested blocks (a p inside an li) would be read twice
+        if (block.parentElement && block.parentElement.closest('p, li, pre, blockquote, td, dd')) continue;
+        if (block.closest(boilerplate) || !block.getClientRects().length) continue;
+        const text = block.innerText.trim();
+        if (text) {
+            parts.push(text);
+            size += text.length + 1;
+        }
+    }
+    const joined = parts.join('\\n');
+    return joined.length >= 200 ? joined : (root.innerText || '').slice(0, maxChars);
+}
+"""
+
+# Short lines that are page chrome rather than article text
+_BOILERPLATE_LINE = re.compile(
+    r"^(share( this)?|tweet|subscribe( now)?|sign (in|up)|log ?in|register|menu|search|skip to (main )?content|"
+    r"advertisement|sponsored|accept( all)?( cookies)?|cookie (settings|preferences)|read more|related( articles)?|"
+    r"comments?|reply|print|email|copy link|follow us.*|newsletter)[.:!]?$",
+    re.IGNORECASE,
+)
+
+def clean_text(text: Optional[str], max_chars: int = 8000) -> str:
+    """Normalize whitespace, drop boilerplate and repeated lines, and cap the length at a word boundary"""
+    lines = []
+    seen = set()
+    for line in (text or "").splitlines():
+        line = " ".join(line.split())
+        if not line or line in seen or _BOILERPLATE_LINE.match(line):
+            continue
+        seen.add(line)
+        lines.append(line)
+
+    cleaned = "\n".join(lines)
+    if len(cleaned) <= max_chars:
+        return cleaned
+    cut = cleaned[:max_chars]
+    boundary = max(cut.rfind(" "), cut.rfind("\n"))
+    return cut[:boundary] if boundary > max_chars // 2 else cut
+
+class TextExtractor:
+    """Pulls the readable main text out of a page that is already loaded.
+
+    Runs in the same page as the screenshot, so summaries get the article
+    text without a second navigation. Text shorter than min_chars is
+    treated as nothing found (paywalls, consent walls, image-only pages).
+    """
+
+    def __init__(self, max_chars: int = 8000, min_chars: int = 200):
+        self.max_chars = max_chars
+        self.min_chars = min_chars
+        self.stats = {"extracted": 0, "empty": 0, "failed": 0, "total_chars": 0}
+
+    async def extract(self, page: Page) -> Optional[str]:
+        """Get the cleaned main text of the page, or None if there is too little of it"""
+        try:
+            # Blocks are cut early in the page, and boilerplate lines leave room to spare
+            raw = await page.evaluate(_READABLE_TEXT_SCRIPT, self.max_chars * 2)
+        except Exception as e:
+            self.stats["failed"] += 1
+            logger.warning(f"Text extraction failed: {e}")
+            return None
+
+        text = clean_text(raw, self.max_chars)
+        if len(text) < self.min_chars:
+            self.stats["empty"] += 1
+            return None
+        self.stats["extracted"] += 1
+        self.stats["total_chars"] += len(text)
+        return text
+
+    def get_stats(self) -> dict:
+        extracted = self.stats["extracted"]
+        return {
+            **self.stats,
+            "max_chars": self.max_chars,
+            "average_chars": self.stats["total_chars"] / extracted if extracted else 0.0,
+        }
@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from .async_cache import AsyncArticleCache
+from .front_page import Feed
+from .refresh import RefreshCoordinator
+from .scheduler import RefreshScheduler
+
+@dataclass
+class FeedPipeline:
+    """Everything one feed refreshes and serves through: its cache, refreshes and schedule"""
+
+    feed: Feed
+    cache: AsyncArticleCache
+    coordinator: RefreshCoordinator
+    scheduler: Optional[RefreshScheduler] = None
+
+    async def get_stats(self) -> dict:
+        return {
+            "cache_status": await self.cache.get_cache_status(),
+            "refresh": self.coordinator.get_stats(),
+            "scheduler": self.scheduler.get_stats() if self.scheduler else None,
+        }
@@ -0,0 +1,178 @@
+import logging
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+HN_BASE_URL = "https://news.ycombinator.com/"
+
+@dataclass(frozen=True)
+class Feed:
+    """A HackerNews story listing"""
+
+    name: str
+    path: str  # Relative to the HackerNews base URL
+    cadence: float  # Refresh interval relative to the top stories
+
+FEEDS: Dict[str, Feed] = {
+    "top": Feed("top", "news", 1.0),
+    "new": Feed("new", "newest", 0.5),
+    "best": Feed("best", "best", 4.0),
+    "ask": Feed("ask", "ask", 2.0),
+    "show": Feed("show", "show", 2.0),
+}
+
+def parse_feeds(value: str) -> List[Feed]:
+    """Parse a comma-separated list of feed names; raises ValueError on unknown ones"""
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    unknown = [name for name in names if name not in FEEDS]
+    if unknown:
+        raise ValueError(f"Unknown feeds {unknown}, expected some of {list(FEEDS)}")
+    return [FEEDS[name] for name in dict.fromkeys(names)]
+
+def normalize_story_url(url: Optional[str]) -> Optional[str]:
+    """Turn a front-page href into an absolute URL, or None if it should be skipped"""
+    # Handle relative URLs
+    if url and url.startswith("item?"):
+        url = "https://news.ycombinator.com/" + url
+    elif url and url.startswith("/"):
+        url = "https://news.ycombinator.com" + url
+    elif url and not url.startswith("http"):
+        return None
+
+    return url or None
+
+class _FrontPageParser(HTMLParser):
+    """Single-pass parser collecting the first `.titleline a` of every `tr.athing` row, and the "More" link"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows: List[Tuple[Optional[str], Optional[str]]] = []
+        self.more_href: Optional[str] = None
+        self._in_row = False
+        self._titleline_depth = 0
+        self._span_depth = 0
+        self._link_found = False
+        self._in_link = False
+        self._href: Optional[str] = None
+        self._text: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get("class") or "").split()
+
+        if tag == "tr":
+            self._close_row()
+            if "athing" in classes:
+                self._in_row = True
+                self._link_found = False
+            return
+
+        if tag == "a" and "morelink" in classes:
+            self.more_href = attrs.get("href")
+            return
+
+        if not self._in_row:
+            return
+
+        if tag == "span":
+            self._span_depth += 1
+            if "titleline" in classes and not self._titleline_depth:
+                self._titleline_depth = self._span_depth
+        elif tag == "a" and self._titleline_depth and not self._link_found:
+            self._in_link = True
+            self._href = attrs.get("href")
+            self._text = []
+
+    def handle_endtag(self, tag):
+        if not self._in_row:
+            return
+
+        if tag == "a" and self._in_link:
+            self._in_link = False
+            self._link_found = True
+            title = " ".join("".join(self._text).split())
+            self.rows.append((title, self._href))
+        elif tag == "span":
+            if self._span_depth == self._titleline_depth:
+                self._titleline_depth = 0
+            self._span_depth = max(0, self._span_depth - 1)
+        elif tag == "tr":
+            self._close_row()
+
+    def handle_data(self, data):
+        if self._in_link:
+            self._text.append(data)
+
+    def _close_row(self):
+        if self._in_row and not self._link_found:
+            # Keep rows without a title link so the row limit counts them like the DOM query did
+            self.rows.append((None, None))
+        self._in_row = False
+        self._titleline_depth = 0
+        self._span_depth = 0
+        self._in_link = False
+
+def parse_story_page(html: str, limit: int = 30) -> Tuple[List[Tuple[str, str]], int, Optional[str]]:
+    """Extract (title, url) pairs from the first `limit` rows, the rows used and the next page's href"""
+    parser = _FrontPageParser()
+    parser.feed(html)
+    parser.close()
+    parser._close_row()
+
+    links = []
+    rows = parser.rows[:limit]
+    for title, href in rows:
+        if title is None:
+            continue
+        url = normalize_story_url(href)
+        if url:
+            links.append((title, url))
+    return links, len(rows), parser.more_href
+
+def parse_story_links(html: str, limit: int = 10) -> List[Tuple[str, str]]:
+    """Extract (title, url) pairs from the first `limit` story rows of a front page"""
+    return parse_story_page(html, limit)[0]
+
+class FrontPageClient:
+    """Fetches HackerNews story listings over a pooled HTTP client, no browser needed"""
+
+    def __init__(self, base_url: str = HN_BASE_URL, timeout: float = 10.0, client: Optional[httpx.AsyncClient] = None,
+                 max_pages: int = 5):
+        self.base_url = base_url
+        self.max_pages = max_pages  # Each listing page holds 30 stories
+        self._owns_client = client is None
+        self._client = client or httpx.AsyncClient(
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+            headers={"User-Agent": "Mozilla/5.0 (compatible; HackerNewsAnalysis/2.0)"},
+        )
+
+    async def fetch_story_links(self, limit: int = 10, path: str = "") -> List[Tuple[str, str]]:
+        """Fetch and parse the top `limit` stories of a listing, following its "More" links"""
+        url = urljoin(self.base_url, path)
+        links: List[Tuple[str, str]] = []
+        seen = set()
+        for _ in range(self.max_pages):
+            response = await self._client.get(url)
+            response.raise_for_status()
+            page_links, rows, more_href = parse_story_page(response.text, limit=limit)
+            for title, story_url in page_links:
+                # Stories move up between page fetches and can show up twice
+                if story_url not in seen and len(links) < limit:
+                    seen.add(story_url)
+                    links.append((title, story_url))
+            if len(links) >= limit or not rows or not more_href:
+                break
+            url = urljoin(url, more_href)
+        logger.info(f"Fetched {len(links)} story links from {urljoin(self.base_url, path)}")
+        return links
+
+    async def aclose(self):
+        if self._owns_client:
+            await self._client.aclose()
@@ -0,0 +1,170 @@
+import asyncio
+import io
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Sequence, Tuple
+
+from .screenshot_store import ScreenshotStore
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; screenshots are then served as PNG only
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THUMBNAIL_WIDTHS = (600, 300)
+
+def encode_screenshot(
+    store: ScreenshotStore,
+    url: str,
+    filename: str,
+    thumbnail_widths: Sequence[int],
+    webp_quality: int,
+    jpeg_quality: int,
+) -> Tuple[Dict[str, str], dict]:
+    """Encode a stored PNG into WebP/JPEG variants and thumbnails.
+
+    Runs inside a worker process: it reads the PNG from the store and writes
+    the variants back through it, so only file names cross the process
+    boundary. Returns variant name -> file name, plus byte and time counters.
+    """
+    started = time.perf_counter()
+    with open(store.path_for(filename), "rb") as f:
+        original = f.read()
+
+    image = Image.open(io.BytesIO(original))
+    image.load()
+    image = image.convert("RGB")
+
+    encoded = {
+        "webp": ("webp", _encode(image, "WEBP", quality=webp_quality, method=4)),
+        "jpeg": ("jpg", _encode(image, "JPEG", quality=jpeg_quality, optimize=True, progressive=True)),
+    }
+    for width in thumbnail_widths:
+        if width >= image.width:
+            continue
+        height = round(image.height * width / image.width)
+        thumbnail = image.resize((width, height), Image.LANCZOS)
+        encoded[f"webp_{width}"] = ("webp", _encode(thumbnail, "WEBP", quality=webp_quality, method=4))
+
+    variants = {}
+    for name, (extension, data) in encoded.items():
+        variants[name] = store.write(url, data, extension=extension)
+
+    return variants, {
+        "bytes_in": len(original),
+        "bytes_webp": len(encoded["webp"][1]),
+        "bytes_out": sum(len(data) for _, data in encoded.values()),
+        "encode_seconds": time.perf_counter() - started,
+    }
+
+def _encode(image, image_format: str, **options) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **options)
+    return buffer.getvalue()
+
+class ImagePipeline:
+    """Post-capture stage turning PNG screenshots into compact variants.
+
+    Encoding is CPU-bound, so it runs in a process pool instead of the event
+    loop. Workers are spawned rather than forked, since this process runs
+    SQLite and Playwright threads whose held locks a fork would copy. A pool
+    broken by a dying worker is replaced and the image tried once more.
+    When Pillow is not installed the stage is disabled and articles only
+    carry the original PNG.
+    """
+
+    def __init__(
+        self,
+        store: ScreenshotStore,
+        max_workers: int = 2,
+        thumbnail_widths: Sequence[int] = DEFAULT_THUMBNAIL_WIDTHS,
+        webp_quality: int = 80,
+        jpeg_quality: int = 80,
+    ):
+        self.store = store
+        self.max_workers = max_workers
+        self.thumbnail_widths = tuple(thumbnail_widths)
+        self.webp_quality = webp_quality
+        self.jpeg_quality = jpeg_quality
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.stats = {
+            "images": 0,
+            "failures": 0,
+            "bytes_in": 0,
+            "bytes_out": 0,
+            "bytes_saved": 0,
+            "encode_seconds": 0.0,
+            "pool_restarts": 0,
+        }
+
+        if Image is None:
+            logger.warning("Pillow is not installed, screenshot variants are disabled")
+
+    @property
+    def available(self) -> bool:
+        return Image is not None
+
+    async def process(self, url: str, filename: str) -> Optional[Dict[str, str]]:
+        """Encode variants of a stored screenshot; returns None if the stage is unavailable or fails"""
+        if not self.available:
+            return None
+
+        try:
+            try:
+                variants, stats = await self._encode(url, filename)
+            except BrokenProcessPool:
+                logger.warning("Image encoding pool broke, starting a new one")
+                self.stats["pool_restarts"] += 1
+                self.close()
+                variants, stats = await self._encode(url, filename)
+        except Exception as e:
+            self.stats["failures"] += 1
+            logger.warning(f"Failed to encode screenshot variants for {url}: {e}")
+            return None
+
+        self.stats["images"] += 1
+        self.stats["bytes_in"] += stats["bytes_in"]
+        self.stats["bytes_out"] += stats["bytes_out"]
+        # Savings compare the full-size WebP a client fetches instead of the PNG
+        self.stats["bytes_saved"] += stats["bytes_in"] - stats["bytes_webp"]
+        self.stats["encode_seconds"] += stats["encode_seconds"]
+        logger.info(
+            f"Encoded {len(variants)} variants for {url} in {stats['encode_seconds']:.2f}s "
+            f"({stats['bytes_in']} -> {stats['bytes_webp']} bytes as WebP)"
+        )
+        return variants
+
+    async def _encode(self, url: str, filename: str) -> Tuple[Dict[str, str], dict]:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            encode_screenshot,
+            self.store,
+            url,
+            filename,
+            self.thumbnail_widths,
+            self.webp_quality,
+            self.jpeg_quality,
+        )
+
+    def get_stats(self) -> dict:
+        images = self.stats["images"]
+        return {
+            **self.stats,
+            "available": self.available,
+            "average_encode_seconds": self.stats["encode_seconds"] / images if images else 0.0,
+        }
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,249 @@
+import asyncio
+import logging
+import random
+import re
+import time
+from typing import Awaitable, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Error kinds worth retrying; anything else is the request's own fault
+RATE_LIMITED = "rate_limited"
+UNAVAILABLE = "unavailable"
+
+_SERVER_ERROR = re.compile(r"\b5\d\d\b")
+
+def classify_error(error: BaseException) -> Optional[str]:
+    """RATE_LIMITED for 429/quota errors, UNAVAILABLE for 5xx, timeouts and connection errors, else None"""
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return UNAVAILABLE
+
+    # google.api_core errors carry the HTTP status as .code, httpx errors on .response
+    status = getattr(error, "code", None)
+    if not isinstance(status, int):
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        if status == 429:
+            return RATE_LIMITED
+        if 500 <= status < 600:
+            return UNAVAILABLE
+
+    message = str(error).lower()
+    if "429" in message or "quota" in message or "resource exhausted" in message or "rate limit" in message:
+        return RATE_LIMITED
+    if _SERVER_ERROR.search(message) or "unavailable" in message or "overloaded" in message:
+        return UNAVAILABLE
+    return None
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the model while the circuit breaker is open"""
+
+class TokenBucket:
+    """Client-side budget refilled continuously at per_minute, holding at most capacity.
+
+    acquire() waits until enough budget has built up, in arrival order, so
+    callers are spread out instead of bursting into the server's limit.
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], Awaitable[None]] = asyncio.sleep):
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive")
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._updated = clock()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """Take amount from the bucket, waiting for it if needed; returns the seconds waited"""
+        # A request bigger than the whole bucket waits for a full bucket rather than forever
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+                await self.sleep(delay)
+                waited += delay
+
+    def drain(self):
+        """Empty the bucket, e.g. when the server says the quota is already spent"""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+class CircuitBreaker:
+    """Stops calls after failure_threshold consecutive failures.
+
+    Open for reset_seconds, then half-open: a single trial call decides
+    whether it closes again or stays open for another reset_seconds.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.opens = 0
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if self.clock() - self.opened_at >= self.reset_seconds:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def retry_in(self) -> float:
+        """Seconds until the next trial call is allowed"""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.opened_at + self.reset_seconds - self.clock())
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._trial_running:
+            self._trial_running = True
+            return True
+        return False
+
+    def cancel_trial(self):
+        """Forget a trial call that was cancelled before it could succeed or fail"""
+        self._trial_running = False
+
+    def record_success(self):
+        if self.opened_at is not None:
+            logger.info("Circuit breaker closed; model calls resume")
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._trial_running or self.failures >= self.failure_threshold:
+            if self.opened_at is None or self._trial_running:
+                self.opens += 1
+                logger.warning(f"Circuit breaker open for {self.reset_seconds:.0f}s after {self.failures} failures")
+            self.opened_at = self.clock()
+            self._trial_running = False
+
+class QuotaScheduler:
+    """Admits model calls within requests- and tokens-per-minute budgets, retrying transient failures.
+
+    Each call first passes the circuit breaker, then takes one request and
+    its estimated tokens from the buckets. A 429 or 5xx response is retried
+    up to max_retries times with jittered exponential backoff; a 429 also
+    pauses every caller for that delay, since the quota is shared. Failures
+    that outlast the retries keep counting toward the breaker, and while it
+    is open calls fail fast with CircuitOpenError.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = 15,
+        tokens_per_minute: float = 1_000_000,
+        max_retries: int = 3,
+        base_delay: float = 2.0,
+        max_delay: float = 60.0,
+        breaker: Optional[CircuitBreaker] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.requests = TokenBucket(requests_per_minute, clock=clock, sleep=sleep)
+        self.tokens = TokenBucket(tokens_per_minute, clock=clock, sleep=sleep)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker or CircuitBreaker(clock=clock)
+        self.clock = clock
+        self.sleep = sleep
+        self._paused_until = 0.0
+        self.stats = {
+            "calls": 0,
+            "retries": 0,
+            RATE_LIMITED: 0,
+            UNAVAILABLE: 0,
+            "short_circuited": 0,
+            "throttled_seconds": 0.0,
+        }
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Exponential delay for a retry, with half of it jittered so callers do not retry in lockstep"""
+        delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    async def run(self, call: Callable[[], Awaitable[T]], estimated_tokens: int = 0) -> T:
+        """Run call within the budgets, retrying 429/5xx failures"""
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self.stats["short_circuited"] += 1
+                raise CircuitOpenError(f"Model calls paused for {self.breaker.retry_in():.0f}s after repeated failures")
+
+            try:
+                pause = self._paused_until - self.clock()
+                if pause > 0:
+                    await self.sleep(pause)
+                    self.stats["throttled_seconds"] += pause
+                self.stats["throttled_seconds"] += await self.requests.acquire(1)
+                self.stats["throttled_seconds"] += await self.tokens.acquire(estimated_tokens)
+
+                self.stats["calls"] += 1
+                result = await call()
+            except Exception as e:
+                kind = classify_error(e)
+                if kind is None:
+                    # The API answered; the request itself was bad
+                    self.breaker.record_success()
+                    raise
+                self.stats[kind] += 1
+                self.breaker.record_failure()
+                if attempt >= self.max_retries:
+                    raise
+
+                delay = self.backoff_delay(attempt)
+                if kind == RATE_LIMITED:
+                    self._paused_until = max(self._paused_until, self.clock() + delay)
+                    self.requests.drain()
+                attempt += 1
+                logger.warning(f"Model call {kind} ({e}); retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                self.stats["retries"] += 1
+                await self.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled while waiting or calling: a half-open trial decided nothing
+                self.breaker.cancel_trial()
+                raise
+
+            self.breaker.record_success()
+            return result
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "breaker": self.breaker.state,
+            "breaker_opens": self.breaker.opens,
+            "retry_in_seconds": self.breaker.retry_in(),
+        }
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, Type
+
+from playwright.async_api import Page
+
+logger = logging.getLogger(__name__)
+
+# Condition names reported by the strategies
+DOM_QUIET = "dom_quiet"
+LAYOUT_STABLE = "layout_stable"
+HARD_CAP = "hard_cap"
+BUDGET_EXHAUSTED = "budget_exhausted"
+EVALUATION_FAILED = "evaluation_failed"
+
+# Resolves once the DOM has gone quiet_ms without a mutation, or when the budget runs out
+_DOM_QUIET_SCRIPT = """
+([quietMs, timeoutMs]) => new Promise(resolve => {
+    let quietTimer = null;
+    let capTimer = null;
+    const observer = new MutationObserver(() => arm());
+    const finish = (reason) => {
+        observer.disconnect();
+        clearTimeout(quietTimer);
+        clearTimeout(capTimer);
+        resolve(reason);
+    };
+    const arm = () => {
+        clearTimeout(quietTimer);
+        quietTimer = setTimeout(() => finish('%s'), quietMs);
+    };
+    observer.observe(document, {subtree: true, childList: true, attributes: true, characterData: true});
+    capTimer = setTimeout(() => finish('%s'), timeoutMs);
+    arm();
+})
+""" % (DOM_QUIET, BUDGET_EXHAUSTED)
+
+# Resolves once page height and image loading have not changed for stableMs
+_LAYOUT_STABLE_SCRIPT = """
+([stableMs, timeoutMs]) => new Promise(resolve => {
+    const started = performance.now();
+    let last = null;
+    let stableSince = started;
+    const sample = () => {
+        const images = Array.from(document.images);
+        return [
+            document.documentElement.scrollHeight,
+            document.documentElement.scrollWidth,
+            images.length,
+            images.filter(img => img.complete).length
+        ].join(':');
+    };
+    const tick = () => {
+        const now = performance.now();
+        const current = sample();
+        if (current !== last) {
+            last = current;
+            stableSince = now;
+        }
+        if (now - stableSince >= stableMs) {
+            resolve('%s');
+        } else if (now - started >= timeoutMs) {
+            resolve('%s');
+        } else {
+            requestAnimationFrame(tick);
+        }
+    };
+    requestAnimationFrame(tick);
+})
+""" % (LAYOUT_STABLE, BUDGET_EXHAUSTED)
+
+class ReadinessStrategy(ABC):
+    """Decides when a navigated page is ready to be screenshotted.
+
+    wait() gets the time left in the story's budget and returns the name of
+    the condition that ended the wait.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def wait(self, page: Page, budget_seconds: float) -> str:
+        """Wait until the page is ready or the budget is spent; returns the condition that ended the wait"""
+
+class DomQuietReadiness(ReadinessStrategy):
+    """Ready once the DOM has stopped mutating for a short quiet period"""
+
+    name = "dom_quiet"
+
+    def __init__(self, quiet_ms: int = 500):
+        self.quiet_ms = quiet_ms
+
+    async def wait(self, page: Page, budget_seconds: float) -> str:
+        if budget_seconds <= 0:
+            return BUDGET_EXHAUSTED
+        try:
+            return await page.evaluate(_DOM_QUIET_SCRIPT, [self.quiet_ms, int(budget_seconds * 1000)])
+        except Exception as e:
+            # Usually a client-side redirect destroyed the execution context
+            logger.debug(f"DOM quiet check failed: {e}")
+            return EVALUATION_FAILED
+
+class LoadAndLayoutStableReadiness(ReadinessStrategy):
+    """Ready once the load event fired and the layout stopped changing"""
+
+    name = "layout_stable"
+
+    def __init__(self, stable_ms: int = 300):
+        self.stable_ms = stable_ms
+
+    async def wait(self, page: Page, budget_seconds: float) -> str:
+        # Playwright reads timeout=0 as no timeout at all
+        if budget_seconds <= 0:
+            return BUDGET_EXHAUSTED
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + budget_seconds
+        try:
+            await page.wait_for_load_state("load", timeout=budget_seconds * 1000)
+        except Exception:
+            return BUDGET_EXHAUSTED
+
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return BUDGET_EXHAUSTED
+        try:
+            return await page.evaluate(_LAYOUT_STABLE_SCRIPT, [self.stable_ms, int(remaining * 1000)])
+        except Exception as e:
+            logger.debug(f"Layout stability check failed: {e}")
+            return EVALUATION_FAILED
+
+class HardCapReadiness(ReadinessStrategy):
+    """Always wait a fixed time, bounded by the budget"""
+
+    name = "hard_cap"
+
+    def __init__(self, seconds: float = 2.0):
+        self.seconds = seconds
+
+    async def wait(self, page: Page, budget_seconds: float) -> str:
+        if budget_seconds < self.seconds:
+            await asyncio.sleep(max(budget_seconds, 0))
+            return BUDGET_EXHAUSTED
+        await asyncio.sleep(self.seconds)
+        return HARD_CAP
+
+READINESS_STRATEGIES: Dict[str, Type[ReadinessStrategy]] = {
+    DomQuietReadiness.name: DomQuietReadiness,
+    LoadAndLayoutStableReadiness.name: LoadAndLayoutStableReadiness,
+    HardCapReadiness.name: HardCapReadiness,
+}
+
+def get_readiness_strategy(name: str) -> ReadinessStrategy:
+    """Build a readiness strategy from its configured name"""
+    try:
+        return READINESS_STRATEGIES[name]()
+    except KeyError:
+        raise ValueError(f"Unknown readiness strategy: {name}")
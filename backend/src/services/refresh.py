@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from .coordination import Lease, run_holding_lease
+
+logger = logging.getLogger(__name__)
+
+EventListener = Callable[[str, dict], None]
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+@dataclass
+class RefreshJob:
+    """One refresh run and its per-stage progress"""
+
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = PENDING
+    stages: Dict[str, dict] = field(default_factory=dict)
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    article_count: Optional[int] = None
+    churn: Optional[float] = None  # Share of the front page that is new since the previous batch
+    error: Optional[str] = None
+    listener: Optional[EventListener] = field(default=None, repr=False, compare=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def start_stage(self, name: str, total: int):
+        """Begin a stage with the number of items it will process"""
+        self.stages[name] = {"status": RUNNING if total else SUCCEEDED, "done": 0, "total": total}
+
+    def advance(self, name: str, count: int = 1):
+        """Record finished items of a stage, completing it at its total"""
+        stage = self.stages.get(name)
+        if stage is None:
+            return
+        stage["done"] = min(stage["done"] + count, stage["total"])
+        if stage["done"] >= stage["total"]:
+            stage["status"] = SUCCEEDED
+
+    def emit(self, event_type: str, data: dict):
+        """Forward a per-story event to whoever is listening to this job"""
+        if self.listener is None:
+            return
+        try:
+            self.listener(event_type, {"job_id": self.id, **data})
+        except Exception as e:
+            logger.error(f"Failed to emit {event_type} event: {e}")
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "stages": {name: dict(stage) for name, stage in self.stages.items()},
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "article_count": self.article_count,
+            "churn": self.churn,
+            "error": self.error,
+        }
+
+class RefreshCoordinator:
+    """Single-flight refreshes: at most one runs, concurrent callers join it.
+
+    submit() returns the running job if there is one, otherwise starts a new
+    job running run(job) as a task. Finished jobs stay queryable by id until
+    keep_jobs newer ones have been submitted. Job events, including
+    refresh_started and refresh_finished, go to on_event.
+
+    With a lease shared between worker processes, a job first waits in its
+    "lease" stage until this process holds the lease, and keeps renewing it
+    while run(job) executes, so only one process refreshes at a time. The
+    coordinators of all feeds can share one lease, letting the holder run
+    every feed while other processes wait. A run whose lease is lost
+    anyway is cancelled and fails.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[RefreshJob], Awaitable[None]],
+        keep_jobs: int = 20,
+        on_event: Optional[EventListener] = None,
+        lease: Optional[Lease] = None,
+        lease_poll_seconds: float = 1.0,
+    ):
+        self.run = run
+        self.keep_jobs = keep_jobs
+        self.on_event = on_event
+        self.lease = lease
+        self.lease_poll_seconds = lease_poll_seconds
+        self.stats = {"submitted": 0, "started": 0, "coalesced": 0, "failed": 0, "lease_waits": 0}
+        self._jobs: "OrderedDict[str, RefreshJob]" = OrderedDict()
+        self._current: Optional[RefreshJob] = None
+        self.last_finished: Optional[RefreshJob] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def current(self) -> Optional[RefreshJob]:
+        """The running job, if any"""
+        if self._current and not self._current.done:
+            return self._current
+        return None
+
+    def submit(self) -> Tuple[RefreshJob, bool]:
+        """Get the running job, or start one; the flag is True if this call started it"""
+        self.stats["submitted"] += 1
+        running = self.current
+        if running:
+            self.stats["coalesced"] += 1
+            logger.info(f"Refresh {running.id} already running, joining it")
+            return running, False
+
+        job = RefreshJob(listener=self.on_event)
+        self._jobs[job.id] = job
+        while len(self._jobs) > self.keep_jobs:
+            self._jobs.popitem(last=False)
+
+        self._current = job
+        self.stats["started"] += 1
+        self._task = asyncio.create_task(self._execute(job))
+        return job, True
+
+    def get(self, job_id: str) -> Optional[RefreshJob]:
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str) -> Optional[RefreshJob]:
+        """Wait until a job has finished"""
+        job = self._jobs.get(job_id)
+        if job and job is self._current and self._task:
+            await asyncio.shield(self._task)
+        return job
+
+    async def _execute(self, job: RefreshJob):
+        job.status = RUNNING
+        job.started_at = datetime.now()
+        logger.info(f"Starting refresh {job.id}")
+        job.emit("refresh_started", {})
+        try:
+            if self.lease:
+                await self._acquire_lease(job)
+                await self._run_holding_lease(job)
+            else:
+                await self.run(job)
+            job.status = SUCCEEDED
+        except asyncio.CancelledError:
+            job.status = FAILED
+            job.error = "cancelled"
+            raise
+        except Exception as e:
+            logger.error(f"Refresh {job.id} failed: {e}")
+            job.status = FAILED
+            job.error = str(e)
+            self.stats["failed"] += 1
+        finally:
+            job.finished_at = datetime.now()
+            for stage in job.stages.values():
+                if stage["status"] == RUNNING:
+                    stage["status"] = job.status
+            self.last_finished = job
+            job.emit("refresh_finished", {"status": job.status, "error": job.error})
+
+    async def _acquire_lease(self, job: RefreshJob):
+        """Wait until this process holds the refresh lease"""
+        job.start_stage("lease", 1)
+        waited = False
+        while not await asyncio.to_thread(self.lease.enter):
+            if not waited:
+                waited = True
+                self.stats["lease_waits"] += 1
+                logger.info(f"Refresh {job.id} waiting for the lease held by {self.lease.holder()}")
+            await asyncio.sleep(self.lease_poll_seconds)
+        job.advance("lease")
+
+    async def _run_holding_lease(self, job: RefreshJob):
+        """Run job while renewing the lease, stopping it if the lease is lost"""
+        try:
+            await run_holding_lease(self.lease, self.run(job))
+        finally:
+            await asyncio.to_thread(self.lease.leave)
+
+    async def close(self):
+        """Cancel a running refresh"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "current_job": self.current.id if self.current else None,
+            "lease_owner": self.lease.owner if self.lease else None,
+        }
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from ..models.article import Article
+from ..utils.urls import canonicalize_url
+from .async_cache import AsyncArticleCache
+from .refresh import FAILED, RefreshCoordinator, RefreshJob
+
+logger = logging.getLogger(__name__)
+
+def measure_churn(previous: List[Article], current: List[Article]) -> float:
+    """Fraction of the new front page that was not in the previous batch.
+
+    Rank moves are ignored: one story entering at the top shifts every story
+    below it, which would read as a page that changed completely.
+    """
+    if not current:
+        return 0.0
+    previous_urls = {canonicalize_url(article.url) for article in previous}
+    new = sum(1 for article in current if canonicalize_url(article.url) not in previous_urls)
+    return new / len(current)
+
+class RefreshScheduler:
+    """Refreshes proactively on an interval that follows front page churn.
+
+    After each refresh, scheduled or requested by a client, the interval
+    shrinks by speedup when churn is at least high_churn and grows by
+    backoff when it is at most low_churn or the refresh failed, always
+    within [min_interval, max_interval]. The next run is due interval
+    seconds after the last published batch or the last attempt, whichever
+    is newer, so a manual refresh pushes it back and failures do not retry
+    at once. Readers keep getting the last snapshot while a refresh runs.
+    """
+
+    def __init__(
+        self,
+        coordinator: RefreshCoordinator,
+        cache: AsyncArticleCache,
+        min_interval: float = 120.0,
+        max_interval: float = 1800.0,
+        initial_interval: float = 300.0,
+        low_churn: float = 0.1,
+        high_churn: float = 0.3,
+        backoff: float = 1.5,
+        speedup: float = 0.5,
+        jitter: float = 0.1,
+    ):
+        if min_interval <= 0 or max_interval < min_interval:
+            raise ValueError("Need 0 < min_interval <= max_interval")
+        self.coordinator = coordinator
+        self.cache = cache
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min(max(initial_interval, min_interval), max_interval)
+        self.low_churn = low_churn
+        self.high_churn = high_churn
+        self.backoff = backoff
+        self.speedup = speedup
+        self.jitter = jitter  # Spread runs of several instances apart
+        self.stats = {"scheduled_runs": 0, "skipped": 0, "adjustments": 0}
+        self.last_churn: Optional[float] = None
+        self.next_run_at: Optional[float] = None
+        self._observed_job: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopped = asyncio.Event()
+
+    def start(self):
+        if self._task is None:
+            self._stopped.clear()
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        self._stopped.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while not self._stopped.is_set():
+            try:
+                delay = await self._seconds_until_due()
+                self.next_run_at = time.time() + delay
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self._stopped.wait(), timeout=delay)
+                        return
+                    except asyncio.TimeoutError:
+                        pass
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Never let one bad run stop proactive refreshing
+                logger.error(f"Scheduled refresh failed: {e}")
+                await asyncio.sleep(self.min_interval)
+
+    async def _seconds_until_due(self) -> float:
+        last_attempt = self.coordinator.last_finished
+        self._observe(last_attempt)
+        # A failed refresh publishes nothing, so the interval also counts from the last attempt
+        ages = []
+        latest_update = (await self.cache.get_cache_status()).get("latest_update")
+        if latest_update:
+            ages.append((datetime.now() - datetime.fromisoformat(latest_update)).total_seconds())
+        if last_attempt and last_attempt.finished_at:
+            ages.append((datetime.now() - last_attempt.finished_at).total_seconds())
+        if not ages:
+            return 0.0
+        interval = self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+        return max(0.0, interval - min(ages))
+
+    async def run_once(self) -> Optional[RefreshJob]:
+        """Refresh now if the last batch is due, or join a refresh already running"""
+        running = self.coordinator.current
+        if running is None and (await self._seconds_until_due()) > 0:
+            # Someone else refreshed while we slept
+            self.stats["skipped"] += 1
+            return None
+
+        job, started = self.coordinator.submit()
+        if started:
+            self.stats["scheduled_runs"] += 1
+            logger.info(f"Scheduled refresh {job.id} (interval {self.interval:.0f}s)")
+        await self.coordinator.wait(job.id)
+        self._observe(job)
+        return job
+
+    def _observe(self, job: Optional[RefreshJob]):
+        """Adapt the interval once to each finished refresh"""
+        if job is None or not job.done or job.id == self._observed_job:
+            return
+        self._observed_job = job.id
+
+        previous = self.interval
+        if job.status == FAILED:
+            self.interval *= self.backoff
+        elif job.churn is not None:
+            self.last_churn = job.churn
+            if job.churn >= self.high_churn:
+                self.interval *= self.speedup
+            elif job.churn <= self.low_churn:
+                self.interval *= self.backoff
+        self.interval = min(max(self.interval, self.min_interval), self.max_interval)
+
+        if self.interval != previous:
+            self.stats["adjustments"] += 1
+            logger.info(f"Refresh interval {previous:.0f}s -> {self.interval:.0f}s (churn {job.churn})")
+
+    def get_stats(self) -> dict:
+        return {
+            **self.stats,
+            "interval_seconds": self.interval,
+            "min_interval_seconds": self.min_interval,
+            "max_interval_seconds": self.max_interval,
+            "last_churn": self.last_churn,
+            "next_run_at": datetime.fromtimestamp(self.next_run_at).isoformat() if self.next_run_at else None,
+        }
@@ -1,222 +1,392 @@
 import asyncio
 import logging
-from typing import List, Tuple
-from playwright.async_api import async_playwright, Page, Browser
-from concurrent.futures import ThreadPoolExecutor
-import google.generativeai as genai
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
-import os
-import glob
 
 from ..models.article import Article
+from .browser_pool import BrowserPool
+from .readiness import ReadinessStrategy, DomQuietReadiness
+from .extraction import TextExtractor
+from .front_page import FEEDS, Feed, FrontPageClient
+from .summarizer import Summarizer, ModelSummarizer
+from .summary_cache import SummaryCache
+from .screenshot_store import ScreenshotStore
+from .image_pipeline import ImagePipeline
+from .refresh import RefreshJob
+from .quota import CircuitOpenError
 
 logger = logging.getLogger(__name__)
 
 class HackerNewsScraper:
-    def __init__(self, gemini_api_key: str):
+    def __init__(
+        self,
+        gemini_api_key: str,
+        max_concurrent: int = 3,
+        browser_pool: Optional[BrowserPool] = None,
+        readiness: Optional[ReadinessStrategy] = None,
+        page_budget_seconds: float = 15.0,
+        front_page: Optional[FrontPageClient] = None,
+        summarizer: Optional[Summarizer] = None,
+        summary_cache: Optional[SummaryCache] = None,
+        incremental: bool = True,
+        screenshot_store: Optional[ScreenshotStore] = None,
+        image_pipeline: Optional[ImagePipeline] = None,
+        stories_per_feed: int = 30,
+        text_extractor: Optional[TextExtractor] = None,
+    ):
         if not gemini_api_key:
             raise ValueError("GEMINI_API_KEY is required")
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
         
-        genai.configure(api_key=gemini_api_key)
-        self.model = genai.GenerativeModel("models/gemini-1.5-flash-latest")
-        self.max_concurrent = 3  # Reduced for better stability
+        self.summarizer = summarizer or ModelSummarizer.for_gemini(gemini_api_key)
+        self.summary_cache = summary_cache  # Skips model calls for stories summarised before
+        self.max_concurrent = max_concurrent  # Stories processed at the same time
+        self.browser_pool = browser_pool  # Shared, long-lived browser; a temporary one is used if None
+        self.front_page = front_page or FrontPageClient()  # Story links come over plain HTTP
+        self.readiness = readiness or DomQuietReadiness()
+        self.page_budget_seconds = page_budget_seconds  # Navigation + readiness time allowed per story
+        self.readiness_stats = Counter()  # Which readiness condition fired, per screenshot
+        self.readiness_wait_total = 0.0
+        self.incremental = incremental  # Only reprocess new or changed stories when a previous batch is given
+        self.screenshot_store = screenshot_store or ScreenshotStore("screenshots")
+        self.image_pipeline = image_pipeline  # Encodes WebP/JPEG variants and thumbnails when set
+        self.stories_per_feed = stories_per_feed  # Listings past 30 stories are read over several pages
+        self.text_extractor = text_extractor or TextExtractor()  # Article text for summaries, from the screenshot's page load
+        # URL -> story being processed right now, so feeds listing the same story share one capture
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.shared_stories = 0
 
-    async def scrape_top_stories(self) -> List[Article]:
-        """Scrape top 10 HackerNews stories"""
+    async def scrape_top_stories(
+        self,
+        previous: Optional[List[Article]] = None,
+        progress: Optional[RefreshJob] = None,
+        feed: Feed = FEEDS["top"],
+        known: Optional[List[Article]] = None,
+    ) -> List[Article]:
+        """Scrape a feed's top stories, reusing unchanged ones from its previous batch or other feeds' batches"""
         try:
-            # Clear old screenshots first
-            self._clear_old_screenshots()
+            # Get the feed's story links; no browser is needed for this
+            if progress:
+                progress.start_stage("front_page", 1)
+            links = await self._get_story_links(feed.path)
+            logger.info(f"Found {len(links)} {feed.name} stories to process")
+            if progress:
+                progress.advance("front_page")
             
-            async with async_playwright() as p:
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=['--no-sandbox', '--disable-dev-shm-usage', '--disable-web-security']
-                )
-                
-                # Get top story links
-                links = await self._get_story_links(browser)
-                logger.info(f"Found {len(links)} stories to process")
-                
-                # Process stories sequentially to ensure proper numbering
-                articles = await self._process_stories_sequentially(browser, links)
-                
-                await browser.close()
-                return articles
+            reusable = {}
+            if (previous or known) and self.incremental:
+                # Other feeds' stories count too; this feed's own take precedence
+                reusable = self._find_reusable(links, (known or []) + (previous or []))
+                logger.info(f"Reusing {len(reusable)} unchanged stories, processing {len(links) - len(reusable)}")
+            
+            if progress:
+                progress.start_stage("screenshots", len(links) - len(reusable))
+                progress.start_stage("summaries", len(links))
+                for idx, (title, url) in enumerate(links):
+                    progress.emit("story_discovered", {
+                        "rank": idx + 1, "title": title, "url": url, "reused": idx + 1 in reusable
+                    })
+            
+            # Process stories concurrently; results keep HackerNews rank order
+            if self.browser_pool or len(reusable) == len(links):
+                articles = await self._process_stories_concurrently(self.browser_pool, links, reusable, progress)
+            else:
+                async with BrowserPool(max_contexts=self.max_concurrent) as pool:
+                    articles = await self._process_stories_concurrently(pool, links, reusable, progress)
+            
+            # Swap in the new batch of images, then drop old unreferenced ones; both
+            # fsync and scan the directory, so they run off the event loop
+            await asyncio.to_thread(
+                self.screenshot_store.publish,
+                {article.url: article.screenshot_path for article in articles if article.screenshot_path},
+                {article.url: article.screenshot_variants for article in articles if article.screenshot_variants},
+                feed.name,
+            )
+            await asyncio.to_thread(self.screenshot_store.collect_garbage)
+            return articles
                 
         except Exception as e:
             logger.error(f"Scraping failed: {e}")
             raise
 
-    def _clear_old_screenshots(self):
-        """Remove all old screenshot files"""
-        screenshot_dir = "screenshots"
-        if os.path.exists(screenshot_dir):
-            for file in glob.glob(f"{screenshot_dir}/*.png"):
-                try:
-                    os.remove(file)
-                    logger.info(f"Removed old screenshot: {file}")
-                except Exception as e:
-                    logger.warning(f"Failed to remove {file}: {e}")
-
-    async def _get_story_links(self, browser: Browser) -> List[Tuple[str, str]]:
-        """Extract top 10 story links from HackerNews front page"""
-        page = await browser.new_page()
-        try:
-            await page.goto("https://news.ycombinator.com/", wait_until="networkidle")
-            
-            items = await page.query_selector_all('tr.athing')
-            links = []
-            
-            for item in items[:10]:
-                title_el = await item.query_selector('.titleline a')
-                if title_el:
-                    title = await title_el.inner_text()
-                    url = await title_el.get_attribute('href')
-                    
-                    # Handle relative URLs
-                    if url and url.startswith("item?"):
-                        url = "https://news.ycombinator.com/" + url
-                    elif url and url.startswith("/"):
-                        url = "https://news.ycombinator.com" + url
-                    elif url and not url.startswith("http"):
-                        continue
-                    
-                    if url:
-                        links.append((title, url))
-            
-            return links
-            
-        finally:
-            await page.close()
-
-    async def _process_stories_sequentially(self, browser: Browser, links: List[Tuple[str, str]]) -> List[Article]:
-        """Process stories one by one maintaining HackerNews ranking order"""
-        articles = []
+    def _find_reusable(self, links: List[Tuple[str, str]], previous: List[Article]) -> Dict[int, Article]:
+        """Map new rank -> previous article for stories whose URL and title are unchanged"""
+        previous_by_url = {article.url: article for article in previous}
+        reusable = {}
         
         for idx, (title, url) in enumerate(links):
-            article_number = idx + 1  # Keep original order: 1, 2, 3, ..., 10
-            logger.info(f"Processing HackerNews article #{article_number}: {title}")
-            
-            try:
-                article = await self._process_single_story(browser, article_number, title, url)
-                articles.append(article)
-            except Exception as e:
-                logger.error(f"Failed to process article #{article_number}: {e}")
-                # Create failed article
-                failed_article = Article(
-                    title=title,
-                    url=url,
-                    status="failed",
-                    created_at=datetime.now(),
-                    updated_at=datetime.now()
-                )
-                articles.append(failed_article)
+            old = previous_by_url.get(url)
+            if (old and old.title == title and old.status == "success"
+                    and self.screenshot_store.exists(old.screenshot_path)):
+                reusable[idx + 1] = old
         
-        return articles
+        return reusable
+
+    async def _get_story_links(self, path: str = "news") -> List[Tuple[str, str]]:
+        """Extract the top story links of a HackerNews listing"""
+        return await self.front_page.fetch_story_links(limit=self.stories_per_feed, path=path)
+
+    async def _process_stories_concurrently(
+        self,
+        pool: BrowserPool,
+        links: List[Tuple[str, str]],
+        reusable: Optional[Dict[int, Article]] = None,
+        progress: Optional[RefreshJob] = None,
+    ) -> List[Article]:
+        """Capture up to max_concurrent stories' pages at once while keeping HackerNews ranking order"""
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        reusable = reusable or {}
+
+        async def process(idx: int, title: str, url: str) -> Article:
+            article_number = idx + 1  # Numbering follows rank, not completion order
+            article = None
+            try:
+                if article_number in reusable:
+                    article = await self._reuse_story(reusable[article_number], article_number)
+                    return article
+                
+                shared = self._in_flight.get(url)
+                if shared:
+                    # Another feed's refresh is processing this story right now
+                    article = await self._share_story(shared, title, article_number)
+                    if article:
+                        if progress:
+                            progress.advance("screenshots")
+                        return article
+                
+                pending = asyncio.get_running_loop().create_future()
+                self._in_flight[url] = pending
+                try:
+                    logger.info(f"Processing HackerNews article #{article_number}: {title}")
+                    try:
+                        article = await self._process_single_story(
+                            pool, article_number, title, url, progress, capture_slots=semaphore
+                        )
+                    except Exception as e:
+                        logger.error(f"Failed to process article #{article_number}: {e}")
+                        article = Article(
+                            title=title,
+                            url=url,
+                            status="failed",
+                            created_at=datetime.now(),
+                            updated_at=datetime.now(),
+                            rank=article_number
+                        )
+                    pending.set_result(article)
+                    return article
+                finally:
+                    if not pending.done():
+                        pending.cancel()
+                    if self._in_flight.get(url) is pending:
+                        del self._in_flight[url]
+            finally:
+                # The summary is a story's last step, so a finished story counts here
+                if progress:
+                    progress.advance("summaries")
+                    if article:
+                        progress.emit("article_ready", {"rank": article_number, "article": article.to_dict()})
 
-    async def _process_single_story(self, browser: Browser, article_number: int, title: str, url: str) -> Article:
+        # gather returns results in argument order, regardless of which story finishes first
+        return list(await asyncio.gather(
+            *(process(idx, title, url) for idx, (title, url) in enumerate(links))
+        ))
+
+    async def _process_single_story(
+        self,
+        pool: BrowserPool,
+        article_number: int,
+        title: str,
+        url: str,
+        progress: Optional[RefreshJob] = None,
+        capture_slots: Optional[asyncio.Semaphore] = None,
+    ) -> Article:
         """Process a single story: screenshot + summary"""
         article = Article(
             title=title,
             url=url,
             status="processing",
-            created_at=datetime.now()
+            created_at=datetime.now(),
+            rank=article_number
         )
         
-        # Take screenshot
-        screenshot_success = await self._take_screenshot(browser, article_number, url)
-        if screenshot_success:
-            article.screenshot_path = f"/screenshots/{article_number}.png"
+        # Take screenshot, reading the article text from the same page load. Only this part holds
+        # a capture slot; summaries wait outside it so they can be batched across stories
+        try:
+            async with capture_slots or asyncio.Semaphore(1):
+                screenshot_name, article.content_text = await self._take_screenshot(pool, article_number, url)
+        finally:
+            if progress:
+                progress.advance("screenshots")
+        if screenshot_name:
+            article.screenshot_path = screenshot_name
             article.status = "success"
+            if self.image_pipeline:
+                article.screenshot_variants = await self.image_pipeline.process(url, screenshot_name)
         else:
             article.status = "screenshot_failed"
+        if progress:
+            progress.emit("screenshot_done", {
+                "rank": article_number,
+                "url": url,
+                "status": article.status,
+                "screenshot": article.screenshot_url(),
+                "screenshot_variants": article.screenshot_variant_urls(),
+            })
         
         # Generate summary
-        try:
-            summary = await self._generate_summary(title)
-            article.summary = summary
-        except Exception as e:
-            logger.error(f"Summary generation failed for {title}: {e}")
-            if "429" in str(e) and "quota" in str(e).lower():
-                article.summary = f"AI summary temporarily unavailable due to API quota limits."
-            else:
-                article.summary = f"Unable to generate AI summary. Content analysis temporarily unavailable."
+        article.summary = await self._summarize_or_defer(title, url, article.content_text)
+        if progress:
+            progress.emit("summary_done", {
+                "rank": article_number,
+                "url": url,
+                "summary": article.summary,
+                "summary_status": "pending" if article.summary_pending else "ready",
+            })
         
         article.updated_at = datetime.now()
         return article
 
-    async def _take_screenshot(self, browser: Browser, article_number: int, url: str) -> bool:
-        """Take a clean screenshot of a single article"""
-        # Create new context for each screenshot to ensure isolation
-        context = await browser.new_context(
-            viewport={'width': 1200, 'height': 800},
-            ignore_https_errors=True
+    async def _reuse_story(self, previous: Article, article_number: int) -> Article:
+        """Carry an unchanged story over to its new rank, keeping its stored screenshot"""
+        logger.info(f"Reusing HackerNews article #{article_number}: {previous.title}")
+        article = Article(
+            title=previous.title,
+            url=previous.url,
+            screenshot_path=previous.screenshot_path,
+            screenshot_variants=previous.screenshot_variants,
+            status=previous.status,
+            summary=previous.summary,
+            created_at=previous.created_at,
+            rank=article_number,
+            content_text=previous.content_text
         )
         
-        page = await context.new_page()
+        # A summary that failed earlier is retried from the stored text, without navigating
+        if previous.summary_pending:
+            article.summary = await self._summarize_or_defer(previous.title, previous.url, previous.content_text)
         
+        article.updated_at = datetime.now()
+        return article
+
+    async def _share_story(self, pending: asyncio.Future, title: str, article_number: int) -> Optional[Article]:
+        """Wait for another feed's processing of a story and take it over at this rank; None if it was cancelled"""
         try:
-            logger.info(f"Taking screenshot #{article_number} of {url}")
-            
-            # Navigate to page
-            await page.goto(url, timeout=30000, wait_until="networkidle")
-            
-            # Wait for page to fully load
-            await asyncio.sleep(3)
-            
-            # Scroll slightly to capture more content
-            await page.evaluate("window.scrollTo(0, Math.min(document.body.scrollHeight / 4, 500))")
-            await asyncio.sleep(1)
-            
-            # Take screenshot
-            screenshot_path = f"screenshots/{article_number}.png"
-            os.makedirs("screenshots", exist_ok=True)
-            
-            await page.screenshot(
-                path=screenshot_path,
-                full_page=False,
-                type='png'
-            )
-            
-            # Verify file was created
-            if os.path.exists(screenshot_path):
-                logger.info(f"Screenshot #{article_number} saved successfully")
-                return True
-            else:
-                logger.warning(f"Screenshot #{article_number} file not created")
-                return False
-                
+            source = await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            if pending.cancelled():
+                return None  # The other refresh was cancelled; process the story here instead
+            raise
+        self.shared_stories += 1
+        logger.info(f"Sharing HackerNews article #{article_number} with another feed: {title}")
+        return Article(
+            title=title,
+            url=source.url,
+            screenshot_path=source.screenshot_path,
+            screenshot_variants=source.screenshot_variants,
+            status=source.status,
+            summary=source.summary,
+            created_at=source.created_at,
+            updated_at=source.updated_at,
+            rank=article_number,
+            content_text=source.content_text
+        )
+
+    async def _summarize_or_defer(self, title: str, url: str, content: Optional[str] = None) -> Optional[str]:
+        """Generate a summary, or None to leave it pending for the background retry"""
+        try:
+            return await self._generate_summary(title, url, content)
+        except CircuitOpenError as e:
+            logger.info(f"Deferring summary for {title}: {e}")
         except Exception as e:
-            logger.warning(f"Screenshot #{article_number} failed for {url}: {e}")
-            return False
-        finally:
-            await context.close()
+            logger.error(f"Summary generation failed for {title}, deferring it: {e}")
+        return None
+
+    async def summarize_story(self, title: str, url: str, content: Optional[str] = None) -> str:
+        """Summarize a stored story again, going through the summary cache; raises if the model call fails"""
+        return await self._generate_summary(title, url, content)
 
-    async def _generate_summary(self, title: str) -> str:
-        """Generate AI summary for an article"""
+    async def _take_screenshot(
+        self, pool: BrowserPool, article_number: int, url: str
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Take a clean screenshot of a single article; returns the stored file name and the article text"""
+        text = None
         try:
-            prompt = f"Based on this HackerNews article title: '{title}', provide a brief 2-3 sentence summary about what this article is likely about. Focus on the main topic and key points."
-            
-            logger.info(f"Generating AI summary for: {title}")
-            
-            # Use ThreadPoolExecutor for blocking Gemini API call
-            loop = asyncio.get_event_loop()
-            with ThreadPoolExecutor() as executor:
-                response = await loop.run_in_executor(
-                    executor,
-                    lambda: self.model.generate_content(prompt)
+            # Each screenshot gets its own isolated context from the shared browser
+            async with pool.page() as page:
+                logger.info(f"Taking screenshot #{article_number} of {url}")
+                started = time.monotonic()
+                
+                # Navigate to page; readiness is decided below instead of waiting for network idle
+                await page.goto(url, timeout=self.page_budget_seconds * 1000, wait_until="domcontentloaded")
+                
+                # Wait until the page is visually stable, within what is left of the budget
+                remaining = self.page_budget_seconds - (time.monotonic() - started)
+                condition = await self.readiness.wait(page, remaining)
+                self._record_readiness(condition, time.monotonic() - started)
+                logger.info(f"Screenshot #{article_number} ready via {condition} after {time.monotonic() - started:.2f}s")
+                
+                # Read the article text while the page is loaded; a failure only costs the text
+                text = await self.text_extractor.extract(page)
+                
+                # Scroll slightly to capture more content, then let two frames paint
+                await page.evaluate("window.scrollTo(0, Math.min(document.body.scrollHeight / 4, 500))")
+                await page.evaluate("() => new Promise(r => requestAnimationFrame(() => requestAnimationFrame(r)))")
+                
+                # Take screenshot into memory; the store publishes it atomically
+                image = await page.screenshot(
+                    full_page=False,
+                    type='png'
                 )
             
-            if response and hasattr(response, 'text') and response.text:
-                summary = response.text.strip()
-                logger.info(f"Generated AI summary for {title}: {summary[:60]}...")
-                return summary
-            else:
-                logger.warning(f"Empty response from Gemini for {title}")
-                return "Summary not available - API returned empty response."
+            if not image:
+                logger.warning(f"Screenshot #{article_number} returned no data")
+                return None, text
             
+            screenshot_name = await asyncio.to_thread(self.screenshot_store.write, url, image)
+            logger.info(f"Screenshot #{article_number} saved as {screenshot_name}")
+            return screenshot_name, text
+                
         except Exception as e:
-            logger.error(f"Summary generation failed for {title}: {e}")
-            if "429" in str(e) and "quota" in str(e).lower():
-                return f"AI summary temporarily unavailable due to API quota limits."
-            return f"Unable to generate AI summary. Content analysis temporarily unavailable."
\ No newline at end of file
+            logger.warning(f"Screenshot #{article_number} failed for {url}: {e}")
+            return None, text
+
+    def _record_readiness(self, condition: str, waited: float):
+        self.readiness_stats[condition] += 1
+        self.readiness_wait_total += waited
+
+    def get_readiness_stats(self) -> dict:
+        """Get counts of the readiness conditions that fired and the average wait"""
+        total = sum(self.readiness_stats.values())
+        return {
+            "strategy": self.readiness.name,
+            "page_budget_seconds": self.page_budget_seconds,
+            "conditions": dict(self.readiness_stats),
+            "average_wait_seconds": self.readiness_wait_total / total if total else 0.0,
+        }
+
+    async def _generate_summary(self, title: str, url: str, content: Optional[str] = None) -> str:
+        """Generate AI summary for an article; raises if the model call fails"""
+        model_name = self.summarizer.model_name
+        prompt_version = self.summarizer.prompt_version
+        
+        # The cache writes (last use, eviction) wait on SQLite locks, so they run off the event loop
+        if self.summary_cache:
+            cached = await asyncio.to_thread(
+                self.summary_cache.get, url, title, model_name, prompt_version, bool(content)
+            )
+            if cached:
+                logger.info(f"Using cached AI summary for: {title}")
+                return cached
+        
+        summary = await self.summarizer.summarize(title, content)
+        
+        # Only real model output is cached. A guess from the title alone is kept for a
+        # shorter time, and a later capture with text replaces it
+        if self.summary_cache:
+            await asyncio.to_thread(
+                self.summary_cache.put, url, title, model_name, prompt_version, summary, bool(content)
+            )
+        return summary
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Dict, Optional, Set
+
+from ..utils.urls import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+TEMP_PREFIX = ".tmp-"
+
+class ScreenshotStore:
+    """Content-addressed screenshot files with an atomically swapped manifest.
+
+    Every image is written to a temp file and renamed into place under a name
+    derived from its URL and its bytes, so a published name never changes
+    content and readers never see a partial file. Each feed's manifest maps
+    URLs to the images of its current batch; anything no manifest references
+    is garbage-collected once it is older than gc_max_age_seconds, which
+    gives readers of the previous batch time to finish.
+    """
+
+    def __init__(self, root: str = "screenshots", gc_max_age_seconds: int = 3600):
+        self.root = root
+        self.gc_max_age_seconds = gc_max_age_seconds
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def url_key(url: str) -> str:
+        return hashlib.sha256(canonicalize_url(url).encode("utf-8")).hexdigest()[:16]
+
+    def path_for(self, filename: str) -> str:
+        return os.path.join(self.root, filename)
+
+    def exists(self, filename: Optional[str]) -> bool:
+        """Check whether a stored image name is present on disk"""
+        if not filename or "/" in filename:
+            return False
+        return os.path.exists(self.path_for(filename))
+
+    def write(self, url: str, data: bytes, extension: str = "png") -> str:
+        """Store image bytes for a URL and return the published file name"""
+        content_key = hashlib.sha256(data).hexdigest()[:12]
+        filename = f"{self.url_key(url)}-{content_key}.{extension}"
+        path = self.path_for(filename)
+
+        # Same URL and same bytes: the existing file is already correct
+        if not os.path.exists(path):
+            self._atomic_write(path, data)
+        return filename
+
+    @staticmethod
+    def manifest_name(feed: str = "top") -> str:
+        # The top feed keeps the original name so existing manifests stay valid
+        return MANIFEST_NAME if feed == "top" else f"manifest-{feed}.json"
+
+    @staticmethod
+    def is_manifest(filename: str) -> bool:
+        return filename.startswith("manifest") and filename.endswith(".json")
+
+    def load_manifest(self, feed: str = "top") -> Dict[str, str]:
+        """Get the URL -> file name map of a feed's published batch"""
+        return self._read_manifest(self.manifest_name(feed)).get("screenshots", {})
+
+    def _read_manifest(self, name: str = MANIFEST_NAME) -> dict:
+        try:
+            with open(self.path_for(name), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Failed to read screenshot manifest {name}: {e}")
+            return {}
+
+    def _referenced_files(self) -> Set[str]:
+        referenced = set()
+        for entry in os.scandir(self.root):
+            if not entry.is_file() or not self.is_manifest(entry.name):
+                continue
+            manifest = self._read_manifest(entry.name)
+            referenced.update(manifest.get("screenshots", {}).values())
+            for variants in manifest.get("variants", {}).values():
+                referenced.update(variants.values())
+        return referenced
+
+    def lookup(self, url: str, feed: str = "top") -> Optional[str]:
+        """Get the published image for a URL, if it is still on disk"""
+        filename = self.load_manifest(feed).get(url)
+        return filename if self.exists(filename) else None
+
+    def publish(self, screenshots: Dict[str, str], variants: Optional[Dict[str, Dict[str, str]]] = None,
+                feed: str = "top"):
+        """Replace a feed's manifest with its new batch in a single rename"""
+        manifest = {
+            "published_at": time.time(),
+            "screenshots": screenshots,
+            "variants": variants or {},
+        }
+        name = self.manifest_name(feed)
+        self._atomic_write(self.path_for(name), json.dumps(manifest, indent=2).encode("utf-8"))
+        logger.info(f"Published screenshot manifest {name} with {len(screenshots)} images")
+
+    def collect_garbage(self, now: Optional[float] = None) -> int:
+        """Delete images no feed's manifest references once they are old enough"""
+        now = now or time.time()
+        referenced = self._referenced_files()
+        removed = 0
+
+        for entry in os.scandir(self.root):
+            if not entry.is_file() or self.is_manifest(entry.name) or entry.name in referenced:
+                continue
+            try:
+                if now - entry.stat().st_mtime < self.gc_max_age_seconds:
+                    continue
+                os.remove(entry.path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Failed to remove {entry.path}: {e}")
+
+        if removed:
+            logger.info(f"Removed {removed} unreferenced screenshots")
+        return removed
+
+    def _atomic_write(self, path: str, data: bytes):
+        fd, temp_path = tempfile.mkstemp(prefix=TEMP_PREFIX, dir=self.root)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
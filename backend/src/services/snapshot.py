@@ -0,0 +1,71 @@
+import gzip
+import hashlib
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from ..models.article import Article
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+@dataclass(frozen=True)
+class EncodedBody:
+    """One JSON response body, pre-encoded and pre-compressed"""
+
+    etag: str
+    encodings: Dict[str, bytes] = field(default_factory=dict)
+
+    @classmethod
+    def from_payload(cls, payload) -> "EncodedBody":
+        raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        encodings = {
+            "identity": raw,
+            "gzip": gzip.compress(raw, compresslevel=6, mtime=0),
+        }
+        if brotli is not None:
+            encodings["br"] = brotli.compress(raw, quality=9)
+        return cls(etag=hashlib.sha256(raw).hexdigest()[:32], encodings=encodings)
+
+    def etag_for(self, encoding: str) -> str:
+        # Strong validators must differ between content codings
+        suffix = "" if encoding == "identity" else f"-{encoding}"
+        return f'"{self.etag}{suffix}"'
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """Check an If-None-Match header against every encoding of this body"""
+        if not if_none_match:
+            return False
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in candidates or any(self.etag_for(encoding) in candidates for encoding in self.encodings)
+
+@dataclass(frozen=True)
+class ArticleSnapshot:
+    """Everything the read endpoints serve, built once per published batch"""
+
+    articles: EncodedBody  # GET /api/articles
+    results: EncodedBody  # GET /api/results (legacy list format)
+    cache_status: dict
+    stale_at: Optional[float]  # When is_fresh flips or the database must be rechecked, and the snapshot rebuilt
+
+    def is_stale(self, now: Optional[float] = None) -> bool:
+        return self.stale_at is not None and (now or time.time()) >= self.stale_at
+
+def build_snapshot(articles: List[Article], cache_status: dict, fresh_until: Optional[float] = None,
+                   revalidate_at: Optional[float] = None) -> ArticleSnapshot:
+    """Serialize and compress the read responses for a batch of articles"""
+    article_dicts = [article.to_dict() for article in articles]
+    deadlines = [t for t in (fresh_until if cache_status.get("is_fresh") else None, revalidate_at) if t is not None]
+    return ArticleSnapshot(
+        articles=EncodedBody.from_payload({
+            "articles": article_dicts,
+            "cache_status": cache_status,
+            "total": len(article_dicts),
+        }),
+        results=EncodedBody.from_payload(article_dicts),
+        cache_status=cache_status,
+        stale_at=min(deadlines) if deadlines else None,
+    )
@@ -0,0 +1,351 @@
+import asyncio
+import functools
+import json
+import logging
+import re
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+import google.generativeai as genai
+
+from .quota import QuotaScheduler
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_NAME = "models/gemini-1.5-flash-latest"
+
+# Bump whenever the prompt wording changes so cached summaries are invalidated
+PROMPT_VERSION = 2
+
+def build_prompt(title: str, content: Optional[str] = None) -> str:
+    if not content:
+        return f"Based on this HackerNews article title: '{title}', provide a brief 2-3 sentence summary about what this article is likely about. Focus on the main topic and key points."
+    return (
+        f"Summarize this HackerNews article titled '{title}' in 2-3 sentences. "
+        f"Focus on the main topic and key points, using only the article text below.\n\n"
+        f"Article text:\n{content}"
+    )
+
+# A batch answer longer than this per story is treated as malformed (stories run together)
+MAX_SUMMARY_CHARS = 1500
+
+# Rough token budget per request for the tokens-per-minute bucket: ~4 chars per prompt
+# token, plus what a 2-3 sentence summary costs to generate
+CHARS_PER_TOKEN = 4
+OUTPUT_TOKENS_PER_SUMMARY = 150
+
+def estimate_tokens(prompt: str, summaries: int = 1) -> int:
+    return len(prompt) // CHARS_PER_TOKEN + OUTPUT_TOKENS_PER_SUMMARY * summaries
+
+_CODE_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+def build_batch_prompt(stories: Sequence["PendingSummary"]) -> str:
+    """Ask for every story's summary in one JSON object keyed by story id"""
+    parts = [
+        "Summarize each of these HackerNews articles in 2-3 sentences, focusing on the main topic and key points. "
+        "Use the article text when it is given; for a story with only a title, say what it is likely about.",
+        'Respond with a JSON object that maps each story id to its summary, e.g. {"1": "...", "2": "..."}.',
+    ]
+    for story in stories:
+        part = f"### Story {story.story_id}\nTitle: {story.title}"
+        if story.content:
+            part += f"\nArticle text:\n{story.content}"
+        parts.append(part)
+    return "\n\n".join(parts)
+
+def parse_batch_response(text: str, story_ids: Sequence[str]) -> Dict[str, str]:
+    """Get the valid summaries out of a batch response; missing or malformed entries are left out"""
+    try:
+        payload = json.loads(_CODE_FENCE.sub("", text.strip()))
+    except ValueError:
+        return {}
+    if isinstance(payload, dict) and isinstance(payload.get("summaries"), (dict, list)):
+        payload = payload["summaries"]
+    if isinstance(payload, list):
+        # Tolerate [{"id": "1", "summary": "..."}] as well as the requested mapping
+        payload = {str(item.get("id")): item.get("summary") for item in payload if isinstance(item, dict)}
+    if not isinstance(payload, dict):
+        return {}
+
+    summaries = {}
+    for story_id in story_ids:
+        summary = payload.get(story_id)
+        if isinstance(summary, str) and summary.strip() and len(summary) <= MAX_SUMMARY_CHARS:
+            summaries[story_id] = summary.strip()
+    return summaries
+
+class Summarizer(ABC):
+    """Turns a story title, and the article text when there is any, into a short summary.
+
+    Implementations raise on failure; callers decide what fallback text to show.
+    """
+
+    model_name = "unknown"
+    prompt_version = PROMPT_VERSION
+
+    @abstractmethod
+    async def summarize(self, title: str, content: Optional[str] = None) -> str:
+        """Summarize one story; raises if the summary cannot be produced"""
+
+    def get_stats(self) -> dict:
+        return {}
+
+    def close(self):
+        pass
+
+class ModelSummarizer(Summarizer):
+    """Summarizer over a Gemini-style model object.
+
+    The model only needs `generate_content_async(prompt)` or a blocking
+    `generate_content(prompt)`, each returning an object with `.text`, so a
+    local fake model can stand in for Gemini. Blocking models run on one
+    long-lived executor sized to the in-flight limit. With a scheduler,
+    every request goes through its rate budgets, retries and breaker.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        model_name: str = DEFAULT_MODEL_NAME,
+        max_in_flight: int = 4,
+        timeout_seconds: float = 30.0,
+        scheduler: Optional[QuotaScheduler] = None,
+    ):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        self.model = model
+        self.model_name = model_name
+        self.max_in_flight = max_in_flight
+        self.timeout_seconds = timeout_seconds
+        self.scheduler = scheduler
+        self._semaphore = asyncio.Semaphore(max_in_flight)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.stats = {
+            "calls": 0,
+            "failures": 0,
+            "timeouts": 0,
+            "in_flight": 0,
+            "total_latency": 0.0,
+        }
+
+    @classmethod
+    def for_gemini(cls, api_key: str, model_name: str = DEFAULT_MODEL_NAME, **kwargs) -> "ModelSummarizer":
+        """Build a summarizer backed by the Gemini API"""
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY is required")
+        genai.configure(api_key=api_key)
+        return cls(genai.GenerativeModel(model_name), model_name=model_name, **kwargs)
+
+    async def summarize(self, title: str, content: Optional[str] = None) -> str:
+        """Generate AI summary for an article from its text, or its title alone"""
+        logger.info(f"Generating AI summary for: {title} ({len(content) if content else 0} chars of text)")
+        summary = await self.generate(build_prompt(title, content))
+        logger.info(f"Generated AI summary for {title}: {summary[:60]}...")
+        return summary
+
+    async def generate(self, prompt: str, json_output: bool = False, summaries: int = 1) -> str:
+        """Run one prompt under the quota scheduler, if any; returns the stripped response text"""
+        if self.scheduler:
+            return await self.scheduler.run(
+                functools.partial(self._generate_once, prompt, json_output), estimate_tokens(prompt, summaries)
+            )
+        return await self._generate_once(prompt, json_output)
+
+    async def _generate_once(self, prompt: str, json_output: bool) -> str:
+        """Run one attempt under the in-flight limit and timeout"""
+        async with self._semaphore:
+            self.stats["calls"] += 1
+            self.stats["in_flight"] += 1
+            started = time.perf_counter()
+            try:
+                response = await asyncio.wait_for(self._generate(prompt, json_output), timeout=self.timeout_seconds)
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                self.stats["failures"] += 1
+                raise TimeoutError(f"Summary request timed out after {self.timeout_seconds}s")
+            except Exception:
+                self.stats["failures"] += 1
+                raise
+            finally:
+                self.stats["in_flight"] -= 1
+                self.stats["total_latency"] += time.perf_counter() - started
+
+        text = getattr(response, "text", None) if response else None
+        if not text or not text.strip():
+            self.stats["failures"] += 1
+            raise ValueError("Model returned an empty response")
+        return text.strip()
+
+    async def _generate(self, prompt: str, json_output: bool = False):
+        # Only ask for a generation config when needed, so plain fake models keep working
+        kwargs = {"generation_config": {"response_mime_type": "application/json"}} if json_output else {}
+        if hasattr(self.model, "generate_content_async"):
+            return await self.model.generate_content_async(prompt, **kwargs)
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_in_flight,
+                thread_name_prefix="summarizer"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(self.model.generate_content, prompt, **kwargs))
+
+    def get_stats(self) -> dict:
+        calls = self.stats["calls"]
+        return {
+            **self.stats,
+            "model": self.model_name,
+            "max_in_flight": self.max_in_flight,
+            "average_latency": self.stats["total_latency"] / calls if calls else 0.0,
+            "quota": self.scheduler.get_stats() if self.scheduler else None,
+        }
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+@dataclass
+class PendingSummary:
+    story_id: str
+    title: str
+    content: Optional[str]
+    future: asyncio.Future
+
+    @property
+    def size(self) -> int:
+        return len(self.title) + len(self.content or "")
+
+class BatchingSummarizer(Summarizer):
+    """Micro-batches concurrent summarize() calls into one model request.
+
+    Requests are collected until batch_size stories or max_batch_chars of
+    text are waiting, or max_wait_seconds after the first one arrived, then
+    sent as a single prompt asking for JSON keyed by story id. Stories the
+    response leaves out or gets wrong are retried one by one on the wrapped
+    summarizer; a failed batch request fails all of its stories, so a quota
+    error is not multiplied into K more calls.
+    """
+
+    def __init__(
+        self,
+        summarizer: ModelSummarizer,
+        batch_size: int = 8,
+        max_wait_seconds: float = 0.5,
+        max_batch_chars: int = 64_000,
+    ):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+        self.summarizer = summarizer
+        self.model_name = summarizer.model_name
+        # Batched and single summaries follow the same instructions, so they share cache entries
+        self.prompt_version = summarizer.prompt_version
+        self.batch_size = batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.max_batch_chars = max_batch_chars
+        self._pending: List[PendingSummary] = []
+        self._pending_chars = 0
+        self._next_id = 0
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+        self._batches: Set[asyncio.Task] = set()
+        self.stats = {
+            "batches": 0,
+            "batched_stories": 0,
+            "single_fallbacks": 0,
+            "failed_batches": 0,
+        }
+
+    async def summarize(self, title: str, content: Optional[str] = None) -> str:
+        """Queue a story for the next batch and wait for its summary"""
+        if self.batch_size == 1:
+            return await self.summarizer.summarize(title, content)
+
+        loop = asyncio.get_running_loop()
+        self._next_id += 1
+        story = PendingSummary(str(self._next_id), title, content, loop.create_future())
+        self._pending.append(story)
+        self._pending_chars += story.size
+
+        if len(self._pending) >= self.batch_size or self._pending_chars >= self.max_batch_chars:
+            self._flush()
+        elif self._flush_timer is None:
+            self._flush_timer = loop.call_later(self.max_wait_seconds, self._flush)
+        return await story.future
+
+    def _flush(self):
+        if self._flush_timer:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        stories, self._pending, self._pending_chars = self._pending, [], 0
+        if not stories:
+            return
+        task = asyncio.create_task(self._run_batch(stories))
+        self._batches.add(task)
+        task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, stories: List[PendingSummary]):
+        # Callers that were cancelled while waiting no longer need a summary
+        stories = [story for story in stories if not story.future.done()]
+        if len(stories) == 1:
+            await self._summarize_single(stories[0])
+            return
+        if not stories:
+            return
+
+        self.stats["batches"] += 1
+        self.stats["batched_stories"] += len(stories)
+        try:
+            text = await self.summarizer.generate(build_batch_prompt(stories), json_output=True, summaries=len(stories))
+        except Exception as e:
+            self.stats["failed_batches"] += 1
+            logger.error(f"Batch summary request for {len(stories)} stories failed: {e}")
+            for story in stories:
+                if not story.future.done():
+                    story.future.set_exception(e)
+            return
+
+        summaries = parse_batch_response(text, [story.story_id for story in stories])
+        missing = []
+        for story in stories:
+            if story.story_id not in summaries:
+                missing.append(story)
+            elif not story.future.done():
+                story.future.set_result(summaries[story.story_id])
+        logger.info(f"Batch summarized {len(summaries)} of {len(stories)} stories in one request")
+
+        if missing:
+            logger.warning(f"Batch response missed or garbled {len(missing)} stories; summarizing them one by one")
+            self.stats["single_fallbacks"] += len(missing)
+            await asyncio.gather(*(self._summarize_single(story) for story in missing))
+
+    async def _summarize_single(self, story: PendingSummary):
+        try:
+            summary = await self.summarizer.summarize(story.title, story.content)
+        except Exception as e:
+            if not story.future.done():
+                story.future.set_exception(e)
+            return
+        if not story.future.done():
+            story.future.set_result(summary)
+
+    def get_stats(self) -> dict:
+        batches = self.stats["batches"]
+        return {
+            **self.summarizer.get_stats(),
+            **self.stats,
+            "batch_size": self.batch_size,
+            "average_batch_size": self.stats["batched_stories"] / batches if batches else 0.0,
+        }
+
+    def close(self):
+        if self._flush_timer:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        for task in self._batches:
+            task.cancel()
+        self.summarizer.close()
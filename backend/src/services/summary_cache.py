@@ -0,0 +1,164 @@
+import hashlib
+import sqlite3
+import time
+from typing import Optional
+import logging
+
+from ..utils.urls import canonicalize_url
+from .database import Database
+
+logger = logging.getLogger(__name__)
+
+class SummaryCache:
+    """Persistent summary cache stored next to the articles table.
+
+    Entries are keyed by canonical URL, title, model name and prompt version,
+    so changing the model or the prompt misses automatically. Entries expire
+    after ttl_seconds and the least recently used ones are evicted beyond
+    max_entries. Summaries written from the title alone (the page gave no
+    text) expire after title_only_ttl_seconds, and a lookup that has the
+    article text skips them so the text-based summary replaces them.
+    """
+
+    def __init__(
+        self,
+        db_path: str = "articles.db",
+        ttl_seconds: int = 7 * 24 * 3600,
+        max_entries: int = 5000,
+        title_only_ttl_seconds: int = 24 * 3600,
+        database: Optional[Database] = None,
+    ):
+        self.db_path = db_path
+        self.db = database or Database(db_path)
+        self.ttl_seconds = ttl_seconds
+        self.title_only_ttl_seconds = min(title_only_ttl_seconds, ttl_seconds)
+        self.max_entries = max_entries
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+        self.db.ensure_schema("summary_cache", self._init_db)
+
+    def _init_db(self, conn: sqlite3.Connection):
+        """Initialize the summary cache table"""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS summary_cache (
+                cache_key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                title TEXT NOT NULL,
+                model_name TEXT NOT NULL,
+                prompt_version INTEGER NOT NULL,
+                summary TEXT NOT NULL,
+                from_text INTEGER NOT NULL DEFAULT 1,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            )
+        """)
+        # Databases created by older versions only hold summaries written from text
+        if "from_text" not in {row[1] for row in conn.execute("PRAGMA table_info(summary_cache)")}:
+            conn.execute("ALTER TABLE summary_cache ADD COLUMN from_text INTEGER NOT NULL DEFAULT 1")
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_summary_cache_last_used ON summary_cache(last_used_at)
+        """)
+
+    @staticmethod
+    def make_key(url: str, title: str, model_name: str, prompt_version: int) -> str:
+        """Build the content address of a summary"""
+        material = "\x1f".join([canonicalize_url(url), title.strip(), model_name, str(prompt_version)])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def get(self, url: str, title: str, model_name: str, prompt_version: int,
+            from_text: bool = False) -> Optional[str]:
+        """Get a cached summary, or None on a miss; from_text skips summaries written from the title alone"""
+        key = self.make_key(url, title, model_name, prompt_version)
+        now = time.time()
+        try:
+            conn = self.db.connection()
+            row = conn.execute(
+                "SELECT summary, created_at, from_text FROM summary_cache WHERE cache_key = ?",
+                (key,)
+            ).fetchone()
+            ttl = self.ttl_seconds if row and row[2] else self.title_only_ttl_seconds
+
+            if row and now - row[1] < ttl and (row[2] or not from_text):
+                conn.execute(
+                    "UPDATE summary_cache SET last_used_at = ? WHERE cache_key = ?",
+                    (now, key)
+                )
+                self.stats["hits"] += 1
+                return row[0]
+
+            if row and now - row[1] >= ttl:
+                conn.execute("DELETE FROM summary_cache WHERE cache_key = ?", (key,))
+                self.stats["evictions"] += 1
+
+        except Exception as e:
+            logger.error(f"Failed to read summary cache: {e}")
+
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, url: str, title: str, model_name: str, prompt_version: int, summary: str,
+            from_text: bool = True) -> bool:
+        """Store a summary and evict entries over the size limit; never replaces one from text with a title-only one"""
+        key = self.make_key(url, title, model_name, prompt_version)
+        now = time.time()
+        try:
+            with self.db.transaction() as conn:
+                conn.execute("""
+                    INSERT INTO summary_cache
+                    (cache_key, url, title, model_name, prompt_version, summary, from_text, created_at, last_used_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(cache_key) DO UPDATE SET
+                        summary = excluded.summary, from_text = excluded.from_text,
+                        created_at = excluded.created_at, last_used_at = excluded.last_used_at
+                    WHERE excluded.from_text >= summary_cache.from_text
+                """, (key, url, title, model_name, prompt_version, summary, int(from_text), now, now))
+                self._evict(conn, now)
+            self.stats["stores"] += 1
+            return True
+
+        except Exception as e:
+            logger.error(f"Failed to write summary cache: {e}")
+            return False
+
+    def purge_other_versions(self, model_name: str, prompt_version: int) -> int:
+        """Drop entries written by a different model or prompt version"""
+        try:
+            cursor = self.db.connection().execute(
+                "DELETE FROM summary_cache WHERE model_name != ? OR prompt_version != ?",
+                (model_name, prompt_version)
+            )
+            if cursor.rowcount:
+                logger.info(f"Purged {cursor.rowcount} summaries from older models or prompts")
+            self.stats["evictions"] += cursor.rowcount
+            return cursor.rowcount
+
+        except Exception as e:
+            logger.error(f"Failed to purge summary cache: {e}")
+            return 0
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Delete expired entries, then the least recently used ones over max_entries"""
+        expired = conn.execute(
+            "DELETE FROM summary_cache WHERE created_at <= ? OR (from_text = 0 AND created_at <= ?)",
+            (now - self.ttl_seconds, now - self.title_only_ttl_seconds)
+        ).rowcount
+        overflow = conn.execute("""
+            DELETE FROM summary_cache WHERE cache_key IN (
+                SELECT cache_key FROM summary_cache
+                ORDER BY last_used_at DESC
+                LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,)).rowcount
+        self.stats["evictions"] += expired + overflow
+
+    def get_stats(self) -> dict:
+        """Get hit/miss counters"""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": self.stats["hits"] / lookups if lookups else 0.0,
+        }
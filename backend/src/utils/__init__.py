@@ -1,4 +1,6 @@
 from .rate_limiter import RateLimiter
 from .logger import setup_logger
+from .urls import canonicalize_url
+from .cursor import encode_cursor, decode_cursor
 
-__all__ = ["RateLimiter", "setup_logger"]
\ No newline at end of file
+__all__ = ["RateLimiter", "setup_logger", "canonicalize_url", "encode_cursor", "decode_cursor"]
\ No newline at end of file
@@ -0,0 +1,18 @@
+import base64
+import json
+
+def encode_cursor(position: dict) -> str:
+    """Pack a keyset position into an opaque, URL-safe cursor"""
+    raw = json.dumps(position, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> dict:
+    """Unpack a cursor made by encode_cursor; raises ValueError if it is malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}") from e
+    if not isinstance(position, dict):
+        raise ValueError("Invalid cursor")
+    return position
@@ -1,48 +1,104 @@
 import time
-from collections import defaultdict, deque
-from typing import Dict
+from collections import OrderedDict
+from typing import Callable, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
 class RateLimiter:
-    def __init__(self, max_requests: int = 10, window_seconds: int = 60):
+    """Per-client rate limiting with the generic cell rate algorithm (GCRA).
+
+    Each client costs one float, its theoretical arrival time (TAT): requests
+    are spaced window_seconds / max_requests apart, with a burst of up to
+    max_requests. A client whose TAT has passed has its full allowance back,
+    so its entry carries no information and is evicted by a sweep every
+    sweep_interval seconds. At most max_clients are tracked; beyond that the
+    least recently seen client is dropped, which only ever resets it to a
+    full allowance.
+    """
+
+    def __init__(self, max_requests: int = 10, window_seconds: int = 60, max_clients: int = 100_000,
+                 sweep_interval: float = 60.0, clock: Callable[[], float] = time.time):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests: Dict[str, deque] = defaultdict(deque)
+        self.max_clients = max_clients
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self.emission_interval = window_seconds / max_requests
+        # client_id -> TAT, least recently seen first
+        self.clients: "OrderedDict[str, float]" = OrderedDict()
+        self.stats = {"allowed": 0, "denied": 0, "expired": 0, "evicted": 0}
+        self._next_sweep = clock() + sweep_interval
 
     def is_allowed(self, client_id: str) -> bool:
         """Check if request is allowed for client"""
-        now = time.time()
-        client_requests = self.requests[client_id]
-        
-        # Remove old requests outside the window
-        while client_requests and client_requests[0] <= now - self.window_seconds:
-            client_requests.popleft()
-        
-        # Check if under limit
-        if len(client_requests) < self.max_requests:
-            client_requests.append(now)
-            return True
-        
-        logger.warning(f"Rate limit exceeded for client {client_id}")
-        return False
+        now = self.clock()
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+        clients = self.clients
+        tat = clients.get(client_id)
+        known = tat is not None
+        new_tat = (tat if known and tat > now else now) + self.emission_interval
+        if new_tat - now > self.window_seconds:
+            self.stats["denied"] += 1
+            logger.warning(f"Rate limit exceeded for client {client_id}")
+            return False
+
+        if known:
+            clients.move_to_end(client_id)
+        elif len(clients) >= self.max_clients:
+            clients.popitem(last=False)
+            self.stats["evicted"] += 1
+        clients[client_id] = new_tat
+        self.stats["allowed"] += 1
+        return True
+
+    async def check(self, client_id: str) -> Optional[dict]:
+        """None if the request is allowed, else the remaining requests and reset time to report"""
+        return self._check(client_id)
+
+    def _check(self, client_id: str) -> Optional[dict]:
+        if self.is_allowed(client_id):
+            return None
+        return {
+            "remaining_requests": self.get_remaining_requests(client_id),
+            "reset_time": self.get_reset_time(client_id),
+        }
 
     def get_remaining_requests(self, client_id: str) -> int:
         """Get remaining requests for client"""
-        now = time.time()
-        client_requests = self.requests[client_id]
-        
-        # Remove old requests
-        while client_requests and client_requests[0] <= now - self.window_seconds:
-            client_requests.popleft()
-        
-        return max(0, self.max_requests - len(client_requests))
+        now = self.clock()
+        tat = self._get_tat(client_id)
+        tat = now if tat is None else max(tat, now)
+        return max(0, min(self.max_requests, int((self.window_seconds - (tat - now)) / self.emission_interval + 1e-9)))
 
     def get_reset_time(self, client_id: str) -> float:
-        """Get time when rate limit resets for client"""
-        client_requests = self.requests[client_id]
-        if not client_requests:
-            return time.time()
-        
-        return client_requests[0] + self.window_seconds
\ No newline at end of file
+        """Get time when client may make its next request"""
+        now = self.clock()
+        tat = self._get_tat(client_id)
+        if tat is None:
+            return now
+        return max(now, tat + self.emission_interval - self.window_seconds)
+
+    def _get_tat(self, client_id: str) -> Optional[float]:
+        return self.clients.get(client_id)
+
+    def _sweep(self, now: float):
+        """Drop clients whose allowance has fully refilled"""
+        # Entries are in last-seen order, so this stops at the first client still
+        # refilling. Expired clients seen after it (a TAT can sit up to a window
+        # past the last request) wait for a later sweep or the max_clients bound;
+        # the cost stays proportional to what is dropped
+        expired = 0
+        while self.clients:
+            client_id, tat = next(iter(self.clients.items()))
+            if tat > now:
+                break
+            del self.clients[client_id]
+            expired += 1
+        self.stats["expired"] += expired
+        self._next_sweep = now + self.sweep_interval
+
+    def get_stats(self) -> dict:
+        return {**self.stats, "tracked_clients": len(self.clients)}
@@ -0,0 +1,159 @@
+from datetime import datetime, timedelta
+
+from src.models.article import Article
+from src.services.archive import StoryArchive
+from src.services.cache import ArticleCache
+from src.services.database import Database
+
+def make_article(rank, url, summary=None, title=None):
+    now = datetime.now()
+    return Article(
+        title=title or f"Story {url[-1]}",
+        url=url,
+        status="success",
+        summary=summary or f"Summary {url[-1]}",
+        created_at=now,
+        updated_at=now,
+        rank=rank
+    )
+
+def make_cache(tmp_path, **archive_options):
+    database = Database(str(tmp_path / "test.db"))
+    cache = ArticleCache(database=database)
+    archive = StoryArchive(database=database, **archive_options)
+    cache.archive = archive
+    return cache, archive
+
+def test_snapshots_keep_history_while_articles_hold_latest(tmp_path):
+    """Test every batch is archived even though the articles table is replaced"""
+    cache, archive = make_cache(tmp_path)
+    cache.save_articles([make_article(1, "https://example.com/a"), make_article(2, "https://example.com/b")])
+    cache.save_articles([make_article(1, "https://example.com/b"), make_article(2, "https://example.com/c")])
+
+    assert len(cache.get_articles()) == 2
+    assert [s["batch_id"] for s in archive.list_snapshots()] == [2, 1]
+
+    first = archive.snapshot_at(archive.list_snapshots()[-1]["published_at"])
+    assert [s["url"] for s in first["stories"]] == ["https://example.com/a", "https://example.com/b"]
+    assert archive.snapshot_at()["batch_id"] == 2
+    assert archive.snapshot_at("2000-01-01T00:00:00") is None
+
+def test_story_history_dedupes_stories_and_summaries(tmp_path):
+    """Test a story is stored once and its rank tracked per snapshot"""
+    cache, archive = make_cache(tmp_path)
+    for rank in (3, 2, 1):
+        cache.save_articles([make_article(rank, "https://example.com/a", summary="Same summary")])
+    cache.save_articles([make_article(1, "https://example.com/a", summary="New summary")])
+
+    history = archive.story_history("https://example.com/a")
+
+    assert [a["rank"] for a in history["appearances"]] == [1, 1, 2, 3]
+    assert [a["summary"] for a in history["appearances"]][:2] == ["New summary", "Same summary"]
+    conn = cache.db.connection()
+    assert conn.execute("SELECT COUNT(*) FROM stories").fetchone()[0] == 1
+    assert conn.execute("SELECT COUNT(*) FROM story_summaries").fetchone()[0] == 2
+    assert archive.story_history("https://example.com/missing") is None
+
+def test_compaction_thins_and_expires_old_snapshots(tmp_path):
+    """Test old snapshots thin to one per hour, expire, and take orphans with them"""
+    cache, archive = make_cache(tmp_path, full_resolution_seconds=3600, retention_days=2)
+    conn = cache.db.connection()
+    cache.save_articles([make_article(1, "https://example.com/x")])
+    for _ in range(3):
+        cache.save_articles([make_article(1, "https://example.com/a")])
+    cache.save_articles([make_article(1, "https://example.com/b")])
+
+    # Backdate: batch 1 past retention, batches 2-4 in one old hour, batch 5 recent
+    now = datetime(2024, 6, 10, 12, 0, 0)
+    stamps = [now - timedelta(days=3), now - timedelta(hours=5, minutes=50),
+              now - timedelta(hours=5, minutes=40), now - timedelta(hours=5, minutes=30), now]
+    for batch_id, stamp in enumerate(stamps, start=1):
+        conn.execute("UPDATE refresh_batches SET published_at = ? WHERE id = ?", (stamp.isoformat(), batch_id))
+
+    dropped = archive.compact(now=now)
+
+    assert dropped == 3
+    assert [s["batch_id"] for s in archive.list_snapshots()] == [5, 2]
+    assert archive.story_history("https://example.com/x") is None
+    assert len(archive.story_history("https://example.com/a")["appearances"]) == 1
+
+def test_search_ranks_title_matches_and_highlights_safely(tmp_path):
+    """Test search ranks title hits first and escapes text around highlights"""
+    cache, archive = make_cache(tmp_path)
+    cache.save_articles([
+        make_article(1, "https://example.com/a", title="Rust <b>compiler</b> internals", summary="Notes on borrow checking."),
+        make_article(2, "https://example.com/b", title="Weekly digest", summary="Includes a piece on the Rust compiler."),
+        make_article(3, "https://example.com/c", title="Gardening", summary="Tomatoes."),
+    ])
+
+    found = archive.search("rust compil*")
+
+    assert [r["url"] for r in found["results"]] == ["https://example.com/a", "https://example.com/b"]
+    assert found["results"][0]["title_highlight"] == "<mark>Rust</mark> &lt;b&gt;<mark>compiler</mark>&lt;/b&gt; internals"
+    assert "<mark>compiler</mark>" in found["results"][1]["summary_snippet"]
+    assert not found["has_more"]
+
+def test_search_index_follows_writes_and_compaction(tmp_path):
+    """Test the index sees summary changes and forgets compacted stories"""
+    cache, archive = make_cache(tmp_path, retention_days=1)
+    cache.save_articles([make_article(1, "https://example.com/a", summary="Original wording")])
+    cache.save_articles([make_article(1, "https://example.com/a", summary="Rewritten text")])
+
+    assert archive.search("original")["results"] == []
+    assert len(archive.search("rewritten")["results"]) == 1
+
+    cache.save_articles([make_article(1, "https://example.com/b")])
+    conn = cache.db.connection()
+    conn.execute("UPDATE refresh_batches SET published_at = '2000-01-01T00:00:00' WHERE id < 3")
+    archive.compact()
+
+    assert archive.search("rewritten")["results"] == []
+
+def test_search_pagination_and_query_sanitizing(tmp_path):
+    """Test paging with has_more and that FTS syntax in the query is treated as text"""
+    cache, archive = make_cache(tmp_path)
+    cache.save_articles([
+        make_article(i, f"https://example.com/{i}", title=f"Python release {i}") for i in range(1, 6)
+    ])
+
+    first = archive.search("python", limit=2)
+    last = archive.search("python", limit=2, offset=4)
+
+    assert len(first["results"]) == 2 and first["has_more"]
+    assert len(last["results"]) == 1 and not last["has_more"]
+    assert archive.search('python" OR NEAR(title:') == {"results": [], "has_more": False}
+    assert len(archive.search('"python" AND')["results"]) == 0
+    assert archive.search("*** ---") == {"results": [], "has_more": False}
+    assert archive.search("pyth")["results"] == []
+    assert len(archive.search("pyth*")["results"]) == 5
+
+def test_history_pages_with_before_batch(tmp_path):
+    """Test story history and snapshot lists continue from a batch id"""
+    cache, archive = make_cache(tmp_path)
+    for rank in range(1, 6):
+        cache.save_articles([make_article(rank, "https://example.com/a")])
+
+    first = archive.story_history("https://example.com/a", limit=2)["appearances"]
+    rest = archive.story_history("https://example.com/a", limit=10, before_batch=first[-1]["batch_id"])["appearances"]
+
+    assert [a["batch_id"] for a in first + rest] == [5, 4, 3, 2, 1]
+    assert [s["batch_id"] for s in archive.list_snapshots(limit=2, before_batch=4)] == [3, 2]
+
+def test_feeds_have_their_own_snapshots_and_share_stories(tmp_path):
+    """Test snapshots are listed per feed, stories are shared, and each feed's latest survives compaction"""
+    cache, archive = make_cache(tmp_path, full_resolution_seconds=3600, retention_days=2)
+    new = ArticleCache(database=cache.db, archive=archive, feed="new")
+    cache.save_articles([make_article(1, "https://example.com/a")])
+    new.save_articles([make_article(3, "https://example.com/a"), make_article(1, "https://example.com/b")])
+
+    assert [s["batch_id"] for s in archive.list_snapshots(feed="new")] == [2]
+    assert [s["url"] for s in archive.snapshot_at(feed="top")["stories"]] == ["https://example.com/a"]
+    history = archive.story_history("https://example.com/a")
+    assert [(a["feed"], a["rank"]) for a in history["appearances"]] == [("new", 3), ("top", 1)]
+    assert [a["feed"] for a in archive.story_history("https://example.com/a", feed="top")["appearances"]] == ["top"]
+    assert cache.db.connection().execute("SELECT COUNT(*) FROM stories").fetchone()[0] == 2
+
+    # Both batches are past retention, but each is its feed's latest
+    old = (datetime.now() - timedelta(days=5)).isoformat()
+    cache.db.connection().execute("UPDATE refresh_batches SET published_at = ?", (old,))
+    assert archive.compact() == 0
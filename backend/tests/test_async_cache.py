@@ -0,0 +1,103 @@
+import asyncio
+import dataclasses
+import threading
+import time
+from datetime import datetime
+
+from src.models.article import Article
+from src.services.async_cache import AsyncArticleCache
+from src.services.cache import ArticleCache
+
+def make_articles(count, prefix="Story"):
+    now = datetime.now()
+    return [
+        Article(title=f"{prefix} {i}", url=f"https://example.com/{i}", status="success",
+                created_at=now, updated_at=now, rank=i + 1)
+        for i in range(count)
+    ]
+
+class SlowWriteCache(ArticleCache):
+    """Holds its write transaction open to simulate a long refresh write"""
+
+    def save_articles(self, articles, duration_seconds=None):
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM articles")
+            time.sleep(0.3)
+        return super().save_articles(articles, duration_seconds)
+
+def test_round_trip(tmp_path):
+    """Test async reads see what async writes stored"""
+    cache = AsyncArticleCache(ArticleCache(str(tmp_path / "test.db")))
+
+    async def run():
+        assert await cache.save_articles(make_articles(3))
+        articles = await cache.get_articles()
+        status = await cache.get_cache_status()
+        return articles, status
+
+    articles, status = asyncio.run(run())
+    cache.close()
+
+    assert [a.rank for a in articles] == [1, 2, 3]
+    assert status["total_articles"] == 3
+
+def test_writes_are_confined_to_one_thread(tmp_path):
+    """Test every write runs on the same dedicated writer thread"""
+    threads = set()
+
+    class RecordingCache(ArticleCache):
+        def save_articles(self, articles, duration_seconds=None):
+            threads.add(threading.current_thread().name)
+            return super().save_articles(articles, duration_seconds)
+
+    cache = AsyncArticleCache(RecordingCache(str(tmp_path / "test.db")))
+
+    async def run():
+        await asyncio.gather(*(cache.save_articles(make_articles(2, f"Batch {i}")) for i in range(5)))
+
+    asyncio.run(run())
+    cache.close()
+
+    assert len(threads) == 1
+    assert threads.pop().startswith("db-writer")
+
+def test_reads_are_not_blocked_by_a_write(tmp_path):
+    """Test readers keep getting the last committed batch while a write is in progress"""
+    cache = AsyncArticleCache(SlowWriteCache(str(tmp_path / "test.db")), readers=2)
+    ArticleCache.save_articles(cache.cache, make_articles(3))
+
+    async def run():
+        write = asyncio.create_task(cache.save_articles(make_articles(5, "New")))
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        articles = await cache.get_articles()
+        elapsed = time.perf_counter() - started
+        await write
+        return articles, elapsed
+
+    articles, elapsed = asyncio.run(run())
+    cache.close()
+
+    assert len(articles) == 3
+    assert elapsed < 0.2
+
+def test_stale_snapshot_is_served_while_it_rebuilds(tmp_path):
+    """Test a snapshot that went stale is returned at once and replaced in the background"""
+    cache = AsyncArticleCache(ArticleCache(str(tmp_path / "test.db")))
+
+    async def scenario():
+        await cache.save_articles(make_articles(3))
+        first = dataclasses.replace(await cache.get_snapshot(), stale_at=time.time() - 1)
+        cache._snapshot = first
+        served = await cache.get_snapshot()
+        await cache._revalidation
+        return first, served, await cache.get_snapshot()
+
+    try:
+        first, served, rebuilt = asyncio.run(scenario())
+    finally:
+        cache.close()
+
+    assert served is first
+    assert rebuilt is not first
+    assert not rebuilt.is_stale()
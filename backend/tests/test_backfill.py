@@ -0,0 +1,112 @@
+import asyncio
+from datetime import datetime
+
+from src.models.article import Article
+from src.services.archive import StoryArchive
+from src.services.async_cache import AsyncArticleCache
+from src.services.backfill import SummaryBackfill
+from src.services.cache import ArticleCache
+from src.services.coordination import Lease
+from src.services.database import Database
+from src.services.quota import CircuitBreaker
+
+def make_article(rank, url, summary=None):
+    now = datetime.now()
+    return Article(title=f"Story {url[-1]}", url=url, status="success", summary=summary,
+                   created_at=now, updated_at=now, rank=rank, content_text=f"Text {url[-1]}")
+
+def make_caches(tmp_path):
+    database = Database(str(tmp_path / "test.db"))
+    archive = StoryArchive(database=database)
+    top = AsyncArticleCache(ArticleCache(database=database, archive=archive))
+    new = AsyncArticleCache(ArticleCache(database=database, archive=archive, feed="new"), share_threads_with=top)
+    return {"top": top, "new": new}, archive
+
+def test_deferred_summaries_are_filled_in_every_feed(tmp_path):
+    """Test a pending story is summarized once and updated in each feed, the archive and the snapshots"""
+    caches, archive = make_caches(tmp_path)
+    summarized = []
+    updates = []
+
+    async def summarize(title, url, content=None):
+        summarized.append((url, content))
+        return f"Summary of {title}"
+
+    async def run():
+        await caches["top"].save_articles([
+            make_article(1, "https://example.com/a"),
+            make_article(2, "https://example.com/b", summary="AI summary temporarily unavailable due to API quota limits."),
+            make_article(3, "https://example.com/c", summary="Already summarized"),
+        ])
+        await caches["new"].save_articles([make_article(1, "https://example.com/a")])
+        backfill = SummaryBackfill(caches, summarize, on_summary=lambda feed, a: updates.append((feed, a.rank, a.url)))
+        filled = await backfill.run_once()
+        snapshot = await caches["new"].get_snapshot()
+        return filled, backfill, snapshot
+
+    filled, backfill, snapshot = asyncio.run(run())
+    caches["top"].close()
+
+    assert filled == 2
+    assert sorted(summarized) == [("https://example.com/a", "Text a"), ("https://example.com/b", "Text b")]
+    assert [a.summary for a in caches["top"].cache.get_articles()] == ["Summary of Story a", "Summary of Story b", "Already summarized"]
+    assert b"Summary of Story a" in snapshot.articles.encodings["identity"]
+    assert b"\"summary_status\":\"ready\"" in snapshot.articles.encodings["identity"]
+    assert sorted(updates) == [("new", 1, "https://example.com/a"), ("top", 1, "https://example.com/a"),
+                               ("top", 2, "https://example.com/b")]
+    history = archive.story_history("https://example.com/a")
+    assert {a["summary"] for a in history["appearances"]} == {"Summary of Story a"}
+    assert backfill.get_stats()["filled"] == 2
+
+def test_failed_retries_stay_pending_and_open_breaker_skips(tmp_path):
+    """Test stories stay pending when the retry fails, and no call is made while the breaker is open"""
+    caches, _ = make_caches(tmp_path)
+    breaker = CircuitBreaker(failure_threshold=1)
+    calls = 0
+
+    async def summarize(title, url, content=None):
+        nonlocal calls
+        calls += 1
+        raise RuntimeError("503 Service Unavailable")
+
+    async def run():
+        await caches["top"].save_articles([make_article(1, "https://example.com/a")])
+        backfill = SummaryBackfill(caches, summarize, breaker=breaker)
+        first = await backfill.run_once()
+        breaker.record_failure()
+        second = await backfill.run_once()
+        return first, second, backfill
+
+    first, second, backfill = asyncio.run(run())
+    caches["top"].close()
+
+    assert (first, second, calls) == (0, 0, 1)
+    assert caches["top"].cache.get_articles()[0].summary_pending
+    assert (backfill.stats["failed"], backfill.stats["skipped"]) == (1, 1)
+
+def test_lease_is_held_for_a_run_longer_than_its_ttl(tmp_path):
+    """Test a slow backfill keeps renewing its lease, so another process cannot start the same work"""
+    caches, _ = make_caches(tmp_path)
+    database = caches["top"].cache.db
+    calls = []
+
+    async def summarize(title, url, content=None):
+        calls.append(url)
+        await asyncio.sleep(0.4)
+        return "Late summary"
+
+    async def run():
+        await caches["top"].save_articles([make_article(1, "https://example.com/a")])
+        first = SummaryBackfill(caches, summarize, lease=Lease(database, "summary-backfill", ttl_seconds=0.15))
+        second = SummaryBackfill(caches, summarize, lease=Lease(database, "summary-backfill", ttl_seconds=0.15))
+        running = asyncio.create_task(first.run_once())
+        await asyncio.sleep(0.3)
+        skipped = await second.run_once()
+        return await running, skipped, second
+
+    filled, skipped, second = asyncio.run(run())
+    caches["top"].close()
+
+    assert (filled, skipped) == (1, 0)
+    assert calls == ["https://example.com/a"]
+    assert second.stats["skipped"] == 1
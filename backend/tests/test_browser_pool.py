@@ -0,0 +1,116 @@
+import asyncio
+
+from src.services import browser_pool as browser_pool_module
+from src.services.browser_pool import BrowserPool
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+
+    async def new_page(self):
+        return object()
+
+    async def close(self):
+        self.closed = True
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self, **kwargs):
+        return FakeContext(self)
+
+    async def close(self):
+        self.connected = False
+
+class FakeChromium:
+    async def launch(self, **kwargs):
+        return FakeBrowser()
+
+class FakePlaywright:
+    chromium = FakeChromium()
+
+    async def stop(self):
+        pass
+
+class FakePlaywrightStarter:
+    async def start(self):
+        return FakePlaywright()
+
+def use_fake_playwright(monkeypatch):
+    monkeypatch.setattr(browser_pool_module, "async_playwright", FakePlaywrightStarter)
+
+def test_pool_reuses_browser_across_leases(monkeypatch):
+    """Test the browser is launched once and reused for every lease"""
+    use_fake_playwright(monkeypatch)
+
+    async def run():
+        async with BrowserPool(max_contexts=2) as pool:
+            for _ in range(3):
+                async with pool.context() as context:
+                    assert not context.closed
+            return pool.get_stats()
+
+    stats = asyncio.run(run())
+    assert stats["launches"] == 1
+    assert stats["leases"] == 3
+    assert stats["browser_reuses"] == 3
+    assert stats["warm_hits"] >= 1
+
+def test_pool_hands_out_fresh_contexts(monkeypatch):
+    """Test a released context is closed and never handed out again"""
+    use_fake_playwright(monkeypatch)
+
+    async def run():
+        async with BrowserPool(max_contexts=1) as pool:
+            async with pool.context() as first:
+                pass
+            async with pool.context() as second:
+                pass
+            return first, second
+
+    first, second = asyncio.run(run())
+    assert first is not second
+    assert first.closed
+
+def test_pool_restarts_crashed_browser(monkeypatch):
+    """Test a disconnected browser is relaunched on the next lease"""
+    use_fake_playwright(monkeypatch)
+
+    async def run():
+        async with BrowserPool(max_contexts=1) as pool:
+            pool._browser.connected = False
+            async with pool.context() as context:
+                assert context.browser.is_connected()
+            return pool.get_stats()
+
+    stats = asyncio.run(run())
+    assert stats["launches"] == 2
+    assert stats["restarts"] == 1
+
+def test_pool_limits_concurrent_contexts(monkeypatch):
+    """Test leases beyond max_contexts wait for a free slot"""
+    use_fake_playwright(monkeypatch)
+    active = 0
+    peak = 0
+
+    async def run():
+        async with BrowserPool(max_contexts=2) as pool:
+            async def lease():
+                nonlocal active, peak
+                async with pool.context():
+                    active += 1
+                    peak = max(peak, active)
+                    await asyncio.sleep(0.01)
+                    active -= 1
+
+            await asyncio.gather(*(lease() for _ in range(6)))
+            return pool.get_stats()
+
+    stats = asyncio.run(run())
+    assert peak == 2
+    assert stats["wait_time_max"] > 0
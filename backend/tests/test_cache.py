@@ -0,0 +1,162 @@
+from datetime import datetime
+
+from src.models.article import Article
+from src.services.cache import ArticleCache
+
+def make_article(rank, url, title=None):
+    now = datetime.now()
+    return Article(
+        title=title or f"Story {rank}",
+        url=url,
+        screenshot_path=f"/screenshots/{rank}.png",
+        status="success",
+        summary=f"Summary {rank}",
+        created_at=now,
+        updated_at=now,
+        rank=rank
+    )
+
+def test_save_and_get_articles_in_rank_order(tmp_path):
+    """Test articles come back ordered by HN rank"""
+    cache = ArticleCache(str(tmp_path / "test.db"))
+    cache.save_articles([
+        make_article(2, "https://example.com/b"),
+        make_article(1, "https://example.com/a"),
+    ])
+
+    articles = cache.get_articles()
+
+    assert [a.rank for a in articles] == [1, 2]
+    assert articles[0].url == "https://example.com/a"
+
+def test_save_articles_replaces_previous_batch(tmp_path):
+    """Test stories missing from a new batch are removed and kept ones updated"""
+    cache = ArticleCache(str(tmp_path / "test.db"))
+    cache.save_articles([
+        make_article(1, "https://example.com/a"),
+        make_article(2, "https://example.com/b"),
+    ])
+    cache.save_articles([
+        make_article(1, "https://example.com/b", title="Story B moved up"),
+        make_article(2, "https://example.com/c"),
+    ])
+
+    articles = cache.get_articles()
+
+    assert [(a.rank, a.url) for a in articles] == [(1, "https://example.com/b"), (2, "https://example.com/c")]
+    assert articles[0].title == "Story B moved up"
+
+def test_cache_status(tmp_path):
+    """Test status counts and freshness after a save"""
+    cache = ArticleCache(str(tmp_path / "test.db"))
+    assert cache.get_cache_status()["total_articles"] == 0
+    assert not cache.is_cache_fresh()
+
+    cache.save_articles([make_article(1, "https://example.com/a")])
+    status = cache.get_cache_status()
+
+    assert status["total_articles"] == 1
+    assert status["successful_articles"] == 1
+    assert status["is_fresh"]
+
+def test_batch_metadata_survives_restart_without_scanning(tmp_path):
+    """Test status comes from the recorded batch, reloaded once on startup"""
+    path = str(tmp_path / "test.db")
+    cache = ArticleCache(path)
+    failed = make_article(2, "https://example.com/b")
+    failed.status = "failed"
+    cache.save_articles([make_article(1, "https://example.com/a"), failed], duration_seconds=12.5)
+    cache.db.close()
+
+    reopened = ArticleCache(path)
+    status = reopened.get_cache_status()
+    assert status["batch_id"] == 1
+    assert status["total_articles"] == 2
+    assert status["successful_articles"] == 1
+    assert status["status_counts"] == {"success": 1, "failed": 1}
+    assert status["duration_seconds"] == 12.5
+
+    # Status and freshness no longer touch the database
+    reopened.db.close()
+    reopened.db.connection = None
+    assert reopened.is_cache_fresh()
+    assert reopened.get_cache_status()["total_articles"] == 2
+
+def test_batch_metadata_derived_for_databases_without_batches(tmp_path):
+    """Test articles saved before batches existed still report a status"""
+    path = str(tmp_path / "test.db")
+    cache = ArticleCache(path)
+    cache.save_articles([make_article(1, "https://example.com/a")])
+    cache.db.connection().execute("DELETE FROM refresh_batches")
+    cache.db.close()
+
+    status = ArticleCache(path).get_cache_status()
+
+    assert status["batch_id"] is None
+    assert status["total_articles"] == 1
+    assert status["is_fresh"]
+
+def test_articles_page_walks_keyset_in_rank_order(tmp_path):
+    """Test keyset pages cover every article once, unranked ones last"""
+    cache = ArticleCache(str(tmp_path / "test.db"))
+    unranked = make_article(None, "https://example.com/z")
+    cache.save_articles([unranked] + [make_article(rank, f"https://example.com/{rank}") for rank in range(5, 0, -1)])
+
+    seen, after = [], None
+    while True:
+        page, after = cache.get_articles_page(after, limit=2)
+        seen.extend(a.url for a in page)
+        if after is None:
+            break
+
+    assert seen == [f"https://example.com/{rank}" for rank in range(1, 6)] + ["https://example.com/z"]
+
+def test_feeds_keep_separate_articles_and_batches(tmp_path):
+    """Test the same URL can sit in two feeds and each feed only replaces its own batch"""
+    top = ArticleCache(str(tmp_path / "test.db"))
+    new = ArticleCache(database=top.db, feed="new")
+    top.save_articles([make_article(1, "https://example.com/a"), make_article(2, "https://example.com/b")])
+    new.save_articles([make_article(1, "https://example.com/b"), make_article(2, "https://example.com/c")])
+    top.save_articles([make_article(1, "https://example.com/a")])
+
+    assert [a.url for a in top.get_articles()] == ["https://example.com/a"]
+    assert [a.url for a in new.get_articles()] == ["https://example.com/b", "https://example.com/c"]
+    assert [a.url for a in new.get_articles_page(None, 1)[0]] == ["https://example.com/b"]
+    assert top.get_cache_status()["batch_id"] == 3
+    assert new.get_cache_status()["batch_id"] == 2
+    assert ArticleCache(database=top.db, feed="new").get_cache_status()["total_articles"] == 2
+
+def test_pre_feed_articles_table_becomes_the_top_feed(tmp_path):
+    """Test a database whose articles had globally unique URLs is migrated in place"""
+    import sqlite3
+    path = str(tmp_path / "test.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("""
+            CREATE TABLE articles (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, url TEXT NOT NULL UNIQUE,
+                screenshot_path TEXT, status TEXT NOT NULL, summary TEXT,
+                created_at TIMESTAMP, updated_at TIMESTAMP, rank INTEGER, screenshot_variants TEXT
+            )
+        """)
+        conn.execute("""
+            INSERT INTO articles (title, url, status, rank, updated_at)
+            VALUES ('Old story', 'https://example.com/a', 'success', 1, '2024-01-01T00:00:00')
+        """)
+
+    top = ArticleCache(path)
+    new = ArticleCache(database=top.db, feed="new")
+    new.save_articles([make_article(1, "https://example.com/a")])
+
+    assert [a.title for a in top.get_articles()] == ["Old story"]
+    assert [a.title for a in new.get_articles()] == ["Story 1"]
+
+def test_article_text_is_stored_but_not_served(tmp_path):
+    """Test captured page text survives a round trip and stays out of API payloads"""
+    cache = ArticleCache(str(tmp_path / "test.db"))
+    article = make_article(1, "https://example.com/a")
+    article.content_text = "Readable article text"
+    cache.save_articles([article])
+
+    stored = cache.get_articles()[0]
+    assert stored.content_text == "Readable article text"
+    assert "content_text" not in stored.to_dict()
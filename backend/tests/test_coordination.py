@@ -0,0 +1,169 @@
+import asyncio
+import multiprocessing
+import time
+
+from src.services.coordination import Lease, SharedRateLimiter
+from src.services.database import Database
+from src.services.refresh import RefreshCoordinator
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def hammer_limiter(db_path, client_count, attempts, results):
+    """Make attempts requests for each client through this process's own limiter"""
+    limiter = SharedRateLimiter(Database(db_path), max_requests=5, window_seconds=300)
+    allowed = sum(limiter.is_allowed(f"client{n % client_count}") for n in range(attempts))
+    results.put(allowed)
+
+def refresh_through_lease(db_path, log_path, ready):
+    """Run one refresh that appends its start and end to a shared log"""
+    async def run(job):
+        with open(log_path, "a") as log:
+            log.write(f"start {time.time()}\n")
+        await asyncio.sleep(0.2)
+        with open(log_path, "a") as log:
+            log.write(f"end {time.time()}\n")
+
+    async def scenario():
+        lease = Lease(Database(db_path), "refresh", ttl_seconds=5)
+        coordinator = RefreshCoordinator(run, lease=lease, lease_poll_seconds=0.02)
+        ready.wait()
+        job, _ = coordinator.submit()
+        await coordinator.wait(job.id)
+
+    asyncio.run(scenario())
+
+def test_shared_limit_holds_across_processes(tmp_path):
+    """Test workers sharing one state file admit the limit once between them, not once each"""
+    db_path = str(tmp_path / "state.db")
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    workers = [context.Process(target=hammer_limiter, args=(db_path, 3, 30, results)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    allowed = [results.get(timeout=30) for _ in workers]
+    for worker in workers:
+        worker.join(timeout=30)
+
+    assert sum(allowed) == 3 * 5
+
+def test_only_one_process_refreshes_at_a_time(tmp_path):
+    """Test refreshes started together in several processes run one after another"""
+    db_path = str(tmp_path / "state.db")
+    log_path = tmp_path / "refreshes.log"
+    context = multiprocessing.get_context("spawn")
+    ready = context.Event()
+    workers = [context.Process(target=refresh_through_lease, args=(db_path, str(log_path), ready)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    time.sleep(0.5)
+    ready.set()
+    for worker in workers:
+        worker.join(timeout=30)
+
+    lines = [line.split() for line in log_path.read_text().splitlines()]
+    assert [kind for kind, _ in lines] == ["start", "end"] * 3
+    assert all(worker.exitcode == 0 for worker in workers)
+
+def test_shared_limiter_matches_in_process_rules(tmp_path):
+    """Test the shared limiter refills, reports and sweeps like RateLimiter"""
+    clock = FakeClock()
+    limiter = SharedRateLimiter(Database(str(tmp_path / "state.db")), max_requests=2, window_seconds=60,
+                                sweep_interval=10, clock=clock)
+
+    assert limiter.get_remaining_requests("stranger") == 2
+    assert limiter.get_stats()["tracked_clients"] == 0
+
+    assert limiter.is_allowed("a") and limiter.is_allowed("a")
+    assert not limiter.is_allowed("a")
+    assert limiter.get_reset_time("a") == clock.now + 30
+
+    clock.now += 30
+    assert limiter.is_allowed("a")
+    clock.now += 100
+    limiter.is_allowed("b")
+    assert limiter.get_stats()["expired"] == 1
+    clock.now += 10
+    assert asyncio.run(limiter.check("c")) is None
+    assert limiter.get_stats()["tracked_clients"] == 1  # Counted by the sweep before "c" arrived
+
+    limiter.is_allowed("c")
+    assert asyncio.run(limiter.check("c")) == {"remaining_requests": 0, "reset_time": clock.now + 30}
+
+def test_lease_expires_and_is_taken_over(tmp_path):
+    """Test a lease is exclusive while held and passes on once released or lapsed"""
+    clock = FakeClock()
+    database = Database(str(tmp_path / "state.db"))
+    first = Lease(database, "refresh", owner="first", ttl_seconds=60, clock=clock)
+    second = Lease(database, "refresh", owner="second", ttl_seconds=60, clock=clock)
+
+    assert first.acquire()
+    assert not second.acquire()
+    assert first.acquire()  # Renewal
+    assert second.holder() == "first"
+
+    clock.now += 61
+    assert second.acquire()
+    assert not first.acquire()
+
+    second.release()
+    assert first.holder() is None
+    assert first.acquire()
+
+def test_refresh_stops_when_its_lease_is_lost(tmp_path):
+    """Test a refresh is cancelled before publishing once another worker takes its lease"""
+    database = Database(str(tmp_path / "state.db"))
+    published = []
+
+    async def run(job):
+        await asyncio.sleep(0.5)
+        published.append(job.id)
+
+    async def scenario():
+        coordinator = RefreshCoordinator(run, lease=Lease(database, "refresh", owner="first", ttl_seconds=0.15))
+        job, _ = coordinator.submit()
+        await asyncio.sleep(0.02)
+        database.connection().execute("UPDATE leases SET owner = 'second', expires_at = ?", (time.time() + 60,))
+        await coordinator.wait(job.id)
+        return job
+
+    job = asyncio.run(scenario())
+
+    assert job.status == "failed" and "lease" in job.error
+    assert published == []
+    assert Lease(database, "refresh").holder() == "second"
+
+def test_feeds_share_one_refresh_lease(tmp_path):
+    """Test feeds of different workers never scrape together, while one worker's feeds run side by side"""
+    database = Database(str(tmp_path / "state.db"))
+    log = []
+
+    def make_run(name):
+        async def run(job):
+            log.append(("start", name))
+            await asyncio.sleep(0.1)
+            log.append(("end", name))
+        return run
+
+    async def scenario():
+        first = Lease(database, "refresh", owner="first", ttl_seconds=5)
+        second = Lease(database, "refresh", owner="second", ttl_seconds=5)
+        coordinators = [
+            RefreshCoordinator(make_run("first:top"), lease=first, lease_poll_seconds=0.02),
+            RefreshCoordinator(make_run("first:new"), lease=first, lease_poll_seconds=0.02),
+            RefreshCoordinator(make_run("second:best"), lease=second, lease_poll_seconds=0.02),
+        ]
+        jobs = [coordinator.submit()[0] for coordinator in coordinators]
+        for coordinator, job in zip(coordinators, jobs):
+            await coordinator.wait(job.id)
+        return first
+
+    first = asyncio.run(scenario())
+
+    assert log[:4] == [("start", "first:top"), ("start", "first:new"), ("end", "first:top"), ("end", "first:new")]
+    assert log[4:] == [("start", "second:best"), ("end", "second:best")]
+    assert first.holder() is None
@@ -0,0 +1,16 @@
+import pytest
+
+from src.utils.cursor import decode_cursor, encode_cursor
+
+def test_cursor_round_trip():
+    """Test a cursor decodes to the position it was made from"""
+    cursor = encode_cursor({"rank": 3, "id": 42})
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == {"rank": 3, "id": 42}
+
+@pytest.mark.parametrize("cursor", ["not base64!", "bm90IGpzb24", encode_cursor({"a": 1})[:-3], "WzEsMl0"])
+def test_cursor_rejects_garbage(cursor):
+    """Test malformed cursors raise ValueError"""
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
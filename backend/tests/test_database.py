@@ -0,0 +1,51 @@
+import threading
+
+import pytest
+from src.services.database import Database
+
+def test_connection_is_reused_and_tuned(tmp_path):
+    """Test a thread keeps one connection with WAL and tuned pragmas"""
+    db = Database(str(tmp_path / "test.db"))
+    conn = db.connection()
+
+    assert db.connection() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    db.close()
+
+def test_each_thread_gets_its_own_connection(tmp_path):
+    """Test connections are confined to the thread that opened them"""
+    db = Database(str(tmp_path / "test.db"))
+    main_conn = db.connection()
+    other = []
+
+    thread = threading.Thread(target=lambda: other.append(db.connection()))
+    thread.start()
+    thread.join()
+
+    assert other[0] is not main_conn
+    db.close()
+
+def test_transaction_rolls_back_on_error(tmp_path):
+    """Test a failing block leaves no partial writes"""
+    db = Database(str(tmp_path / "test.db"))
+    db.connection().execute("CREATE TABLE items (name TEXT)")
+
+    with pytest.raises(RuntimeError):
+        with db.transaction() as conn:
+            conn.executemany("INSERT INTO items VALUES (?)", [("a",), ("b",)])
+            raise RuntimeError("boom")
+
+    assert db.connection().execute("SELECT COUNT(*) FROM items").fetchone()[0] == 0
+    db.close()
+
+def test_schema_setup_runs_once(tmp_path):
+    """Test ensure_schema skips setup it already ran"""
+    db = Database(str(tmp_path / "test.db"))
+    calls = []
+
+    for _ in range(3):
+        db.ensure_schema("items", lambda conn: calls.append(conn))
+
+    assert len(calls) == 1
+    db.close()
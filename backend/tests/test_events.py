@@ -0,0 +1,75 @@
+import asyncio
+
+from src.services.events import EventBroker
+
+def test_events_fan_out_to_every_subscriber():
+    """Test each subscriber receives every published event in order"""
+    async def scenario():
+        broker = EventBroker()
+        subscriptions = [broker.subscribe() for _ in range(300)]
+        broker.publish("story_discovered", {"rank": 1})
+        broker.publish("article_ready", {"rank": 1})
+        return broker, [[(await s.get(timeout=1)).type for _ in range(2)] for s in subscriptions]
+
+    broker, received = asyncio.run(scenario())
+
+    assert all(types == ["story_discovered", "article_ready"] for types in received)
+    assert broker.get_stats()["delivered"] == 600
+
+def test_slow_subscriber_drops_oldest_and_is_told_to_resync():
+    """Test a full buffer keeps the newest events and reports what was lost"""
+    async def scenario():
+        broker = EventBroker(buffer_size=3)
+        subscription = broker.subscribe()
+        for rank in range(1, 6):
+            broker.publish("article_ready", {"rank": rank})
+        events = [await subscription.get(timeout=1) for _ in range(4)]
+        return events, await subscription.get(timeout=0.01)
+
+    events, idle = asyncio.run(scenario())
+
+    assert events[0].type == "resync" and events[0].data == {"dropped": 2}
+    assert [e.data["rank"] for e in events[1:]] == [3, 4, 5]
+    assert idle is None
+
+def test_reconnect_replays_missed_events_and_caps_clients():
+    """Test Last-Event-ID replay, resync past the replay window, and the client limit"""
+    broker = EventBroker(max_subscribers=2, replay_size=3)
+    for rank in range(1, 6):
+        broker.publish("article_ready", {"rank": rank})
+
+    resumed = broker.subscribe(last_event_id=3)
+    too_old = broker.subscribe(last_event_id=0)
+
+    assert [e.id for e in resumed._events] == [4, 5]
+    assert too_old.dropped == 1
+    assert broker.subscribe() is None
+    broker.unsubscribe(resumed)
+    assert broker.subscribe() is not None
+
+def test_sse_format():
+    """Test events serialize to SSE frames; synthetic ones carry no id"""
+    broker = EventBroker()
+    event = broker.publish("batch_published", {"batch_id": 7})
+
+    assert event.to_sse() == 'id: 1\nevent: batch_published\ndata: {"batch_id":7}\n\n'
+    assert not event.__class__(id=0, type="resync", data={}).to_sse().startswith("id:")
+
+def test_subscribers_can_follow_one_feed():
+    """Test a feed subscription skips other feeds' events, live and on replay"""
+    broker = EventBroker()
+    broker.publish("story_discovered", {"feed": "new", "rank": 1})
+    first = broker.publish("story_discovered", {"feed": "top", "rank": 1})
+
+    async def scenario():
+        top = broker.subscribe(last_event_id=0, feed="top")
+        everything = broker.subscribe()
+        broker.publish("article_ready", {"feed": "new", "rank": 1})
+        broker.publish("article_ready", {"feed": "top", "rank": 1})
+        return [await top.get(timeout=0.01) for _ in range(3)], await everything.get(timeout=0.01)
+
+    top_events, first_live = asyncio.run(scenario())
+
+    assert [e.id for e in top_events[:2]] == [first.id, first.id + 2]
+    assert top_events[2] is None
+    assert first_live.data["feed"] == "new"
@@ -0,0 +1,52 @@
+import asyncio
+
+from src.services.extraction import TextExtractor, clean_text
+
+ARTICLE = "The new linker resolves symbols in parallel and cuts build times in half for large crates. " * 4
+
+class FakePage:
+    def __init__(self, result="", error=None):
+        self.result = result
+        self.error = error
+        self.evaluate_args = None
+
+    async def evaluate(self, script, args):
+        if self.error:
+            raise self.error
+        self.evaluate_args = args
+        return self.result
+
+def test_clean_text_drops_boilerplate_and_repeats():
+    """Test whitespace is collapsed and chrome lines and repeated lines are removed"""
+    raw = "Skip to content\n  A faster   Rust linker \n\nShare\nSubscribe now!\nBody text.\nBody text.\nAccept all cookies"
+
+    assert clean_text(raw) == "A faster Rust linker\nBody text."
+    assert clean_text(None) == ""
+
+def test_clean_text_caps_at_a_word_boundary():
+    """Test long text is cut to max_chars without splitting a word"""
+    text = clean_text(ARTICLE, max_chars=100)
+
+    assert len(text) <= 100
+    assert ARTICLE.startswith(text)
+    assert ARTICLE[len(text)] == " "
+
+def test_extractor_returns_cleaned_text():
+    """Test the page's text is cleaned and capped, and the page is asked for headroom"""
+    extractor = TextExtractor(max_chars=150, min_chars=50)
+    page = FakePage("Menu\n" + ARTICLE)
+
+    text = asyncio.run(extractor.extract(page))
+
+    assert text.startswith("The new linker") and len(text) <= 150
+    assert page.evaluate_args == 300
+    assert extractor.get_stats()["extracted"] == 1
+
+def test_extractor_gives_up_on_thin_or_failing_pages():
+    """Test too little text and evaluation errors both yield no text"""
+    extractor = TextExtractor(min_chars=50)
+
+    assert asyncio.run(extractor.extract(FakePage("Please enable JavaScript."))) is None
+    assert asyncio.run(extractor.extract(FakePage(error=RuntimeError("page crashed")))) is None
+    assert extractor.get_stats()["empty"] == 1
+    assert extractor.get_stats()["failed"] == 1
@@ -0,0 +1,131 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+import pytest
+from src.services.front_page import FrontPageClient, normalize_story_url, parse_feeds, parse_story_links
+
+FIXTURE = Path(__file__).parent / "fixtures" / "hn_front_page.html"
+
+def test_normalize_story_url():
+    """Test relative links are resolved exactly like the browser scraper did"""
+    assert normalize_story_url("item?id=1") == "https://news.ycombinator.com/item?id=1"
+    assert normalize_story_url("/item?id=1") == "https://news.ycombinator.com/item?id=1"
+    assert normalize_story_url("https://example.com") == "https://example.com"
+    assert normalize_story_url("http://example.com") == "http://example.com"
+    assert normalize_story_url("javascript:void(0)") is None
+    assert normalize_story_url("") is None
+    assert normalize_story_url(None) is None
+
+def test_parse_story_links_from_fixture():
+    """Test the first ten rows are parsed in rank order with normalized links"""
+    links = parse_story_links(FIXTURE.read_text())
+
+    # Row 4 has an unusable link and is skipped; row 11 is past the limit
+    assert len(links) == 9
+    assert links[0] == ("A faster Rust compiler & linker", "https://example.com/rust-compiler")
+    assert links[1] == ("Ask HN: How do you structure large codebases?", "https://news.ycombinator.com/item?id=1002")
+    assert links[2] == ("Show HN: A tiny SQLite viewer", "https://news.ycombinator.com/item?id=1003")
+    assert links[3] == ("Plain HTTP story", "http://plain-http.example.org/post")
+    assert links[-1] == ("Story ten", "https://example.com/10")
+
+def test_parse_story_links_respects_limit():
+    """Test the limit counts rows like the old items[:10] slice"""
+    links = parse_story_links(FIXTURE.read_text(), limit=3)
+
+    assert [title for title, _ in links] == [
+        "A faster Rust compiler & linker",
+        "Ask HN: How do you structure large codebases?",
+        "Show HN: A tiny SQLite viewer",
+    ]
+
+def test_front_page_client_against_local_server():
+    """Test the HTTP client fetches and parses a locally served front page"""
+    body = FIXTURE.read_bytes()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    async def fetch():
+        client = FrontPageClient(base_url=f"http://127.0.0.1:{server.server_port}/")
+        try:
+            return await client.fetch_story_links(limit=2)
+        finally:
+            await client.aclose()
+
+    try:
+        links = asyncio.run(fetch())
+    finally:
+        server.shutdown()
+
+    assert [url for _, url in links] == [
+        "https://example.com/rust-compiler",
+        "https://news.ycombinator.com/item?id=1002",
+    ]
+
+def test_parse_feeds():
+    """Test feed lists are parsed in order and unknown feeds are rejected"""
+    assert [feed.name for feed in parse_feeds("top, new,,best")] == ["top", "new", "best"]
+    assert parse_feeds("show")[0].path == "show"
+    with pytest.raises(ValueError):
+        parse_feeds("top,jobs")
+
+def test_front_page_client_follows_more_links():
+    """Test a feed larger than one page is read across pages without duplicates"""
+    def page(ids, more=None):
+        rows = "".join(
+            f'<tr class="athing" id="{i}"><td class="title"><span class="titleline">'
+            f'<a href="https://example.com/{i}">Story {i}</a></span></td></tr>'
+            for i in ids
+        )
+        link = f'<a href="{more}" class="morelink" rel="next">More</a>' if more else ""
+        return f"<html><body><table>{rows}</table>{link}</body></html>".encode()
+
+    # The listing shifted between requests, so story 3 shows up on both pages
+    pages = {"/newest": page([1, 2, 3], "newest?next=3&n=4"), "/newest?next=3&n=4": page([3, 4, 5])}
+    requested = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requested.append(self.path)
+            body = pages[self.path]
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    async def fetch():
+        client = FrontPageClient(base_url=f"http://127.0.0.1:{server.server_port}/")
+        try:
+            return await client.fetch_story_links(limit=4, path="newest")
+        finally:
+            await client.aclose()
+
+    try:
+        links = asyncio.run(fetch())
+    finally:
+        server.shutdown()
+
+    assert [url for _, url in links] == [f"https://example.com/{i}" for i in range(1, 5)]
+    assert requested == ["/newest", "/newest?next=3&n=4"]
@@ -0,0 +1,88 @@
+import asyncio
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+from src.models.article import Article
+from src.services.image_pipeline import ImagePipeline
+from src.services.screenshot_store import ScreenshotStore
+
+Image = pytest.importorskip("PIL.Image")
+
+def make_png(width=1200, height=800):
+    # Photo-like content: smooth gradients plus noise, where PNG does poorly
+    gradient = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 30)
+    image = Image.merge("RGB", (gradient, noise, gradient.rotate(90).resize((width, height))))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+def test_pipeline_encodes_variants_in_process_pool(tmp_path):
+    """Test a screenshot is encoded to WebP, JPEG and thumbnails with stats"""
+    store = ScreenshotStore(str(tmp_path))
+    filename = store.write("https://example.com/a", make_png())
+    pipeline = ImagePipeline(store, max_workers=1, thumbnail_widths=(600, 300))
+
+    try:
+        variants = asyncio.run(pipeline.process("https://example.com/a", filename))
+    finally:
+        pipeline.close()
+
+    assert set(variants) == {"webp", "jpeg", "webp_600", "webp_300"}
+    assert variants["webp"].endswith(".webp")
+    assert variants["jpeg"].endswith(".jpg")
+    with Image.open(tmp_path / variants["webp_300"]) as thumbnail:
+        assert thumbnail.size == (300, 200)
+
+    stats = pipeline.get_stats()
+    assert stats["images"] == 1
+    assert stats["bytes_saved"] > 0
+    assert stats["encode_seconds"] > 0
+
+def test_pipeline_replaces_a_broken_pool(tmp_path):
+    """Test a pool whose worker died is rebuilt instead of failing every later encode"""
+    store = ScreenshotStore(str(tmp_path))
+    filename = store.write("https://example.com/a", make_png(400, 300))
+    pipeline = ImagePipeline(store, max_workers=1, thumbnail_widths=())
+
+    broken = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+    with pytest.raises(Exception):
+        broken.submit(os._exit, 1).result(timeout=30)
+    pipeline._executor = broken
+
+    try:
+        variants = asyncio.run(pipeline.process("https://example.com/a", filename))
+    finally:
+        pipeline.close()
+
+    assert set(variants) == {"webp", "jpeg"}
+    assert pipeline.get_stats()["pool_restarts"] == 1
+
+def test_pipeline_failure_returns_none(tmp_path):
+    """Test an undecodable capture is reported instead of raising"""
+    store = ScreenshotStore(str(tmp_path))
+    filename = store.write("https://example.com/a", b"not an image")
+    pipeline = ImagePipeline(store, max_workers=1)
+
+    try:
+        assert asyncio.run(pipeline.process("https://example.com/a", filename)) is None
+    finally:
+        pipeline.close()
+    assert pipeline.get_stats()["failures"] == 1
+
+def test_article_exposes_variant_urls():
+    """Test to_dict lists the public URLs of every variant"""
+    article = Article(
+        title="Test Article",
+        url="https://example.com",
+        screenshot_path="a.png",
+        screenshot_variants={"webp": "a.webp", "webp_300": "a-300.webp"}
+    )
+
+    assert article.to_dict()["screenshot_variants"] == {
+        "webp": "/screenshots/a.webp",
+        "webp_300": "/screenshots/a-300.webp",
+    }
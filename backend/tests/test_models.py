@@ -50,4 +50,5 @@ def test_article_to_dict_no_screenshot():
     result = article.to_dict()
     
     assert result["screenshot"] is None
-    assert result["summary"] == "Summary not available."
\ No newline at end of file
+    assert result["summary"] == "Summary pending."
+    assert result["summary_status"] == "pending"
\ No newline at end of file
@@ -0,0 +1,169 @@
+import asyncio
+
+import pytest
+from src.services.quota import (
+    RATE_LIMITED,
+    UNAVAILABLE,
+    CircuitBreaker,
+    CircuitOpenError,
+    QuotaScheduler,
+    TokenBucket,
+    classify_error,
+)
+from src.services.summarizer import ModelSummarizer
+
+class FakeClock:
+    """Clock whose sleep advances time instantly and records each delay"""
+
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+class StatusError(Exception):
+    def __init__(self, code, message="API error"):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+class FlakyCall:
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+def make_scheduler(clock, **kwargs):
+    return QuotaScheduler(clock=clock, sleep=clock.sleep, **kwargs)
+
+def test_classify_error():
+    """Test 429s and quota messages are rate limits, 5xx and timeouts are outages, the rest is neither"""
+    assert classify_error(StatusError(429)) == RATE_LIMITED
+    assert classify_error(RuntimeError("Resource has been exhausted (e.g. check quota).")) == RATE_LIMITED
+    assert classify_error(StatusError(503)) == UNAVAILABLE
+    assert classify_error(TimeoutError("timed out")) == UNAVAILABLE
+    assert classify_error(RuntimeError("500 Internal error encountered.")) == UNAVAILABLE
+    assert classify_error(StatusError(400, "invalid argument")) is None
+    assert classify_error(ValueError("Model returned an empty response")) is None
+
+def test_token_bucket_spaces_out_requests_past_its_burst():
+    """Test a full bucket allows a burst, then one request per refill interval"""
+    clock = FakeClock()
+    bucket = TokenBucket(per_minute=6, capacity=2, clock=clock, sleep=clock.sleep)
+
+    async def take(n):
+        return [await bucket.acquire() for _ in range(n)]
+
+    waits = asyncio.run(take(4))
+
+    assert waits == [0.0, 0.0, pytest.approx(10.0), pytest.approx(10.0)]
+
+def test_circuit_breaker_opens_then_allows_one_trial():
+    """Test consecutive failures open the breaker and a failed trial reopens it"""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow()
+
+    clock.now += 30
+    assert breaker.allow()
+    assert not breaker.allow()  # Only one trial at a time
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and breaker.retry_in() == 30
+
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.opens == 2
+
+def test_scheduler_retries_transient_errors_with_growing_backoff():
+    """Test 429 and 5xx responses are retried after jittered, exponentially growing delays"""
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, requests_per_minute=600, base_delay=2.0)
+    call = FlakyCall(StatusError(429), StatusError(503))
+
+    assert asyncio.run(scheduler.run(call)) == "ok"
+
+    assert call.calls == 3
+    backoffs = [delay for delay in clock.sleeps if delay >= 1.0]
+    assert 1.0 <= backoffs[0] <= 2.0 and 2.0 <= backoffs[-1] <= 4.0
+    stats = scheduler.get_stats()
+    assert (stats["retries"], stats[RATE_LIMITED], stats[UNAVAILABLE], stats["breaker"]) == (2, 1, 1, "closed")
+
+def test_scheduler_does_not_retry_bad_requests():
+    """Test errors that are not about availability are raised at once"""
+    clock = FakeClock()
+    scheduler = make_scheduler(clock)
+    call = FlakyCall(StatusError(400, "invalid argument"))
+
+    with pytest.raises(StatusError):
+        asyncio.run(scheduler.run(call))
+    assert call.calls == 1
+
+def test_scheduler_short_circuits_while_the_breaker_is_open():
+    """Test exhausted retries trip the breaker, after which calls fail without reaching the model"""
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, max_retries=1, breaker=CircuitBreaker(failure_threshold=2, clock=clock))
+    failing = FlakyCall(*[StatusError(503)] * 10)
+
+    with pytest.raises(StatusError):
+        asyncio.run(scheduler.run(failing))
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(scheduler.run(failing))
+
+    assert failing.calls == 2
+    assert scheduler.get_stats()["short_circuited"] == 1
+
+def test_cancelled_trial_does_not_wedge_the_breaker():
+    """Test a half-open trial cancelled while it waits lets the next call try again"""
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30, clock=clock)
+    scheduler = make_scheduler(clock, breaker=breaker)
+    breaker.record_failure()
+    clock.now += 30
+
+    async def hang():
+        await asyncio.Event().wait()
+
+    async def scenario():
+        trial = asyncio.create_task(scheduler.run(hang))
+        await asyncio.sleep(0)
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+        return await scheduler.run(FlakyCall())
+
+    assert asyncio.run(scenario()) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+def test_model_summarizer_goes_through_the_scheduler():
+    """Test a summary request that hits a 429 is retried instead of failing"""
+    class QuotaModel:
+        def __init__(self):
+            self.calls = 0
+
+        async def generate_content_async(self, prompt):
+            self.calls += 1
+            if self.calls == 1:
+                raise StatusError(429, "quota exceeded")
+            return type("Response", (), {"text": "A summary."})()
+
+    clock = FakeClock()
+    model = QuotaModel()
+    summarizer = ModelSummarizer(model, scheduler=make_scheduler(clock, tokens_per_minute=10_000))
+
+    assert asyncio.run(summarizer.summarize("Title", "Some article text")) == "A summary."
+    assert model.calls == 2
+    assert summarizer.get_stats()["quota"]["retries"] == 1
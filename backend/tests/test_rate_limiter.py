@@ -40,4 +40,70 @@ def test_rate_limiter_remaining_requests():
     assert limiter.get_remaining_requests("client1") == 1
     
     limiter.is_allowed("client1")
-    assert limiter.get_remaining_requests("client1") == 0
\ No newline at end of file
+    assert limiter.get_remaining_requests("client1") == 0
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def test_rate_limiter_refills_at_a_steady_rate():
+    """Test a client at its limit gets one request back per emission interval"""
+    clock = FakeClock()
+    limiter = RateLimiter(max_requests=5, window_seconds=300, clock=clock)
+
+    for i in range(5):
+        assert limiter.is_allowed("client1")
+    assert not limiter.is_allowed("client1")
+    assert limiter.get_reset_time("client1") == clock.now + 60
+
+    clock.now += 59
+    assert not limiter.is_allowed("client1")
+    clock.now += 1
+    assert limiter.get_remaining_requests("client1") == 1
+    assert limiter.is_allowed("client1")
+    assert not limiter.is_allowed("client1")
+
+    clock.now += 300
+    assert limiter.get_remaining_requests("client1") == 5
+
+def test_rate_limiter_queries_do_not_track_unknown_clients():
+    """Test asking about a client that never made a request stores nothing"""
+    clock = FakeClock()
+    limiter = RateLimiter(max_requests=3, window_seconds=60, clock=clock)
+
+    assert limiter.get_remaining_requests("stranger") == 3
+    assert limiter.get_reset_time("stranger") == clock.now
+    assert limiter.get_stats()["tracked_clients"] == 0
+
+def test_rate_limiter_sweeps_idle_clients():
+    """Test clients whose allowance has refilled are evicted by the periodic sweep"""
+    clock = FakeClock()
+    limiter = RateLimiter(max_requests=2, window_seconds=60, sweep_interval=10, clock=clock)
+
+    for i in range(100):
+        limiter.is_allowed(f"idle{i}")
+    clock.now += 5
+    limiter.is_allowed("busy")
+    limiter.is_allowed("busy")
+
+    clock.now += 31  # The idle clients' single request has been paid back, busy's has not
+    limiter.is_allowed("new")
+
+    assert set(limiter.clients) == {"busy", "new"}
+    assert limiter.get_stats()["expired"] == 100
+    assert limiter.get_remaining_requests("busy") == 1
+
+def test_rate_limiter_caps_tracked_clients():
+    """Test the least recently seen client is dropped once max_clients are tracked"""
+    limiter = RateLimiter(max_requests=1, window_seconds=60, max_clients=3, clock=FakeClock())
+
+    for client in ["a", "b", "c"]:
+        assert limiter.is_allowed(client)
+    assert not limiter.is_allowed("a")  # Denied requests do not refresh recency
+    assert limiter.is_allowed("d")
+
+    assert list(limiter.clients) == ["b", "c", "d"]
+    assert limiter.get_stats()["evicted"] == 1
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+from src.services.readiness import (
+    BUDGET_EXHAUSTED,
+    DOM_QUIET,
+    EVALUATION_FAILED,
+    HARD_CAP,
+    DomQuietReadiness,
+    HardCapReadiness,
+    LoadAndLayoutStableReadiness,
+    ReadinessStrategy,
+    get_readiness_strategy,
+)
+
+class FakePage:
+    def __init__(self, result=DOM_QUIET, error=None, loads=True):
+        self.result = result
+        self.error = error
+        self.loads = loads
+        self.evaluate_args = None
+
+    async def evaluate(self, script, args):
+        if self.error:
+            raise self.error
+        self.evaluate_args = args
+        return self.result
+
+    async def wait_for_load_state(self, state, timeout):
+        if self.loads:
+            return
+        # Like Playwright, timeout=0 waits forever
+        if timeout == 0:
+            await asyncio.Event().wait()
+        await asyncio.sleep(timeout / 1000)
+        raise TimeoutError(f"Timeout {timeout}ms exceeded")
+
+def test_dom_quiet_passes_budget_to_page():
+    """Test the DOM quiet strategy reports the page's condition within the budget"""
+    page = FakePage()
+    condition = asyncio.run(DomQuietReadiness(quiet_ms=200).wait(page, 1.5))
+
+    assert condition == DOM_QUIET
+    assert page.evaluate_args == [200, 1500]
+
+def test_dom_quiet_survives_destroyed_context():
+    """Test a failing evaluation is reported instead of aborting the screenshot"""
+    page = FakePage(error=RuntimeError("Execution context was destroyed"))
+
+    assert asyncio.run(DomQuietReadiness().wait(page, 1.0)) == EVALUATION_FAILED
+
+def test_exhausted_budget_skips_waiting():
+    """Test strategies return immediately once the budget is spent"""
+    page = FakePage(loads=False)
+
+    async def wait(strategy, budget):
+        # A strategy that hands Playwright timeout=0 would hang here
+        return await asyncio.wait_for(strategy.wait(page, budget), timeout=1)
+
+    assert asyncio.run(wait(DomQuietReadiness(), 0)) == BUDGET_EXHAUSTED
+    assert asyncio.run(wait(LoadAndLayoutStableReadiness(), 0)) == BUDGET_EXHAUSTED
+    assert asyncio.run(wait(LoadAndLayoutStableReadiness(), -0.5)) == BUDGET_EXHAUSTED
+    assert page.evaluate_args is None
+
+def test_hard_cap_is_bounded_by_budget():
+    """Test the hard cap never waits longer than the budget"""
+    assert asyncio.run(HardCapReadiness(seconds=0.01).wait(None, 1.0)) == HARD_CAP
+    assert asyncio.run(HardCapReadiness(seconds=5).wait(None, 0.01)) == BUDGET_EXHAUSTED
+
+def test_strategies_must_implement_wait():
+    """Test a strategy without wait() fails when it is built, not during a scrape"""
+    class Incomplete(ReadinessStrategy):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_get_readiness_strategy():
+    """Test strategies are looked up by configured name"""
+    assert isinstance(get_readiness_strategy("layout_stable"), LoadAndLayoutStableReadiness)
+    with pytest.raises(ValueError):
+        get_readiness_strategy("sleep_forever")
@@ -0,0 +1,95 @@
+import asyncio
+
+from src.models.article import Article
+from src.services.refresh import RefreshCoordinator, RefreshJob
+from src.services.scraper import HackerNewsScraper
+from src.services.screenshot_store import ScreenshotStore
+
+def test_concurrent_submits_share_one_run():
+    """Test callers arriving while a refresh runs join it instead of starting another"""
+    runs = []
+
+    async def run(job):
+        runs.append(job.id)
+        job.start_stage("publish", 1)
+        await asyncio.sleep(0.05)
+        job.advance("publish")
+        job.article_count = 10
+
+    async def scenario():
+        coordinator = RefreshCoordinator(run)
+        submitted = [coordinator.submit() for _ in range(5)]
+        job = await coordinator.wait(submitted[0][0].id)
+        again, started_again = coordinator.submit()
+        await coordinator.wait(again.id)
+        return coordinator, submitted, job, again, started_again
+
+    coordinator, submitted, job, again, started_again = asyncio.run(scenario())
+
+    assert {j.id for j, _ in submitted} == {job.id}
+    assert [started for _, started in submitted] == [True, False, False, False, False]
+    assert runs == [job.id, again.id]
+    assert started_again and again.id != job.id
+    assert job.to_dict()["status"] == "succeeded"
+    assert job.to_dict()["stages"]["publish"] == {"status": "succeeded", "done": 1, "total": 1}
+    assert coordinator.get_stats()["coalesced"] == 4
+
+def test_failed_run_is_reported_and_not_sticky():
+    """Test a failing refresh records the error and the next submit starts fresh"""
+    async def run(job):
+        job.start_stage("front_page", 1)
+        raise RuntimeError("front page down")
+
+    async def scenario():
+        coordinator = RefreshCoordinator(run, keep_jobs=1)
+        first, _ = coordinator.submit()
+        await coordinator.wait(first.id)
+        second, started = coordinator.submit()
+        await coordinator.wait(second.id)
+        return coordinator, first, second, started
+
+    coordinator, first, second, started = asyncio.run(scenario())
+
+    assert first.status == "failed" and first.error == "front page down"
+    assert first.stages["front_page"]["status"] == "failed"
+    assert started
+    assert coordinator.get(first.id) is None  # Only keep_jobs finished jobs are kept
+    assert coordinator.get(second.id) is second
+
+def test_scraper_reports_stage_progress(tmp_path):
+    """Test the scraper counts screenshots only for processed stories and summaries for all"""
+    store = ScreenshotStore(str(tmp_path / "screenshots"))
+    previous = [Article(title="Story A", url="https://example.com/a", status="success", summary="A summary",
+                        screenshot_path=store.write("https://example.com/a", b"a"), rank=1)]
+    scraper = HackerNewsScraper("test-key", browser_pool=object(), screenshot_store=store)
+
+    async def fake_links(path="news"):
+        return [("Story A", "https://example.com/a"), ("Story B", "https://example.com/b"),
+                ("Story C", "https://example.com/c")]
+
+    async def fake_screenshot(pool, article_number, url):
+        if url.endswith("c"):
+            raise RuntimeError("navigation failed")
+        return store.write(url, url.encode()), None
+
+    async def fake_summary(title, url, content=None):
+        return "Summary"
+
+    scraper._get_story_links = fake_links
+    scraper._take_screenshot = fake_screenshot
+    scraper._generate_summary = fake_summary
+    events = []
+    job = RefreshJob(listener=lambda event_type, data: events.append((event_type, data.get("rank"))))
+    articles = asyncio.run(scraper.scrape_top_stories(previous=previous, progress=job))
+
+    assert [a.status for a in articles] == ["success", "success", "failed"]
+    assert job.stages == {
+        "front_page": {"status": "succeeded", "done": 1, "total": 1},
+        "screenshots": {"status": "succeeded", "done": 2, "total": 2},
+        "summaries": {"status": "succeeded", "done": 3, "total": 3},
+    }
+    assert [e for e in events if e[0] == "story_discovered"] == [("story_discovered", r) for r in (1, 2, 3)]
+    assert ("screenshot_done", 2) in events and ("summary_done", 2) in events
+    assert ("screenshot_done", 1) not in events  # Reused stories skip the browser
+    assert sorted(r for e, r in events if e == "article_ready") == [1, 2, 3]
+    assert events.index(("summary_done", 2)) < events.index(("article_ready", 2))
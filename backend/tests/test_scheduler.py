@@ -0,0 +1,150 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from src.models.article import Article
+from src.services.refresh import RefreshCoordinator
+from src.services.scheduler import RefreshScheduler, measure_churn
+
+class FakeCache:
+    def __init__(self, latest_update=None):
+        self.latest_update = latest_update
+
+    async def get_cache_status(self):
+        return {"latest_update": self.latest_update.isoformat() if self.latest_update else None}
+
+def make_articles(urls):
+    return [Article(title=url, url=url, rank=n) for n, url in enumerate(urls, start=1)]
+
+def test_measure_churn():
+    """Test churn counts stories that are new since the previous batch, not rank moves"""
+    previous = make_articles(["a", "b", "c", "d"])
+
+    assert measure_churn(previous, make_articles(["a", "b", "c", "d"])) == 0.0
+    assert measure_churn(previous, make_articles(["b", "a", "c", "d"])) == 0.0
+    assert measure_churn(previous, make_articles(["a", "b", "c", "e"])) == 0.25
+    assert measure_churn(make_articles(["https://example.com/a"]), make_articles(["https://example.com/a/?utm_source=hn"])) == 0.0
+    assert measure_churn([], make_articles(["a", "b"])) == 1.0
+    assert measure_churn(previous, []) == 0.0
+
+def test_one_story_entering_at_the_top_is_low_churn():
+    """Test a single new story at rank 1 pushing the rest down stays below high_churn"""
+    urls = [f"https://example.com/{n}" for n in range(30)]
+    churn = measure_churn(make_articles(urls), make_articles(["https://example.com/new"] + urls[:-1]))
+
+    assert churn < RefreshScheduler(None, None).high_churn
+    assert abs(churn - 1 / 30) < 1e-9
+
+def test_interval_follows_churn():
+    """Test stable rankings back off, churn speeds up, and both stay within bounds"""
+    churns = iter([0.0, 0.0, 0.0, 0.0, 0.8, 0.8, 0.8, 0.2])
+
+    async def scenario():
+        cache = FakeCache()
+
+        async def run(job):
+            job.churn = next(churns)
+            cache.latest_update = datetime.now()
+
+        scheduler = RefreshScheduler(
+            RefreshCoordinator(run), cache, min_interval=60, max_interval=600, initial_interval=200
+        )
+        intervals = []
+        for _ in range(8):
+            # Due now: no published batch and the last attempt long ago
+            cache.latest_update = None
+            if scheduler.coordinator.last_finished:
+                scheduler.coordinator.last_finished.finished_at -= timedelta(hours=1)
+            await scheduler.run_once()
+            intervals.append(scheduler.interval)
+        return scheduler, intervals
+
+    scheduler, intervals = asyncio.run(scenario())
+
+    assert intervals == [300, 450, 600, 600, 300, 150, 75, 75]
+    assert scheduler.get_stats()["scheduled_runs"] == 8
+    assert scheduler.last_churn == 0.2
+
+def test_skips_when_refreshed_recently_and_learns_from_manual_refreshes():
+    """Test a run is skipped after someone else refreshed, and that refresh still adapts the interval"""
+    async def scenario():
+        cache = FakeCache()
+
+        async def run(job):
+            job.churn = 1.0
+            cache.latest_update = datetime.now()
+
+        coordinator = RefreshCoordinator(run)
+        scheduler = RefreshScheduler(coordinator, cache, min_interval=60, max_interval=600, initial_interval=200)
+
+        manual, _ = coordinator.submit()
+        await coordinator.wait(manual.id)
+        skipped = await scheduler.run_once()
+        return scheduler, coordinator, skipped
+
+    scheduler, coordinator, skipped = asyncio.run(scenario())
+
+    assert skipped is None
+    assert scheduler.stats["skipped"] == 1
+    assert coordinator.stats["started"] == 1
+    assert scheduler.interval == 100
+
+def test_failures_back_off():
+    """Test a failing refresh lengthens the interval instead of retrying at full speed"""
+    async def scenario():
+        async def run(job):
+            raise RuntimeError("front page unavailable")
+
+        scheduler = RefreshScheduler(RefreshCoordinator(run), FakeCache(), min_interval=60, max_interval=600, initial_interval=100)
+        job = await scheduler.run_once()
+        return scheduler, job
+
+    scheduler, job = asyncio.run(scenario())
+
+    assert job.status == "failed"
+    assert scheduler.interval == 150
+
+def test_failing_loop_waits_between_attempts():
+    """Test the loop waits the backed-off interval after each failure instead of retrying at full speed"""
+    attempts = 0
+
+    async def scenario():
+        async def run(job):
+            nonlocal attempts
+            attempts += 1
+            raise RuntimeError("front page unavailable")
+
+        scheduler = RefreshScheduler(RefreshCoordinator(run), FakeCache(), min_interval=0.1, max_interval=10,
+                                     initial_interval=0.1, jitter=0)
+        scheduler.start()
+        await asyncio.sleep(0.5)
+        await scheduler.stop()
+        return scheduler
+
+    scheduler = asyncio.run(scenario())
+
+    # Due at once, then after 0.15s and 0.225s; the next wait ends past 0.5s
+    assert 2 <= attempts <= 3
+    assert scheduler.interval > 0.3
+
+def test_loop_refreshes_when_due_and_stops():
+    """Test the background loop refreshes a stale cache on its own and shuts down cleanly"""
+    async def scenario():
+        cache = FakeCache(datetime.now() - timedelta(hours=1))
+        refreshed = asyncio.Event()
+
+        async def run(job):
+            job.churn = 0.5
+            cache.latest_update = datetime.now()
+            refreshed.set()
+
+        scheduler = RefreshScheduler(RefreshCoordinator(run), cache, min_interval=60, max_interval=600)
+        scheduler.start()
+        await asyncio.wait_for(refreshed.wait(), timeout=1)
+        await asyncio.sleep(0.01)
+        await scheduler.stop()
+        return scheduler
+
+    scheduler = asyncio.run(scenario())
+
+    assert scheduler.stats["scheduled_runs"] == 1
+    assert scheduler.next_run_at is not None
@@ -0,0 +1,275 @@
+import asyncio
+import random
+
+import pytest
+from src.models.article import Article
+from src.services.front_page import FEEDS
+from src.services.refresh import RefreshJob
+from src.services.scraper import HackerNewsScraper
+from src.services.screenshot_store import ScreenshotStore
+
+def make_links(count):
+    return [(f"Story {i}", f"https://example.com/{i}") for i in range(1, count + 1)]
+
+def test_concurrent_pipeline_preserves_rank_order():
+    """Test articles come back in HN rank order even when they finish out of order"""
+    scraper = HackerNewsScraper("test-key", max_concurrent=4)
+    numbers = {}
+
+    async def fake_process(browser, article_number, title, url, progress=None, capture_slots=None):
+        await asyncio.sleep(random.uniform(0, 0.02))
+        numbers[url] = article_number
+        return Article(title=title, url=url, status="success")
+
+    scraper._process_single_story = fake_process
+    links = make_links(10)
+    articles = asyncio.run(scraper._process_stories_concurrently(None, links))
+
+    assert [a.url for a in articles] == [url for _, url in links]
+    assert [numbers[url] for _, url in links] == list(range(1, 11))
+
+def test_concurrent_pipeline_respects_limit():
+    """Test no more than max_concurrent stories hold a capture slot at once"""
+    scraper = HackerNewsScraper("test-key", max_concurrent=3)
+    active = 0
+    peak = 0
+
+    async def fake_process(browser, article_number, title, url, progress=None, capture_slots=None):
+        nonlocal active, peak
+        async with capture_slots:
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+        return Article(title=title, url=url, status="success")
+
+    scraper._process_single_story = fake_process
+    asyncio.run(scraper._process_stories_concurrently(None, make_links(10)))
+
+    assert peak == 3
+
+def test_concurrent_pipeline_marks_failed_stories():
+    """Test a failing story becomes a failed article in its rank slot"""
+    scraper = HackerNewsScraper("test-key")
+
+    async def fake_process(browser, article_number, title, url, progress=None, capture_slots=None):
+        if article_number == 2:
+            raise RuntimeError("boom")
+        return Article(title=title, url=url, status="success")
+
+    scraper._process_single_story = fake_process
+    articles = asyncio.run(scraper._process_stories_concurrently(None, make_links(3)))
+
+    assert [a.status for a in articles] == ["success", "failed", "success"]
+
+def test_max_concurrent_must_be_positive():
+    """Test invalid concurrency limits are rejected"""
+    with pytest.raises(ValueError):
+        HackerNewsScraper("test-key", max_concurrent=0)
+
+def test_incremental_refresh_reuses_unchanged_stories(tmp_path):
+    """Test moved stories keep their capture and only new or changed ones are processed"""
+    store = ScreenshotStore(str(tmp_path / "screenshots"))
+    names = {key: store.write(f"https://example.com/{key}", key.encode()) for key in "abc"}
+    previous = [
+        Article(title="Story A", url="https://example.com/a", screenshot_path=names["a"], status="success", summary="A summary", rank=1),
+        Article(title="Story B", url="https://example.com/b", screenshot_path=names["b"], status="success", summary="B summary", rank=2),
+        Article(title="Story C", url="https://example.com/c", screenshot_path=names["c"], status="success", summary="C summary", rank=3),
+    ]
+
+    scraper = HackerNewsScraper("test-key", browser_pool=object(), screenshot_store=store)
+    processed = []
+
+    async def fake_links(path="news"):
+        # B moved up, A moved down with a new title, C dropped off, D is new
+        return [
+            ("Story B", "https://example.com/b"),
+            ("Story A (updated)", "https://example.com/a"),
+            ("Story D", "https://example.com/d"),
+        ]
+
+    async def fake_process(pool, article_number, title, url, progress=None, capture_slots=None):
+        processed.append((article_number, url))
+        return Article(title=title, url=url, status="success", rank=article_number,
+                       screenshot_path=store.write(url, title.encode()))
+
+    scraper._get_story_links = fake_links
+    scraper._process_single_story = fake_process
+    articles = asyncio.run(scraper.scrape_top_stories(previous=previous))
+
+    assert [a.url for a in articles] == ["https://example.com/b", "https://example.com/a", "https://example.com/d"]
+    assert processed == [(2, "https://example.com/a"), (3, "https://example.com/d")]
+    assert articles[0].summary == "B summary"
+    assert articles[0].rank == 1
+    assert articles[0].screenshot_path == names["b"]
+    assert store.lookup("https://example.com/b") == names["b"]
+    assert store.lookup("https://example.com/c") is None
+
+def test_incremental_refresh_retries_placeholder_summaries(tmp_path):
+    """Test a reused story with a fallback summary gets a new summary from its stored text, without navigating"""
+    store = ScreenshotStore(str(tmp_path / "screenshots"))
+    previous = [
+        Article(title="Story A", url="https://example.com/a", screenshot_path=store.write("https://example.com/a", b"a"),
+                status="success", summary="AI summary temporarily unavailable due to API quota limits.", rank=1,
+                content_text="Stored article text"),
+    ]
+
+    scraper = HackerNewsScraper("test-key", browser_pool=object(), screenshot_store=store)
+    summarized = []
+
+    async def fake_links(path="news"):
+        return [("Story A", "https://example.com/a")]
+
+    async def fake_screenshot(pool, article_number, url):
+        raise AssertionError("reused stories are not navigated")
+
+    async def fake_summary(title, url, content=None):
+        summarized.append(content)
+        return "Fresh summary"
+
+    scraper._get_story_links = fake_links
+    scraper._take_screenshot = fake_screenshot
+    scraper._generate_summary = fake_summary
+    articles = asyncio.run(scraper.scrape_top_stories(previous=previous))
+
+    assert articles[0].summary == "Fresh summary"
+    assert articles[0].status == "success"
+    assert articles[0].content_text == "Stored article text"
+    assert summarized == ["Stored article text"]
+
+def test_legacy_numbered_screenshots_are_not_reused(tmp_path):
+    """Test rank-numbered paths from older batches are reprocessed"""
+    store = ScreenshotStore(str(tmp_path / "screenshots"))
+    scraper = HackerNewsScraper("test-key", screenshot_store=store)
+    previous = [Article(title="Story A", url="https://example.com/a", screenshot_path="/screenshots/1.png", status="success")]
+
+    assert scraper._find_reusable([("Story A", "https://example.com/a")], previous) == {}
+
+def test_feeds_refreshing_together_process_a_shared_story_once(tmp_path):
+    """Test a story on two feeds is processed by one refresh and shared with the other"""
+    store = ScreenshotStore(str(tmp_path / "screenshots"))
+    scraper = HackerNewsScraper("test-key", browser_pool=object(), screenshot_store=store)
+    listings = {
+        "news": [("Story A", "https://example.com/a"), ("Story B", "https://example.com/b")],
+        "newest": [("Story C", "https://example.com/c"), ("Story A", "https://example.com/a")],
+    }
+    processed = []
+
+    async def fake_links(path="news"):
+        return listings[path]
+
+    async def fake_process(pool, article_number, title, url, progress=None, capture_slots=None):
+        processed.append(url)
+        await asyncio.sleep(0.02)
+        return Article(title=title, url=url, status="success", summary=f"{title} summary", rank=article_number,
+                       screenshot_path=store.write(url, title.encode()))
+
+    async def refresh_both():
+        return await asyncio.gather(
+            scraper.scrape_top_stories(feed=FEEDS["top"]),
+            scraper.scrape_top_stories(feed=FEEDS["new"]),
+        )
+
+    scraper._get_story_links = fake_links
+    scraper._process_single_story = fake_process
+    top, new = asyncio.run(refresh_both())
+
+    assert sorted(processed) == ["https://example.com/a", "https://example.com/b", "https://example.com/c"]
+    assert scraper.shared_stories == 1
+    assert (new[1].url, new[1].rank, new[1].summary) == ("https://example.com/a", 2, "Story A summary")
+    assert new[1].screenshot_path == top[0].screenshot_path
+    assert store.lookup("https://example.com/a", feed="new") == top[0].screenshot_path
+
+def test_incremental_refresh_reuses_other_feeds_stories(tmp_path):
+    """Test a story already captured for another feed is not processed again"""
+    store = ScreenshotStore(str(tmp_path / "screenshots"))
+    known = [
+        Article(title="Story A", url="https://example.com/a", screenshot_path=store.write("https://example.com/a", b"a"),
+                status="success", summary="A summary", rank=4),
+    ]
+    scraper = HackerNewsScraper("test-key", browser_pool=object(), screenshot_store=store)
+    processed = []
+
+    async def fake_links(path="news"):
+        return [("Story A", "https://example.com/a"), ("Story B", "https://example.com/b")]
+
+    async def fake_process(pool, article_number, title, url, progress=None, capture_slots=None):
+        processed.append(url)
+        return Article(title=title, url=url, status="success", rank=article_number)
+
+    scraper._get_story_links = fake_links
+    scraper._process_single_story = fake_process
+    articles = asyncio.run(scraper.scrape_top_stories(feed=FEEDS["best"], known=known))
+
+    assert processed == ["https://example.com/b"]
+    assert (articles[0].summary, articles[0].rank) == ("A summary", 1)
+
+def test_summaries_are_written_from_the_captured_page_text(tmp_path):
+    """Test text read during the screenshot reaches the summarizer and is kept for later refreshes"""
+    store = ScreenshotStore(str(tmp_path / "screenshots"))
+    scraper = HackerNewsScraper("test-key", browser_pool=object(), screenshot_store=store)
+    summarized = []
+
+    async def fake_screenshot(pool, article_number, url):
+        return store.write(url, b"image"), f"Text of {url}"
+
+    async def fake_summary(title, url, content=None):
+        summarized.append((url, content))
+        return "Summary"
+
+    scraper._take_screenshot = fake_screenshot
+    scraper._generate_summary = fake_summary
+    article = asyncio.run(scraper._process_single_story(None, 1, "Story A", "https://example.com/a"))
+
+    assert summarized == [("https://example.com/a", "Text of https://example.com/a")]
+    assert article.content_text == "Text of https://example.com/a"
+
+def test_summaries_wait_outside_capture_slots(tmp_path):
+    """Test finished captures free their slot, so more stories wait for summaries than pages load at once"""
+    store = ScreenshotStore(str(tmp_path / "screenshots"))
+    scraper = HackerNewsScraper("test-key", max_concurrent=2, browser_pool=object(), screenshot_store=store)
+    waiting = 0
+    all_waiting = None
+
+    async def fake_screenshot(pool, article_number, url):
+        return store.write(url, b"image"), "Text"
+
+    async def fake_summary(title, url, content=None):
+        nonlocal waiting
+        waiting += 1
+        if waiting == 4:
+            all_waiting.set()
+        await asyncio.wait_for(all_waiting.wait(), timeout=1)
+        return "Summary"
+
+    async def run():
+        nonlocal all_waiting
+        all_waiting = asyncio.Event()
+        return await scraper._process_stories_concurrently(None, make_links(4))
+
+    scraper._take_screenshot = fake_screenshot
+    scraper._generate_summary = fake_summary
+    articles = asyncio.run(run())
+
+    assert [a.summary for a in articles] == ["Summary"] * 4
+
+def test_failed_summaries_are_left_pending(tmp_path):
+    """Test a model failure leaves the summary pending instead of storing placeholder text"""
+    store = ScreenshotStore(str(tmp_path / "screenshots"))
+    scraper = HackerNewsScraper("test-key", browser_pool=object(), screenshot_store=store)
+    events = []
+
+    async def fake_screenshot(pool, article_number, url):
+        return store.write(url, b"image"), "Text"
+
+    async def fake_summary(title, url, content=None):
+        raise RuntimeError("429 Resource has been exhausted (e.g. check quota).")
+
+    scraper._take_screenshot = fake_screenshot
+    scraper._generate_summary = fake_summary
+    job = RefreshJob(listener=lambda event_type, data: events.append((event_type, data)))
+    article = asyncio.run(scraper._process_single_story(None, 1, "Story A", "https://example.com/a", job))
+
+    assert article.summary is None and article.summary_pending
+    assert article.to_dict()["summary_status"] == "pending"
+    assert [data["summary_status"] for event_type, data in events if event_type == "summary_done"] == ["pending"]
@@ -0,0 +1,68 @@
+import os
+import time
+
+from src.services.screenshot_store import ScreenshotStore
+
+def test_write_is_content_addressed(tmp_path):
+    """Test names depend on URL and bytes, and identical captures are reused"""
+    store = ScreenshotStore(str(tmp_path))
+
+    first = store.write("https://example.com/a", b"image-1")
+    again = store.write("https://example.com/a/?utm_source=hn", b"image-1")
+    changed = store.write("https://example.com/a", b"image-2")
+    other = store.write("https://example.com/b", b"image-1")
+
+    assert first == again
+    assert first != changed
+    assert first.split("-")[0] == changed.split("-")[0]
+    assert first.split("-")[0] != other.split("-")[0]
+    assert (tmp_path / first).read_bytes() == b"image-1"
+
+def test_write_leaves_no_temp_files(tmp_path):
+    """Test temp files are renamed away after writing"""
+    store = ScreenshotStore(str(tmp_path))
+    store.write("https://example.com/a", b"image")
+    store.publish({"https://example.com/a": "x.png"})
+
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(".tmp-")]
+
+def test_publish_and_lookup(tmp_path):
+    """Test the manifest maps URLs of the published batch to existing images"""
+    store = ScreenshotStore(str(tmp_path))
+    name = store.write("https://example.com/a", b"image")
+    store.publish({"https://example.com/a": name, "https://example.com/gone": "missing.png"})
+
+    assert store.lookup("https://example.com/a") == name
+    assert store.lookup("https://example.com/gone") is None
+    assert store.lookup("https://example.com/unknown") is None
+
+def test_garbage_collection_respects_age(tmp_path):
+    """Test only old, unreferenced images are deleted"""
+    store = ScreenshotStore(str(tmp_path), gc_max_age_seconds=60)
+    kept = store.write("https://example.com/a", b"kept")
+    old = store.write("https://example.com/b", b"old")
+    recent = store.write("https://example.com/c", b"recent")
+    store.publish({"https://example.com/a": kept})
+
+    past = time.time() - 120
+    os.utime(tmp_path / kept, (past, past))
+    os.utime(tmp_path / old, (past, past))
+
+    assert store.collect_garbage() == 1
+    assert sorted(os.listdir(tmp_path)) == sorted([kept, recent, "manifest.json"])
+
+def test_each_feed_has_a_manifest_and_collection_respects_all(tmp_path):
+    """Test publishing one feed leaves the others' images referenced"""
+    store = ScreenshotStore(str(tmp_path), gc_max_age_seconds=0)
+    top = store.write("https://example.com/a", b"top")
+    new = store.write("https://example.com/b", b"new")
+    store.publish({"https://example.com/a": top})
+    store.publish({"https://example.com/b": new}, feed="new")
+
+    assert store.collect_garbage(now=time.time() + 10) == 0
+    assert store.lookup("https://example.com/b", feed="new") == new
+    assert store.lookup("https://example.com/b") is None
+
+    store.publish({}, feed="new")
+    assert store.collect_garbage(now=time.time() + 10) == 1
+    assert sorted(os.listdir(tmp_path)) == sorted([top, "manifest.json", "manifest-new.json"])
@@ -0,0 +1,67 @@
+import asyncio
+import gzip
+import json
+import time
+from datetime import datetime
+
+from src.models.article import Article
+from src.services.async_cache import AsyncArticleCache
+from src.services.cache import ArticleCache
+from src.services.snapshot import EncodedBody, build_snapshot
+
+def make_articles(count, prefix="Story"):
+    now = datetime.now()
+    return [
+        Article(title=f"{prefix} {i}", url=f"https://example.com/{i}", status="success",
+                summary="Summary", created_at=now, updated_at=now, rank=i + 1)
+        for i in range(count)
+    ]
+
+def test_encoded_body_variants_decode_to_same_json():
+    """Test the compressed variants carry the identity body"""
+    body = EncodedBody.from_payload({"articles": [1, 2, 3]})
+
+    assert json.loads(body.encodings["identity"]) == {"articles": [1, 2, 3]}
+    assert gzip.decompress(body.encodings["gzip"]) == body.encodings["identity"]
+
+def test_etag_matching():
+    """Test If-None-Match accepts the validator of any encoding, lists and wildcards"""
+    body = EncodedBody.from_payload({"a": 1})
+    other = EncodedBody.from_payload({"a": 2})
+
+    assert body.etag != other.etag
+    assert body.matches(body.etag_for("identity"))
+    assert body.matches(f'"nope", W/{body.etag_for("gzip")}')
+    assert body.matches("*")
+    assert not body.matches(other.etag_for("identity"))
+    assert not body.matches(None)
+
+def test_snapshot_goes_stale_when_freshness_flips():
+    """Test a fresh snapshot is marked stale once its fresh window ends"""
+    status = {"total_articles": 1, "is_fresh": True}
+    snapshot = build_snapshot(make_articles(1), status, fresh_until=time.time() + 60)
+
+    assert not snapshot.is_stale()
+    assert snapshot.is_stale(now=time.time() + 120)
+    assert not build_snapshot([], {"is_fresh": False}).is_stale()
+
+def test_snapshot_rebuilt_on_save(tmp_path):
+    """Test saving a batch publishes a new snapshot with a new ETag"""
+    cache = AsyncArticleCache(ArticleCache(str(tmp_path / "test.db")))
+
+    async def run():
+        empty = await cache.get_snapshot()
+        await cache.save_articles(make_articles(2))
+        saved = await cache.get_snapshot()
+        again = await cache.get_snapshot()
+        return empty, saved, again
+
+    empty, saved, again = asyncio.run(run())
+    cache.close()
+
+    assert empty.articles.etag != saved.articles.etag
+    assert saved is again
+    payload = json.loads(saved.articles.encodings["identity"])
+    assert payload["total"] == 2
+    assert payload["cache_status"]["is_fresh"]
+    assert len(json.loads(saved.results.encodings["identity"])) == 2
@@ -0,0 +1,186 @@
+import asyncio
+import json
+import re
+import threading
+import time
+
+import pytest
+from src.services.summarizer import BatchingSummarizer, ModelSummarizer, Summarizer, parse_batch_response
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+class FakeAsyncModel:
+    def __init__(self, text="A summary.", delay=0.0):
+        self.text = text
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+
+    async def generate_content_async(self, prompt):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        return FakeResponse(self.text)
+
+class FakeBlockingModel:
+    def __init__(self):
+        self.threads = set()
+
+    def generate_content(self, prompt):
+        self.threads.add(threading.get_ident())
+        time.sleep(0.01)
+        return FakeResponse(f"  Summary of {prompt[:20]}  ")
+
+def test_summarizers_must_implement_summarize():
+    """Test a summarizer without summarize() fails when it is built, not during a scrape"""
+    class Incomplete(Summarizer):
+        model_name = "models/incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_summarize_with_async_model():
+    """Test native async models are awaited directly"""
+    summarizer = ModelSummarizer(FakeAsyncModel(" Short summary. "))
+
+    assert asyncio.run(summarizer.summarize("Title")) == "Short summary."
+
+def test_in_flight_limit():
+    """Test no more than max_in_flight requests run at once"""
+    model = FakeAsyncModel(delay=0.01)
+    summarizer = ModelSummarizer(model, max_in_flight=2)
+
+    async def run():
+        return await asyncio.gather(*(summarizer.summarize(f"Title {i}") for i in range(8)))
+
+    assert len(asyncio.run(run())) == 8
+    assert model.peak == 2
+
+def test_blocking_model_uses_shared_bounded_executor():
+    """Test blocking models share one executor no larger than the in-flight limit"""
+    model = FakeBlockingModel()
+    summarizer = ModelSummarizer(model, max_in_flight=2)
+
+    async def run():
+        return await asyncio.gather(*(summarizer.summarize(f"Title {i}") for i in range(6)))
+
+    summaries = asyncio.run(run())
+    executor = summarizer._executor
+    summarizer.close()
+
+    assert all(summary.startswith("Summary of") for summary in summaries)
+    assert executor is not None
+    assert len(model.threads) <= 2
+
+def test_timeout_raises():
+    """Test slow model calls fail after the per-call timeout"""
+    summarizer = ModelSummarizer(FakeAsyncModel(delay=1), timeout_seconds=0.01)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(summarizer.summarize("Title"))
+    assert summarizer.get_stats()["timeouts"] == 1
+
+def test_empty_response_raises():
+    """Test an empty model response is treated as a failure"""
+    summarizer = ModelSummarizer(FakeAsyncModel(text="   "))
+
+    with pytest.raises(ValueError):
+        asyncio.run(summarizer.summarize("Title"))
+
+def test_prompt_uses_article_text_when_there_is_any():
+    """Test the article text goes into the prompt and the title-only prompt is the fallback"""
+    model = FakeBlockingModel()
+    prompts = []
+    model.generate_content = lambda prompt: prompts.append(prompt) or FakeResponse("Summary.")
+    summarizer = ModelSummarizer(model)
+
+    asyncio.run(summarizer.summarize("Title", "The compiler now links in half the time."))
+    asyncio.run(summarizer.summarize("Title"))
+    summarizer.close()
+
+    assert "The compiler now links in half the time." in prompts[0]
+    assert "Article text" not in prompts[1] and "'Title'" in prompts[1]
+
+class FakeBatchModel:
+    """Answers batch prompts with JSON keyed by story id, and single prompts with plain text"""
+
+    def __init__(self, drop=(), garble=(), error=None):
+        self.drop = set(drop)
+        self.garble = set(garble)
+        self.error = error
+        self.prompts = []
+
+    async def generate_content_async(self, prompt, generation_config=None):
+        self.prompts.append((prompt, generation_config))
+        await asyncio.sleep(0.01)
+        if self.error:
+            raise self.error
+        titles = re.findall(r"### Story (\d+)\nTitle: (.+)", prompt)
+        if not titles:
+            return FakeResponse(f"Single summary of {re.search(r"titled '(.+?)'|title: '(.+?)'", prompt).group(0)}")
+        answer = {}
+        for story_id, title in titles:
+            if title in self.drop:
+                continue
+            answer[story_id] = 42 if title in self.garble else f"Summary of {title}"
+        return FakeResponse(f"```json\n{json.dumps(answer)}\n```")
+
+def summarize_all(summarizer, titles):
+    async def run():
+        return await asyncio.gather(*(summarizer.summarize(title, f"Text of {title}") for title in titles))
+    return asyncio.run(run())
+
+def test_parse_batch_response_keeps_only_valid_entries():
+    """Test the accepted response shapes and that missing, empty, non-text or overlong entries are dropped"""
+    ids = ["1", "2", "3", "4"]
+
+    assert parse_batch_response('{"1": " One. ", "2": "", "3": 7, "9": "Stray"}', ids) == {"1": "One."}
+    assert parse_batch_response('{"summaries": {"4": "Four."}}', ids) == {"4": "Four."}
+    assert parse_batch_response('[{"id": 2, "summary": "Two."}]', ids) == {"2": "Two."}
+    assert parse_batch_response('{"1": "' + "x" * 5000 + '"}', ids) == {}
+    assert parse_batch_response("Sorry, I can't help with that.", ids) == {}
+
+def test_batching_summarizer_sends_concurrent_stories_together():
+    """Test a full batch goes out at once and a remainder goes out after the wait"""
+    model = FakeBatchModel()
+    summarizer = BatchingSummarizer(ModelSummarizer(model), batch_size=4, max_wait_seconds=0.01)
+
+    titles = [f"Title {i}" for i in range(10)]
+    summaries = summarize_all(summarizer, titles)
+
+    assert summaries == [f"Summary of {title}" for title in titles]
+    assert len(model.prompts) == 3
+    assert all(config == {"response_mime_type": "application/json"} for _, config in model.prompts)
+    assert "Text of Title 0" in model.prompts[0][0]
+    stats = summarizer.get_stats()
+    assert (stats["calls"], stats["batches"], stats["average_batch_size"]) == (3, 3, 10 / 3)
+
+def test_batching_summarizer_retries_missing_and_malformed_stories_alone():
+    """Test stories the batch answer skipped or garbled get single-story calls"""
+    model = FakeBatchModel(drop={"Title 1"}, garble={"Title 2"})
+    summarizer = BatchingSummarizer(ModelSummarizer(model), batch_size=3, max_wait_seconds=0.01)
+
+    summaries = summarize_all(summarizer, ["Title 0", "Title 1", "Title 2"])
+
+    assert summaries[0] == "Summary of Title 0"
+    assert summaries[1].startswith("Single summary") and "Title 1" in summaries[1]
+    assert summaries[2].startswith("Single summary") and "Title 2" in summaries[2]
+    assert len(model.prompts) == 3
+    assert summarizer.get_stats()["single_fallbacks"] == 2
+
+def test_failed_batch_fails_every_story_without_retrying():
+    """Test a batch request error reaches every caller and is not multiplied into single calls"""
+    model = FakeBatchModel(error=RuntimeError("429 quota exceeded"))
+    summarizer = BatchingSummarizer(ModelSummarizer(model), batch_size=3, max_wait_seconds=0.01)
+
+    async def run():
+        return await asyncio.gather(*(summarizer.summarize(f"Title {i}") for i in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(model.prompts) == 1
+    assert summarizer.get_stats()["failed_batches"] == 1
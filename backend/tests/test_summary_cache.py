@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+
+from src.services.scraper import HackerNewsScraper
+from src.services.summary_cache import SummaryCache
+from src.utils.urls import canonicalize_url
+
+MODEL = "models/test"
+
+def test_canonicalize_url():
+    """Test trivially different URLs share a canonical form"""
+    assert canonicalize_url("HTTPS://Example.com:443/post/?utm_source=hn&b=2&a=1#top") == "https://example.com/post?a=1&b=2"
+    assert canonicalize_url("https://news.ycombinator.com/item?id=1") == "https://news.ycombinator.com/item?id=1"
+
+def test_cache_hit_and_miss(tmp_path):
+    """Test summaries are returned for the same URL and title"""
+    cache = SummaryCache(str(tmp_path / "test.db"))
+
+    assert cache.get("https://example.com/a", "Title", MODEL, 1) is None
+    cache.put("https://example.com/a", "Title", MODEL, 1, "Cached summary")
+
+    assert cache.get("https://example.com/a/?utm_source=x", "Title", MODEL, 1) == "Cached summary"
+    assert cache.get("https://example.com/a", "Other title", MODEL, 1) is None
+    assert cache.get_stats()["hits"] == 1
+    assert cache.get_stats()["misses"] == 2
+
+def test_model_or_prompt_change_invalidates(tmp_path):
+    """Test a different model or prompt version misses and can be purged"""
+    cache = SummaryCache(str(tmp_path / "test.db"))
+    cache.put("https://example.com/a", "Title", MODEL, 1, "Old summary")
+
+    assert cache.get("https://example.com/a", "Title", MODEL, 2) is None
+    assert cache.get("https://example.com/a", "Title", "models/other", 1) is None
+    assert cache.purge_other_versions(MODEL, 2) == 1
+
+def test_ttl_expiry(tmp_path):
+    """Test expired entries are treated as misses"""
+    cache = SummaryCache(str(tmp_path / "test.db"), ttl_seconds=0)
+    cache.put("https://example.com/a", "Title", MODEL, 1, "Summary")
+
+    assert cache.get("https://example.com/a", "Title", MODEL, 1) is None
+
+def test_lru_eviction(tmp_path):
+    """Test the least recently used entries are evicted over the size limit"""
+    cache = SummaryCache(str(tmp_path / "test.db"), max_entries=2)
+    cache.put("https://example.com/1", "One", MODEL, 1, "First")
+    time.sleep(0.01)
+    cache.put("https://example.com/2", "Two", MODEL, 1, "Second")
+    time.sleep(0.01)
+    cache.get("https://example.com/1", "One", MODEL, 1)
+    time.sleep(0.01)
+    cache.put("https://example.com/3", "Three", MODEL, 1, "Third")
+
+    assert cache.get("https://example.com/1", "One", MODEL, 1) == "First"
+    assert cache.get("https://example.com/2", "Two", MODEL, 1) is None
+    assert cache.get("https://example.com/3", "Three", MODEL, 1) == "Third"
+
+def test_scraper_skips_model_on_cache_hit(tmp_path):
+    """Test the scraper only calls the summarizer on a cache miss"""
+    calls = []
+
+    class FakeSummarizer:
+        model_name = MODEL
+        prompt_version = 1
+
+        async def summarize(self, title, content=None):
+            calls.append(title)
+            return f"Summary of {title}"
+
+    cache = SummaryCache(str(tmp_path / "test.db"))
+    scraper = HackerNewsScraper("test-key", summarizer=FakeSummarizer(), summary_cache=cache)
+
+    first = asyncio.run(scraper._generate_summary("Title", "https://example.com/a", "Article text"))
+    second = asyncio.run(scraper._generate_summary("Title", "https://example.com/a", "Article text"))
+
+    assert first == second == "Summary of Title"
+    assert calls == ["Title"]
+
+    # Guesses from the title alone are cached too, until a capture with text replaces them
+    asyncio.run(scraper._generate_summary("Other", "https://example.com/b"))
+    asyncio.run(scraper._generate_summary("Other", "https://example.com/b"))
+    assert calls == ["Title", "Other"]
+    asyncio.run(scraper._generate_summary("Other", "https://example.com/b", "Article text"))
+    asyncio.run(scraper._generate_summary("Other", "https://example.com/b"))
+    assert calls == ["Title", "Other", "Other"]
+
+def test_title_only_summaries_expire_sooner_and_yield_to_text(tmp_path):
+    """Test title-only entries use their own TTL, miss for lookups with text and never replace text summaries"""
+    cache = SummaryCache(str(tmp_path / "test.db"), title_only_ttl_seconds=0)
+    cache.put("https://example.com/a", "Title", MODEL, 1, "Guess", from_text=False)
+    assert cache.get("https://example.com/a", "Title", MODEL, 1) is None
+
+    cache = SummaryCache(str(tmp_path / "other.db"))
+    cache.put("https://example.com/a", "Title", MODEL, 1, "Guess", from_text=False)
+    assert cache.get("https://example.com/a", "Title", MODEL, 1) == "Guess"
+    assert cache.get("https://example.com/a", "Title", MODEL, 1, from_text=True) is None
+
+    cache.put("https://example.com/a", "Title", MODEL, 1, "From text")
+    cache.put("https://example.com/a", "Title", MODEL, 1, "Guess", from_text=False)
+    assert cache.get("https://example.com/a", "Title", MODEL, 1, from_text=True) == "From text"
+
+def test_scraper_uses_the_cache_off_the_event_loop(tmp_path):
+    """Test cache lookups and stores do not run SQLite on the event loop thread"""
+    threads = []
+
+    class RecordingCache(SummaryCache):
+        def get(self, *args):
+            threads.append(threading.current_thread())
+            return super().get(*args)
+
+        def put(self, *args):
+            threads.append(threading.current_thread())
+            return super().put(*args)
+
+    class FakeSummarizer:
+        model_name = MODEL
+        prompt_version = 1
+
+        async def summarize(self, title, content=None):
+            return f"Summary of {title}"
+
+    scraper = HackerNewsScraper("test-key", summarizer=FakeSummarizer(),
+                                summary_cache=RecordingCache(str(tmp_path / "test.db")))
+    asyncio.run(scraper._generate_summary("Title", "https://example.com/a", "Article text"))
+
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
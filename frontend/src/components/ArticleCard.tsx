@@ -5,6 +5,15 @@ interface ArticleCardProps {
   index: number;
 }
 
+const API_BASE = import.meta.env.VITE_API_URL;
+
+// Thumbnail variants are named webp_<width>; build a srcset from whichever exist
+const getThumbnailSrcSet = (variants: Article["screenshot_variants"]) =>
+  Object.entries(variants ?? {})
+    .filter(([name]) => name.startsWith("webp_"))
+    .map(([name, path]) => `${API_BASE}${path} ${name.slice("webp_".length)}w`)
+    .join(", ");
+
 export const ArticleCard = ({ article, index }: ArticleCardProps) => {
   const getStatusBadge = (status: Article["status"]) => {
     const badges = {
@@ -55,7 +64,9 @@ export const ArticleCard = ({ article, index }: ArticleCardProps) => {
       {article.status === "success" && article.screenshot ? (
         <div className="mb-4">
           <img
-            src={`${import.meta.env.VITE_API_URL}${article.screenshot}?t=${article.updated_at || Date.now()}`}
+            src={`${API_BASE}${article.screenshot_variants?.jpeg ?? article.screenshot}`}
+            srcSet={getThumbnailSrcSet(article.screenshot_variants) || undefined}
+            sizes="(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw"
             alt={article.title}
             className="w-full h-48 object-cover rounded-md"
             loading="lazy"
@@ -79,7 +90,11 @@ export const ArticleCard = ({ article, index }: ArticleCardProps) => {
         </div>
       )}
 
-      <p className="text-gray-700 text-sm mb-4 line-clamp-3">
+      <p
+        className={`text-sm mb-4 line-clamp-3 ${
+          article.summary_status === "pending" ? "text-gray-400 italic" : "text-gray-700"
+        }`}
+      >
         {article.summary}
       </p>
 
@@ -1,7 +1,8 @@
-import { useState, useEffect, useCallback } from 'react';
-import { Article, ApiResponse, RefreshStatus } from '../types';
+import { useState, useEffect, useCallback, useRef } from 'react';
+import { Article, ApiResponse, RefreshJob, RefreshStatus } from '../types';
 
 const API_BASE = import.meta.env.VITE_API_URL;
+const JOB_POLL_INTERVAL_MS = 2000;
 
 export const useArticles = () => {
   const [articles, setArticles] = useState<Article[]>([]);
@@ -11,20 +12,42 @@ export const useArticles = () => {
     error: null
   });
   const [loading, setLoading] = useState(true);
+  // While the event stream is open the server pushes progress, so nothing polls
+  const eventsConnected = useRef(false);
+
+  // Insert or update the article at a rank as its events arrive. A different story at
+  // the rank, or fresh, starts from a blank article so the previous story's screenshot
+  // and summary never show under the new title
+  const upsertArticle = useCallback((rank: number, patch: Partial<Article>, fresh = false) => {
+    setArticles(prev => {
+      const existing = prev.find(article => article.rank === rank);
+      const replaced = fresh || (patch.url !== undefined && patch.url !== existing?.url);
+      const updated: Article = existing && !replaced ? { ...existing, ...patch } : {
+        title: '',
+        url: '',
+        screenshot: null,
+        screenshot_variants: undefined,
+        status: 'processing',
+        summary: '',
+        summary_status: undefined,
+        created_at: null,
+        updated_at: null,
+        rank,
+        ...patch
+      };
+      return [...prev.filter(article => article.rank !== rank), updated]
+        .sort((a, b) => (a.rank ?? Infinity) - (b.rank ?? Infinity));
+    });
+  }, []);
 
   const fetchArticles = useCallback(async () => {
     try {
       setRefreshStatus(prev => ({ ...prev, error: null }));
       console.log('Fetching from:', `${API_BASE}/api/articles`);
       
-      // Force fresh data by adding cache-busting timestamp
-      const cacheBuster = new Date().getTime();
-      let response = await fetch(`${API_BASE}/api/articles?t=${cacheBuster}`, {
-        cache: 'no-cache',
-        headers: {
-          'Cache-Control': 'no-cache',
-          'Pragma': 'no-cache'
-        }
+      // Revalidate with the server's ETag; an unchanged batch costs a bodyless 304
+      let response = await fetch(`${API_BASE}/api/articles`, {
+        cache: 'no-cache'
       });
       console.log('Response status:', response.status);
       
@@ -73,8 +96,10 @@ export const useArticles = () => {
     try {
       setRefreshStatus(prev => ({ ...prev, isRefreshing: true, error: null }));
       
-      // Clear current articles to force fresh render
-      setArticles([]);
+      // Without the event stream, clear current articles to force fresh render
+      if (!eventsConnected.current) {
+        setArticles([]);
+      }
       
       const response = await fetch(`${API_BASE}/api/refresh`, {
         method: 'POST',
@@ -102,12 +127,40 @@ export const useArticles = () => {
           isRefreshing: false,
           lastRefresh: new Date()
         }));
+      } else if (eventsConnected.current) {
+        // Progress and finished articles arrive over /api/events
+      } else if (data.job_id) {
+        // No event stream: poll the one running refresh until it finishes
+        const pollJob = async () => {
+          try {
+            const jobResponse = await fetch(`${API_BASE}/api/refresh/${data.job_id}`, { cache: 'no-cache' });
+            if (!jobResponse.ok) {
+              throw new Error(`Refresh status failed: ${jobResponse.status}`);
+            }
+            const job: RefreshJob = await jobResponse.json();
+            if (job.status === 'succeeded' || job.status === 'failed') {
+              await fetchArticles();
+              setRefreshStatus(prev => ({
+                ...prev,
+                isRefreshing: false,
+                error: job.status === 'failed' ? job.error || 'Refresh failed' : prev.error
+              }));
+              return;
+            }
+            setTimeout(pollJob, JOB_POLL_INTERVAL_MS);
+          } catch (error) {
+            console.error('Failed to poll refresh:', error);
+            await fetchArticles();
+            setRefreshStatus(prev => ({ ...prev, isRefreshing: false }));
+          }
+        };
+        setTimeout(pollJob, JOB_POLL_INTERVAL_MS);
       } else {
-        // Background refresh started, poll for updates
+        // Older backends return no job id; check back after a fixed delay
         setTimeout(() => {
           fetchArticles();
           setRefreshStatus(prev => ({ ...prev, isRefreshing: false }));
-        }, 5000); // Increased wait time to allow backend processing
+        }, 5000);
       }
       
     } catch (error) {
@@ -124,9 +177,70 @@ export const useArticles = () => {
     fetchArticles();
   }, [fetchArticles]);
 
-  // Auto-refresh every 5 minutes
+  // Server-Sent Events: each article shows up as soon as it is ready
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') {
+      return;
+    }
+    const source = new EventSource(`${API_BASE}/api/events?feed=top`);
+    const listen = (type: string, handler: (data: any) => void) => {
+      source.addEventListener(type, (event: MessageEvent) => handler(JSON.parse(event.data)));
+    };
+    
+    source.onopen = () => { eventsConnected.current = true; };
+    source.onerror = () => { eventsConnected.current = false; };  // EventSource reconnects by itself
+    
+    listen('refresh_started', () => {
+      setRefreshStatus(prev => ({ ...prev, isRefreshing: true, error: null }));
+    });
+    listen('story_discovered', data => {
+      // Reused stories keep what they had; new ones wait for their screenshot and summary
+      upsertArticle(data.rank, { title: data.title, url: data.url }, !data.reused);
+    });
+    listen('screenshot_done', data => {
+      upsertArticle(data.rank, {
+        screenshot: data.screenshot,
+        screenshot_variants: data.screenshot_variants,
+        status: data.status
+      });
+    });
+    listen('summary_done', data => {
+      // A failed summary is retried later and arrives in another summary_done
+      upsertArticle(data.rank, data.summary_status === 'pending'
+        ? { summary: 'Summary pending.', summary_status: 'pending' }
+        : { summary: data.summary, summary_status: 'ready' });
+    });
+    listen('article_ready', data => {
+      upsertArticle(data.rank, data.article);
+    });
+    listen('batch_published', () => {
+      // Stories that dropped off the front page disappear with the published list
+      fetchArticles();
+    });
+    listen('refresh_finished', data => {
+      setRefreshStatus(prev => ({
+        ...prev,
+        isRefreshing: false,
+        error: data.status === 'failed' ? data.error || 'Refresh failed' : prev.error
+      }));
+    });
+    listen('resync', () => {
+      fetchArticles();
+    });
+    
+    return () => {
+      eventsConnected.current = false;
+      source.close();
+    };
+  }, [fetchArticles, upsertArticle]);
+
+  // Fallback when the event stream is unavailable: revalidate every 5 minutes
   useEffect(() => {
-    const interval = setInterval(fetchArticles, 5 * 60 * 1000);
+    const interval = setInterval(() => {
+      if (!eventsConnected.current) {
+        fetchArticles();
+      }
+    }, 5 * 60 * 1000);
     return () => clearInterval(interval);
   }, [fetchArticles]);
 
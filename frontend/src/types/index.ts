@@ -2,10 +2,13 @@ export interface Article {
   title: string;
   url: string;
   screenshot: string | null;
+  screenshot_variants?: Record<string, string>;
   status: 'success' | 'failed' | 'processing' | 'screenshot_failed';
   summary: string;
+  summary_status?: 'ready' | 'pending';
   created_at: string | null;
   updated_at: string | null;
+  rank?: number | null;
 }
 
 export interface CacheStatus {
@@ -22,6 +25,28 @@ export interface ApiResponse {
   status?: string;
   message?: string;
   estimated_completion?: string;
+  feed?: string;
+  job_id?: string;
+  started?: boolean;
+  progress_url?: string;
+}
+
+export interface RefreshStage {
+  status: 'pending' | 'running' | 'succeeded' | 'failed';
+  done: number;
+  total: number;
+}
+
+export interface RefreshJob {
+  job_id: string;
+  status: 'pending' | 'running' | 'succeeded' | 'failed';
+  stages: Record<string, RefreshStage>;
+  created_at: string;
+  started_at: string | null;
+  finished_at: string | null;
+  article_count: number | null;
+  churn: number | null;
+  error: string | null;
 }
 
 export interface RefreshStatus {